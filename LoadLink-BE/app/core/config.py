@@ -1,12 +1,101 @@
+from functools import lru_cache
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
-    SECRET_KEY: str 
+    SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 16000
 
+    # Serve trips/bookings/payments/reviews from the AsyncSession handlers
+    ASYNC_DB: bool = False
+    # Defaults to DATABASE_URL with the async driver swapped in
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool, applied to both the sync and async engines (per worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables
+    DB_POOL_PRE_PING: bool = True
+
+    # Per-process cache of already-verified JWTs, each kept until its exp (0 disables)
+    TOKEN_CACHE_SIZE: int = 10000
+
+    # Per-process cache of authenticated users (0 disables)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+
+    # bcrypt work factor; older hashes are upgraded on the next login
+    BCRYPT_ROUNDS: int = 12
+    # Dedicated hashing threads (defaults to half the CPUs) and how many hashes may be running or queued
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Per-process cache of serialized /trips/all and /trips/{id} responses; entries are checked
+    # against the rows' current versions on every read, so the TTL only bounds memory
+    TRIP_CACHE_SIZE: int = 5000
+    TRIP_CACHE_TTL_SECONDS: float = 30
+
+    # In-memory index behind GET /trips/match, rebuilt from the database every
+    # TRIP_MATCH_REFRESH_SECONDS per worker (0 = built once at startup)
+    TRIP_MATCH_INDEX: bool = True
+    TRIP_MATCH_REFRESH_SECONDS: float = 300
+
+    # How old the in-process location search index (non-Postgres databases) may get before a reload
+    LOCATION_SEARCH_REFRESH_SECONDS: float = 60
+
+    # Rows validated, vehicle-checked and written together by POST /trips/import
+    TRIP_IMPORT_BATCH_SIZE: int = 5000
+
+    # Rows fetched per server-side cursor round trip by the streaming exports
+    EXPORT_YIELD_PER: int = 1000
+
+    # Adds X-Query-Count / X-Query-Time-Ms to every response
+    DEBUG: bool = False
+    # Warn when a request issues more statements than this, or repeats one this often (0 disables)
+    QUERY_BUDGET: int = 20
+    QUERY_REPEAT_THRESHOLD: int = 5
+
+    # Opt-in slow-query log: statements over the threshold go to a rotating file,
+    # a sampled fraction with their EXPLAIN output
+    SLOW_QUERY_LOG: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_LOG_FILE: str = "slow_queries.log"
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS: int = 5
+
     class Config:
         env_file = ".env"
 
-settings = Settings()
+    @property
+    def async_database_url(self) -> str:
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        url = self.DATABASE_URL
+        for prefix, async_prefix in (
+            ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+            ("postgresql://", "postgresql+asyncpg://"),
+            ("postgres://", "postgresql+asyncpg://"),
+            ("sqlite://", "sqlite+aiosqlite://"),
+        ):
+            if url.startswith(prefix):
+                return async_prefix + url[len(prefix):]
+        return url
+
+@lru_cache
+def get_settings() -> Settings:
+    """The process-wide Settings, read from the environment / .env on first use."""
+    return Settings()
+
+
+class _LazySettings:
+    # Stands in for the Settings instance so `from app.core.config import settings`
+    # doesn't read the environment at import time
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+
+settings = _LazySettings()
@@ -0,0 +1,62 @@
+import hashlib
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import Select
+
+# Authenticated responses: browsers may keep them but must revalidate every time
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(parts) -> str:
+    return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest() + '"'
+
+
+def row_etag(row) -> str:
+    """Strong validator for one resource from its primary key and row version."""
+    return make_etag((str(row.id), row.version))
+
+
+def rows_etag(rows) -> str:
+    """Strong validator for a list from the (id, version) pairs it contains, in order."""
+    return make_etag([(str(row.id), row.version) for row in rows])
+
+
+def version_probe(query, model):
+    """Same query narrowed to (id, version), to answer a conditional GET without loading rows."""
+    if isinstance(query, Select):
+        return query.with_only_columns(model.id, model.version)
+    return query.with_entities(model.id, model.version)
+
+
+class ConditionalGet:
+    """Dependency that emits ETag and turns a matching If-None-Match into 304 Not Modified."""
+
+    def __init__(self, request: Request, response: Response):
+        self.if_none_match: Optional[str] = request.headers.get("if-none-match")
+        self.response = response
+
+    @property
+    def conditional(self) -> bool:
+        return self.if_none_match is not None
+
+    def matches(self, etag: str) -> bool:
+        if self.if_none_match is None:
+            return False
+        candidates = [tag.strip().removeprefix("W/") for tag in self.if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+
+    def check(self, etag: str):
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if self.matches(etag):
+            raise HTTPException(status_code=304, headers=headers)
+        self.response.headers.update(headers)
+
+    def respond(self, etag: str, body: bytes) -> Response:
+        """For handlers that return pre-serialized JSON themselves."""
+        self.check(etag)
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+        )
@@ -0,0 +1,72 @@
+import base64
+import json
+from datetime import date
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else str(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(columns):
+            raise ValueError
+        return [_parse(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parse(column, value: str):
+    python_type = column.type.python_type
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
+
+
+class CursorParams:
+    """
+    Keyset pagination dependency. The body stays a plain list; when more
+    rows exist the opaque cursor for the next page goes in X-Next-Cursor.
+    """
+
+    def __init__(
+        self,
+        response: Response,
+        cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    ):
+        self.response = response
+        self.cursor = cursor
+        self.limit = limit
+
+    def apply(self, query, *order_by, descending: bool = False):
+        """Filter past the cursor, order by the keyset columns and fetch one extra row."""
+        if self.cursor:
+            values = tuple(decode_cursor(self.cursor, order_by))
+            key = tuple_(*order_by)
+            query = query.filter(key < values if descending else key > values)
+        ordering = [column.desc() for column in order_by] if descending else list(order_by)
+        return query.order_by(*ordering).limit(self.limit + 1)
+
+    def page(self, rows, *order_by) -> list:
+        """Trim the extra row and publish the cursor pointing past the last one."""
+        rows = list(rows)
+        if len(rows) > self.limit:
+            rows = rows[: self.limit]
+            last = rows[-1]
+            self.response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, c.key) for c in order_by)
+        return rows
@@ -0,0 +1,120 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """Running connection counters for one engine's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.held_seconds_total = 0.0
+        self.held_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_checkin(self, held: float):
+        with self._lock:
+            self.checkins += 1
+            self.held_seconds_total += held
+            if held > self.held_seconds_max:
+                self.held_seconds_max = held
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "held_seconds_total": round(self.held_seconds_total, 6),
+                "held_seconds_max": round(self.held_seconds_max, 6),
+            }
+
+
+class _TimedConnectMixin:
+    # No pool event fires before a checkout starts waiting, so the wait (and a
+    # timeout) is timed around the public Pool.connect() that Engine calls
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        _listen(self, self.stats)
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except PoolTimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
+
+def _listen(pool, stats: PoolStats):
+    """Count connects, checkouts and checkins, and how long each connection was held, from the pool events."""
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.record_connect()
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        stats.record_checkout()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            stats.record_checkin(time.perf_counter() - checked_out_at)
+
+
+class InstrumentedQueuePool(_TimedConnectMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedConnectMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(engine) -> dict:
+    """Current occupancy and checkout timings of an engine's pool."""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, _TimedConnectMixin):
+        status.update(pool.stats.snapshot())
+    return status
@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger("app.queries")
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+QUERY_TIME_HEADER = "X-Query-Time-Ms"
+
+
+class QueryStats:
+    """Statements issued and time spent in the database, plus how often each distinct statement ran."""
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def most_repeated(self) -> tuple[Optional[str], int]:
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+
+# The request's stats object; worker threads get a copy of the context, so
+# they record into the same instance
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# Process-wide collectors opened by count_queries() (tests, benchmarks)
+_collectors: list[QueryStats] = []
+_collectors_lock = threading.Lock()
+
+
+def route_label(scope) -> str:
+    """"GET /trips/{trip_id}" once routing has run, the raw path before that."""
+    return f"{scope['method']} {getattr(scope.get('route'), 'path', scope['path'])}"
+
+
+def current_route() -> Optional[str]:
+    """Route of the request the calling code is serving, if any."""
+    stats = _current.get()
+    if stats is None or stats.scope is None:
+        return None
+    return route_label(stats.scope)
+
+
+# ---------------------------
+# Engine hooks
+# ---------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    for collector in _collectors:
+        collector.record(statement, elapsed)
+
+
+def instrument(engine):
+    """Count statements on a sync Engine (pass async_engine.sync_engine for the async one)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def count_queries():
+    """Collect every statement run on an instrumented engine inside the block, from any thread."""
+    stats = QueryStats()
+    with _collectors_lock:
+        _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _collectors_lock:
+            _collectors.remove(stats)
+
+
+# ---------------------------
+# Per-request middleware
+# ---------------------------
+class QueryStatsMiddleware:
+    """
+    Tracks the statements of each HTTP request. In debug mode the totals go out
+    as X-Query-Count / X-Query-Time-Ms headers (counted up to the response
+    start, so a streamed body's own queries aren't included). A warning is
+    logged when a request goes over its query budget or repeats one statement
+    often enough to look like an N+1.
+    """
+
+    def __init__(self, app, budget: int = 0, repeat_threshold: int = 0, expose_headers: bool = False):
+        self.app = app
+        self.budget = budget
+        self.repeat_threshold = repeat_threshold
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats(scope)
+        token = _current.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = MutableHeaders(scope=message)
+                headers[QUERY_COUNT_HEADER] = str(stats.count)
+                headers[QUERY_TIME_HEADER] = f"{stats.seconds * 1000:.1f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            self.check(scope, stats)
+
+    def check(self, scope, stats: QueryStats):
+        route = route_label(scope)
+        if self.budget and stats.count > self.budget:
+            logger.warning(
+                "%s issued %d queries (budget %d) in %.1f ms",
+                route, stats.count, self.budget, stats.seconds * 1000,
+            )
+        statement, repeats = stats.most_repeated()
+        if self.repeat_threshold and repeats >= self.repeat_threshold:
+            logger.warning(
+                "%s ran the same statement %d times, possible N+1: %s",
+                route, repeats, " ".join(statement.split())[:200],
+            )
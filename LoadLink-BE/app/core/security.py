@@ -1,11 +1,19 @@
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
+import hashlib
 import os
+import time
+
+from app.core.cache import TTLCache
+from app.core.config import settings
 
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1600
 
+# Already-verified tokens, keyed by digest; each entry lives until the token's own exp
+verified_token_cache = TTLCache(lambda: settings.TOKEN_CACHE_SIZE, ttl=0)
+
 def create_access_token(data: dict, expires_delta: int = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=expires_delta or ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -13,8 +21,18 @@ def create_access_token(data: dict, expires_delta: int = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def decode_access_token(token: str):
+    key = hashlib.sha256(token.encode()).digest()
+    payload = verified_token_cache.get(key)
+    # exp is re-checked on every hit, so a cached token never outlives its expiry
+    if payload is not None and payload["exp"] > time.time():
+        return dict(payload)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        verified_token_cache.set(key, payload, ttl=exp - time.time())
+    return dict(payload)
@@ -0,0 +1,116 @@
+import json
+import logging
+import random
+import re
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+from app.core.query_stats import current_route
+
+logger = logging.getLogger("app.slow_queries")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![$\w])\d+(?:\.\d+)?\b")  # leaves $1 placeholders alone
+_EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+_EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+
+def redact(statement: str) -> str:
+    """Statement text with inline literals masked; bound values are never logged."""
+    return " ".join(_NUMBER_LITERAL.sub("?", _STRING_LITERAL.sub("?", statement)).split())
+
+
+def _param_types(parameters):
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+class SlowQueryLog:
+    """
+    Logs statements slower than threshold_ms as JSON lines (redacted
+    statement, parameter types, route, duration). A sample of them is
+    re-run under EXPLAIN on the same connection and transaction:
+    EXPLAIN (ANALYZE, BUFFERS) for SELECTs on Postgres, plain EXPLAIN for
+    writes (ANALYZE would apply them twice), EXPLAIN QUERY PLAN on SQLite.
+    The EXPLAIN runs on a raw cursor inside a savepoint, so it isn't counted
+    by the engine hooks and a failure can't abort the caller's transaction.
+    """
+
+    def __init__(self, threshold_ms: float, explain_sample_rate: float):
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+
+    def attach(self, engine):
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._slow_query_started
+        if elapsed < self.threshold:
+            return
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "route": current_route(),
+            "duration_ms": round(elapsed * 1000, 2),
+            "statement": redact(statement),
+            "params": "executemany" if executemany else _param_types(parameters),
+        }
+        if not executemany and random.random() < self.explain_sample_rate:
+            entry["plan"] = self._explain(conn, statement, parameters)
+        logger.warning(json.dumps(entry, default=str))
+
+    def _explain(self, conn, statement: str, parameters):
+        verb = statement.lstrip()[:6].lower()
+        if not verb.startswith(_EXPLAINABLE):
+            return None
+        dialect = conn.dialect.name
+        if dialect == "postgresql":
+            # Only plain SELECTs get ANALYZE: a WITH may wrap a data-modifying CTE
+            is_select = verb.startswith("select")
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) " if is_select else "EXPLAIN "
+        elif dialect == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        else:
+            return None
+
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+            try:
+                cursor.execute(prefix + statement, parameters)
+                plan = [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+            except Exception as exc:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+                plan = [f"EXPLAIN failed: {exc}"]
+            cursor.execute(f"RELEASE SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+            return plan
+        except Exception as exc:
+            return [f"EXPLAIN skipped: {exc}"]
+        finally:
+            cursor.close()
+
+
+def enable_slow_query_log(
+    engines, threshold_ms: float, explain_sample_rate: float, path: str, max_bytes: int, backups: int
+):
+    """Opt-in: attach the slow-query hooks to each engine and route the log to a rotating file."""
+    if not any(isinstance(handler, RotatingFileHandler) for handler in logger.handlers):
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
+
+    slow_log = SlowQueryLog(threshold_ms, explain_sample_rate)
+    for engine in engines:
+        slow_log.attach(engine)
+    return slow_log
@@ -1,10 +1,72 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from app.core.query_stats import instrument
+from app.core.slow_queries import enable_slow_query_log
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _pool_options(url: str, poolclass) -> dict:
+    # In-memory SQLite runs on a single-connection pool that takes none of these
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+# Engines are built by init_engines() (app lifespan startup, or explicitly by jobs and
+# benchmarks), not at import; the session factories are bound to them then
+engine = None
+async_engine = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+def init_engines():
+    """Create the engines from settings once per process, instrument them and bind the session factories."""
+    global engine, async_engine
+    if engine is not None:
+        return engine
+
+    engine = create_engine(settings.DATABASE_URL, **_pool_options(settings.DATABASE_URL, InstrumentedQueuePool))
+    # Async engine is only built when enabled so the async driver stays optional
+    if settings.ASYNC_DB:
+        async_engine = create_async_engine(
+            settings.async_database_url,
+            **_pool_options(settings.async_database_url, InstrumentedAsyncQueuePool),
+        )
+    engines = [engine] if async_engine is None else [engine, async_engine.sync_engine]
+    for _engine in engines:
+        instrument(_engine)
+    if settings.SLOW_QUERY_LOG:
+        enable_slow_query_log(
+            engines,
+            threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+            explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+            path=settings.SLOW_QUERY_LOG_FILE,
+            max_bytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+            backups=settings.SLOW_QUERY_LOG_BACKUPS,
+        )
+    SessionLocal.configure(bind=engine)
+    AsyncSessionLocal.configure(bind=async_engine)
+    return engine
+
+
+async def dispose_engines():
+    """Close every pooled connection (app lifespan shutdown); init_engines() can build them again."""
+    global engine, async_engine
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+    engine = async_engine = None
 
 Base = declarative_base()
 
@@ -15,3 +77,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Async dependency for the *_async routers
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
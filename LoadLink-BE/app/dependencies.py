@@ -1,15 +1,39 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 from uuid import UUID
 
-from app.database import get_db
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.database import get_db, get_async_db
 from app.models import User
 from app.core.security import decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+# ---------------------------
+# Principal cache: user id -> detached User snapshot
+# ---------------------------
+principal_cache = TTLCache(lambda: settings.PRINCIPAL_CACHE_SIZE, lambda: settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+def invalidate_principal(user_id: UUID):
+    principal_cache.pop(user_id)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    # Bulk UPDATE/DELETE statements skip these hooks and must call invalidate_principal
+    invalidate_principal(target.id)
+
+def _snapshot(user: User) -> User:
+    # Column values only, detached with an identity key so it can be merged back without a SELECT
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+def _user_id_from_token(token: str) -> UUID:
     payload = decode_access_token(token)
     if payload is None:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -19,12 +43,36 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         raise HTTPException(status_code=401, detail="Invalid token payload")
 
     try:
-        user_id = UUID(user_id_str)   # <-- parse as UUID
+        return UUID(user_id_str)   # <-- parse as UUID
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid user ID in token")
 
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    user_id = _user_id_from_token(token)
+
+    cached = principal_cache.get(user_id)
+    if cached is not None:
+        return db.merge(cached, load=False)
+
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
+    principal_cache.set(user_id, _snapshot(user))
+    return user
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> User:
+    user_id = _user_id_from_token(token)
+
+    cached = principal_cache.get(user_id)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    principal_cache.set(user_id, _snapshot(user))
     return user
@@ -1,31 +1,101 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app.routes import auth, user, vehicle, trip, booking,payment, review
-
-# Create tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="Logistics API")
-
-# ------------------------
-# CORS middleware
-# ------------------------
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # allow all origins
-    allow_credentials=True,
-    allow_methods=["*"],  # allow all HTTP methods
-    allow_headers=["*"],  # allow all headers
-)
-
-# ------------------------
-# Include routers
-# ------------------------
-app.include_router(auth.auth_router)
-app.include_router(user.user_router)
-app.include_router(vehicle.vehicle_router)
-app.include_router(trip.trip_router)
-app.include_router(booking.router)
-app.include_router(payment.router)
-app.include_router(review.router)
\ No newline at end of file
+from app.core.config import get_settings
+from app.core.metrics import MetricsMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.database import dispose_engines, init_engines
+
+# Importing this module has no side effects: settings are read, routers imported
+# and engines created only when create_app() runs and the app starts.
+# The schema is managed by Alembic (migrations/): run `alembic upgrade head` before starting.
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_engines()
+    settings = get_settings()
+    matcher = None
+    if settings.TRIP_MATCH_INDEX:
+        # Built in the background: GET /trips/match answers from SQL until it has loaded
+        from app.services.trip_matching import keep_trip_matcher_fresh
+        matcher = asyncio.create_task(keep_trip_matcher_fresh(settings.TRIP_MATCH_REFRESH_SECONDS))
+    try:
+        yield
+    finally:
+        if matcher is not None:
+            matcher.cancel()
+            # Let it unwind before the engines it reads from go away
+            with suppress(asyncio.CancelledError):
+                await matcher
+        await dispose_engines()
+
+
+def create_app() -> FastAPI:
+    settings = get_settings()
+    from app.routes import auth, user, vehicle, location, health, metrics
+
+    # Trips, bookings, payments and reviews run on AsyncSession when ASYNC_DB is set
+    if settings.ASYNC_DB:
+        from app.routes import trip_async as trip, booking_async as booking, payment_async as payment, review_async as review
+    else:
+        from app.routes import trip, booking, payment, review
+
+    app = FastAPI(title="Logistics API", lifespan=lifespan)
+
+    # ------------------------
+    # CORS middleware
+    # ------------------------
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # allow all origins
+        allow_credentials=True,
+        allow_methods=["*"],  # allow all HTTP methods
+        allow_headers=["*"],  # allow all headers
+        expose_headers=["X-Next-Cursor", "ETag"],  # keyset pagination cursor
+    )
+
+    # ------------------------
+    # Per-request SQL statement counts (headers in DEBUG, budget / N+1 warnings)
+    # ------------------------
+    app.add_middleware(
+        QueryStatsMiddleware,
+        budget=settings.QUERY_BUDGET,
+        repeat_threshold=settings.QUERY_REPEAT_THRESHOLD,
+        expose_headers=settings.DEBUG,
+    )
+
+    # ------------------------
+    # Request count, latency, size and in-flight metrics (served at /metrics)
+    # ------------------------
+    app.add_middleware(MetricsMiddleware)
+
+    # ------------------------
+    # Include routers
+    # ------------------------
+    app.include_router(auth.auth_router)
+    app.include_router(user.user_router)
+    app.include_router(vehicle.vehicle_router)
+    app.include_router(location.location_router)
+    app.include_router(trip.trip_router)
+    app.include_router(booking.router)
+    app.include_router(payment.router)
+    app.include_router(review.router)
+    app.include_router(health.health_router)
+    app.include_router(metrics.metrics_router)
+    return app
+
+
+_app = None
+
+
+def __getattr__(name):
+    # `uvicorn app.main:app` and `from app.main import app` build the app on first access
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,12 +1,16 @@
 from sqlalchemy import (
     Column, String, Date, ForeignKey, Boolean,
-    Numeric, Text, CheckConstraint,Integer
+    Numeric, Text, CheckConstraint,Integer, Index, literal_column, Float
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
 import uuid
 
+def row_version():
+    # Bumped by every UPDATE, including Core update() statements; feeds the ETag validators
+    return Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version") + 1)
+
 class User(Base):
     __tablename__ = "users"
 
@@ -17,6 +21,8 @@ class User(Base):
     phone = Column(String(20), nullable=False)
     rating = Column(Numeric(2, 1), default=0)
     review_count = Column(Integer, default=0)
+    # Running total of received ratings; rating is rating_sum / review_count (app.services.ratings)
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
     joined_date = Column(Date, nullable=False)
     avatar = Column(Text)
     password_hash = Column(String(255), nullable=False)
@@ -44,19 +50,66 @@ class Vehicle(Base):
     license_plate = Column(String(20), unique=True, nullable=False)
     rc_number = Column(String(50), unique=True, nullable=False)
     is_active = Column(Boolean, default=True)
+    version = row_version()
+
+    __table_args__ = (
+        # GET /vehicles/ keyset pages of a carrier's fleet
+        Index("ix_vehicles_carrier_id", "carrier_id", "id"),
+    )
 
     carrier = relationship("User", back_populates="vehicles")
     trips = relationship("Trip", back_populates="vehicle", cascade="all, delete")
 
 
+class Location(Base):
+    __tablename__ = "locations"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)  # canonical spelling, e.g. "Mumbai"
+    # Centre of the place; trips without their own coordinates use it
+    latitude = Column(Float)
+    longitude = Column(Float)
+
+    aliases = relationship("LocationAlias", back_populates="location", cascade="all, delete")
+
+
+class LocationAlias(Base):
+    __tablename__ = "location_aliases"
+
+    # Normalized spelling (app.services.locations.location_key): "mumbai", "bombay", ...
+    key = Column(String(255), primary_key=True)
+    location_id = Column(Integer, ForeignKey("locations.id", ondelete="CASCADE"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_location_aliases_location_id", "location_id"),
+        # Autocomplete / fuzzy search (pg_trgm); SQLite uses the in-process n-gram index instead
+        Index(
+            "ix_location_aliases_key_trgm", "key",
+            postgresql_using="gin", postgresql_ops={"key": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    location = relationship("Location", back_populates="aliases")
+
+
 class Trip(Base):
     __tablename__ = "trips"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     carrier_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False)
+    # As entered by the carrier; route filters go through the location ids
     origin = Column(String(255), nullable=False)
     destination = Column(String(255), nullable=False)
+    origin_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    destination_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    # Pickup / drop-off points and their geohash cells (app.services.geo), NULL when unknown
+    origin_lat = Column(Float)
+    origin_lng = Column(Float)
+    origin_geohash = Column(String(12))
+    destination_lat = Column(Float)
+    destination_lng = Column(Float)
+    destination_geohash = Column(String(12))
     departure_date = Column(Date, nullable=False)
     arrival_date = Column(Date, nullable=False)
     price_per_kg = Column(Numeric(10, 2), nullable=False)
@@ -64,6 +117,22 @@ class Trip(Base):
     total_capacity = Column(Integer, nullable=False)
     status = Column(String(20), nullable=False)  # active, completed, cancelled
     description = Column(Text)
+    version = row_version()
+
+    __table_args__ = (
+        # Keyset search on a route, and on departure date alone (GET /trips/search)
+        Index("ix_trips_status_route_departure", "status", "origin_id", "destination_id", "departure_date", "id"),
+        Index("ix_trips_status_departure", "status", "departure_date", "id"),
+        # A carrier's trips newest first (GET /trips/my), and the carrier side of GET /bookings/
+        Index("ix_trips_carrier_departure", "carrier_id", "departure_date", "id"),
+        Index("ix_trips_vehicle_id", "vehicle_id"),
+        # Radius / bounding-box search (GET /trips/nearby): geohash ranges per end, covering the candidate read
+        Index("ix_trips_status_origin_geohash", "status", "origin_geohash", "departure_date", "origin_lat", "origin_lng", "id"),
+        Index(
+            "ix_trips_status_destination_geohash",
+            "status", "destination_geohash", "departure_date", "destination_lat", "destination_lng", "id",
+        ),
+    )
 
     carrier = relationship("User", back_populates="trips")
     vehicle = relationship("Vehicle", back_populates="trips")
@@ -85,7 +154,14 @@ class Booking(Base):
     paid_date = Column(Date)
     qr_generated = Column(Boolean, default=False)
     qr_generated_date = Column(Date)
-    
+    version = row_version()
+
+    __table_args__ = (
+        # Bookings on a trip (GET /bookings/trip/{id}, carrier listings, cascades)
+        Index("ix_bookings_trip_created", "trip_id", "created_date", "id"),
+        # A shipper's bookings newest first, and the export's date-range walk
+        Index("ix_bookings_shipper_created", "shipper_id", "created_date", "id"),
+    )
 
     trip = relationship("Trip", back_populates="bookings")
     shipper = relationship("User", back_populates="bookings")
@@ -103,6 +179,14 @@ class Payment(Base):
     status = Column(String(20), nullable=False)  # pending, completed, failed
     created_date = Column(Date, nullable=False)
     completed_date = Column(Date)
+    version = row_version()
+
+    __table_args__ = (
+        Index("ix_payments_booking_id", "booking_id"),
+        # GET /payments/me ORs the two sides; each gets its own index (BitmapOr on Postgres)
+        Index("ix_payments_from_user_created", "from_user_id", "created_date", "id"),
+        Index("ix_payments_to_user_created", "to_user_id", "created_date", "id"),
+    )
 
     booking = relationship("Booking", back_populates="payment")
     payer = relationship("User", foreign_keys=[from_user_id], back_populates="payments_sent")
@@ -119,6 +203,7 @@ class Review(Base):
     rating = Column(Integer, nullable=False)
     comment = Column(Text)
     created_date = Column(Date, nullable=False)
+    version = row_version()
 
     author = relationship("User", foreign_keys=[from_user_id], back_populates="reviews_written")
     recipient = relationship("User", foreign_keys=[to_user_id], back_populates="reviews_received")
@@ -126,4 +211,9 @@ class Review(Base):
 
     __table_args__ = (
         CheckConstraint("rating BETWEEN 1 AND 5", name="check_rating_range"),
+        # GET /reviews/ newest first; received reviews feed the rating rebuild
+        Index("ix_reviews_created", "created_date", "id"),
+        Index("ix_reviews_to_user_id", "to_user_id"),
+        Index("ix_reviews_from_user_id", "from_user_id"),
+        Index("ix_reviews_booking_id", "booking_id"),
     )
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import date
 from app import models, schemas, utils
@@ -8,13 +9,28 @@ from app.core.security import create_access_token
 
 auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Handlers are async so bcrypt waits on the dedicated hashing executor instead of
+# holding a request thread; the short DB calls still go through the threadpool.
+
+def _find_user_by_email(db: Session, email: str):
+    user = db.query(models.User).filter(models.User.email == email).first()
+    # Hand the connection back to the pool before the slow hash; the loaded row stays usable
+    db.close()
+    return user
+
+def _save(db: Session, instance):
+    db.add(instance)
+    db.commit()
+    db.refresh(instance)
+    return instance
+
 @auth_router.post("/register", response_model=UserOut)
-def register(user: UserRegister, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == user.email).first()
+async def register(user: UserRegister, db: Session = Depends(get_db)):
+    existing = await run_in_threadpool(_find_user_by_email, db, user.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_pw = utils.hash_password(user.password)
+    hashed_pw = await utils.hash_password_async(user.password)
 
     new_user = models.User(
         name=user.name,
@@ -24,17 +40,23 @@ def register(user: UserRegister, db: Session = Depends(get_db)):
         joined_date=date.today(),
         phone=user.phone
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
+    return await run_in_threadpool(_save, db, new_user)
 
 @auth_router.post("/login", response_model=TokenOut)
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if not db_user or not utils.verify_password(user.password, db_user.password_hash):
+async def login(user: UserLogin, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(_find_user_by_email, db, user.email)
+    if not db_user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    valid, new_hash = await utils.verify_and_update_password_async(user.password, db_user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    # Transparently move old hashes to the current work factor
+    if new_hash:
+        db_user.password_hash = new_hash
+        await run_in_threadpool(_save, db, db_user)
+
     token = create_access_token(data={"sub": str(db_user.id), "role": db_user.role})
 
     return {
@@ -42,5 +64,3 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
         "token_type": "bearer",
         "user": db_user
     }
-
-
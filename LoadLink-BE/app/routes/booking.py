@@ -1,10 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from datetime import date
+from uuid import UUID
 
 from app import models
-from app.schemas.booking import BookingResponse, BookingCreate, BookingUpdate
-from app.dependencies import get_db, get_current_user
+from app.schemas.booking import BookingResponse, BookingCreate, BookingBulkCreate, BookingUpdate
+from app.dependencies import get_db, get_current_user, invalidate_principal
+from app.core.pagination import CursorParams
+from app.core.etag import ConditionalGet, row_etag, rows_etag, version_probe
+from app.services.capacity import bulk_loads, lock_trips, plan_bulk_bookings, reserve_capacity, reserve_capacity_bulk
+from app.services.export import BOOKING_EXPORT_COLUMNS, ExportParams, export_response, stream_rows
+from app.services.ratings import apply_rating_delta, received_totals
+from app.services.trip_cache import invalidate_trip
+from app.services.trip_matching import trip_matcher
 
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
@@ -22,20 +31,19 @@ def create_booking(
             detail="Only shippers can create bookings",
         )
 
-    # Fetch the trip
-    trip = db.query(models.Trip).filter_by(id=booking_in.trip_id).first()
-    if not trip:
-        raise HTTPException(status_code=404, detail="Trip not found")
-
-    # Check if enough capacity is available
-    if booking_in.load_size > trip.available_capacity:
+    # Reserve capacity atomically; only look the trip up again to explain a failure
+    reserved = db.execute(reserve_capacity(booking_in.trip_id, booking_in.load_size)).first()
+    if reserved is None:
+        trip = db.query(models.Trip).filter_by(id=booking_in.trip_id).first()
+        if not trip:
+            raise HTTPException(status_code=404, detail="Trip not found")
         raise HTTPException(
             status_code=400,
             detail=f"Not enough capacity. Available: {trip.available_capacity} kg",
         )
 
     # Calculate total price
-    total_price = trip.price_per_kg * booking_in.load_size
+    total_price = reserved.price_per_kg * booking_in.load_size
 
     # Create booking
     booking = models.Booking(
@@ -48,31 +56,89 @@ def create_booking(
         notes=booking_in.notes,
     )
 
-    # Deduct capacity
-    trip.available_capacity -= booking_in.load_size
-
     db.add(booking)
     db.commit()
     db.refresh(booking)
+    invalidate_trip(booking_in.trip_id)
+    trip_matcher.set_capacity(booking_in.trip_id, reserved.available_capacity)
     return booking
 
 
+# Bulk create: one consignment split across several trips, booked all or nothing
+@router.post("/bulk", response_model=list[BookingResponse])
+def create_bookings_bulk(
+    bulk_in: BookingBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    if current_user.role != "shipper":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only shippers can create bookings",
+        )
+
+    loads = bulk_loads(bulk_in.bookings)
+    trips = (db.execute(lock_trips(list(loads)))).all()
+    rows = plan_bulk_bookings(bulk_in.bookings, loads, trips, current_user.id)
+
+    reserved = db.execute(reserve_capacity_bulk(loads))
+    if reserved.rowcount != len(loads):
+        # Only reachable without row locks (SQLite); the trips changed under us
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Trip capacity changed, please retry")
+
+    bookings = db.scalars(
+        insert(models.Booking).returning(models.Booking, sort_by_parameter_order=True), rows
+    ).all()
+    db.commit()
+    for trip in trips:
+        invalidate_trip(trip.id)
+        trip_matcher.set_capacity(trip.id, trip.available_capacity - loads[trip.id])
+    return bookings
+
+
 
-# Get All Bookings (shipper sees own, admin can see all)
+# Get All Bookings (shipper sees own, carrier sees bookings on own trips)
 @router.get("/", response_model=list[BookingResponse])
 def get_bookings(
+    page: CursorParams = Depends(),
+    cond: ConditionalGet = Depends(),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
+    query = db.query(models.Booking)
     if current_user.role == "shipper":
-        return db.query(models.Booking).filter_by(shipper_id=current_user.id).all()
-    return db.query(models.Booking).all()
+        query = query.filter_by(shipper_id=current_user.id)
+    else:
+        query = query.join(models.Trip).filter(models.Trip.carrier_id == current_user.id)
+    query = page.apply(query, models.Booking.created_date, models.Booking.id, descending=True)
+    if cond.conditional:
+        cond.check(rows_etag(version_probe(query, models.Booking).all()))
+    bookings = query.all()
+    cond.check(rows_etag(bookings))
+    return page.page(bookings, models.Booking.created_date, models.Booking.id)
+
+
+# Export bookings (same visibility as the list) as a streamed NDJSON or CSV download
+@router.get("/export")
+def export_bookings(
+    params: ExportParams = Depends(),
+    current_user: models.User = Depends(get_current_user),
+):
+    query = select(*BOOKING_EXPORT_COLUMNS)
+    if current_user.role == "shipper":
+        query = query.where(models.Booking.shipper_id == current_user.id)
+    else:
+        query = query.join(models.Trip, models.Booking.trip_id == models.Trip.id).where(models.Trip.carrier_id == current_user.id)
+    query = params.filter(query, models.Booking.created_date).order_by(models.Booking.created_date, models.Booking.id)
+    return export_response(stream_rows(query, params.fmt), params, "bookings")
 
 
 # Get Booking by ID
 @router.get("/{booking_id}", response_model=BookingResponse)
 def get_booking(
-    booking_id: str,
+    booking_id: UUID,
+    cond: ConditionalGet = Depends(),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -83,13 +149,14 @@ def get_booking(
     if current_user.role == "shipper" and booking.shipper_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
+    cond.check(row_etag(booking))
     return booking
 
 
 # Update Booking (shipper can only update notes, admin/carrier may change status)
 @router.put("/{booking_id}", response_model=BookingResponse)
 def update_booking(
-    booking_id: str,
+    booking_id: UUID,
     booking_in: BookingUpdate,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
@@ -118,7 +185,7 @@ def update_booking(
 # Delete Booking (shipper can delete only their own, admin can delete any)
 @router.delete("/{booking_id}", status_code=204)
 def delete_booking(
-    booking_id: str,
+    booking_id: UUID,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -129,14 +196,22 @@ def delete_booking(
     if current_user.role == "shipper" and booking.shipper_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
+    # Its reviews go with it (ORM cascade), so take them out of the reviewed users' aggregates first
+    retracted = db.execute(received_totals(models.Review.booking_id == booking.id)).all()
+    for user_id, total, count in retracted:
+        db.execute(apply_rating_delta(user_id, -total, -count))
     db.delete(booking)
     db.commit()
+    for user_id, _, _ in retracted:
+        invalidate_principal(user_id)
     return
 
 # Get all bookings for a specific trip
 @router.get("/trip/{trip_id}", response_model=list[BookingResponse])
 def get_bookings_by_trip(
-    trip_id: str,
+    trip_id: UUID,
+    page: CursorParams = Depends(),
+    cond: ConditionalGet = Depends(),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -149,9 +224,15 @@ def get_bookings_by_trip(
     if current_user.role == "carrier" and trip.carrier_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
+    query = db.query(models.Booking).filter_by(trip_id=trip_id)
     # Shipper can see their own bookings only
     if current_user.role == "shipper":
-        return db.query(models.Booking).filter_by(trip_id=trip_id, shipper_id=current_user.id).all()
+        query = query.filter_by(shipper_id=current_user.id)
+
+    query = page.apply(query, models.Booking.created_date, models.Booking.id, descending=True)
+    if cond.conditional:
+        cond.check(rows_etag(version_probe(query, models.Booking).all()))
+    bookings = query.all()
+    cond.check(rows_etag(bookings))
+    return page.page(bookings, models.Booking.created_date, models.Booking.id)
 
-    # Admin can see all bookings for this trip
-    return db.query(models.Booking).filter_by(trip_id=trip_id).all()
@@ -0,0 +1,237 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from uuid import UUID
+
+from app import models
+from app.schemas.booking import BookingResponse, BookingCreate, BookingBulkCreate, BookingUpdate
+from app.dependencies import get_async_db, get_current_user_async, invalidate_principal
+from app.core.pagination import CursorParams
+from app.core.etag import ConditionalGet, row_etag, rows_etag, version_probe
+from app.services.capacity import bulk_loads, lock_trips, plan_bulk_bookings, reserve_capacity, reserve_capacity_bulk
+from app.services.export import BOOKING_EXPORT_COLUMNS, ExportParams, export_response, stream_rows_async
+from app.services.ratings import apply_rating_delta, received_totals
+from app.services.trip_cache import invalidate_trip
+from app.services.trip_matching import trip_matcher
+
+# AsyncSession twin of app.routes.booking, mounted when settings.ASYNC_DB is on
+router = APIRouter(prefix="/bookings", tags=["Bookings"])
+
+
+@router.post("/", response_model=BookingResponse)
+async def create_booking(
+    booking_in: BookingCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    if current_user.role != "shipper":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only shippers can create bookings",
+        )
+
+    # Reserve capacity atomically; only look the trip up again to explain a failure
+    reserved = (await db.execute(reserve_capacity(booking_in.trip_id, booking_in.load_size))).first()
+    if reserved is None:
+        trip = await db.get(models.Trip, booking_in.trip_id)
+        if not trip:
+            raise HTTPException(status_code=404, detail="Trip not found")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Not enough capacity. Available: {trip.available_capacity} kg",
+        )
+
+    # Calculate total price
+    total_price = reserved.price_per_kg * booking_in.load_size
+
+    # Create booking
+    booking = models.Booking(
+        trip_id=booking_in.trip_id,
+        shipper_id=current_user.id,
+        load_size=booking_in.load_size,
+        total_price=total_price,
+        status="pending",
+        created_date=date.today(),
+        notes=booking_in.notes,
+    )
+
+    db.add(booking)
+    await db.commit()
+    await db.refresh(booking)
+    invalidate_trip(booking_in.trip_id)
+    trip_matcher.set_capacity(booking_in.trip_id, reserved.available_capacity)
+    return booking
+
+
+# Bulk create: one consignment split across several trips, booked all or nothing
+@router.post("/bulk", response_model=list[BookingResponse])
+async def create_bookings_bulk(
+    bulk_in: BookingBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    if current_user.role != "shipper":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only shippers can create bookings",
+        )
+
+    loads = bulk_loads(bulk_in.bookings)
+    trips = (await db.execute(lock_trips(list(loads)))).all()
+    rows = plan_bulk_bookings(bulk_in.bookings, loads, trips, current_user.id)
+
+    reserved = await db.execute(reserve_capacity_bulk(loads))
+    if reserved.rowcount != len(loads):
+        # Only reachable without row locks (SQLite); the trips changed under us
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Trip capacity changed, please retry")
+
+    bookings = (await db.scalars(
+        insert(models.Booking).returning(models.Booking, sort_by_parameter_order=True), rows
+    )).all()
+    await db.commit()
+    for trip in trips:
+        invalidate_trip(trip.id)
+        trip_matcher.set_capacity(trip.id, trip.available_capacity - loads[trip.id])
+    return bookings
+
+
+
+# Get All Bookings (shipper sees own, carrier sees bookings on own trips)
+@router.get("/", response_model=list[BookingResponse])
+async def get_bookings(
+    page: CursorParams = Depends(),
+    cond: ConditionalGet = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    query = select(models.Booking)
+    if current_user.role == "shipper":
+        query = query.filter_by(shipper_id=current_user.id)
+    else:
+        query = query.join(models.Trip).where(models.Trip.carrier_id == current_user.id)
+    query = page.apply(query, models.Booking.created_date, models.Booking.id, descending=True)
+    if cond.conditional:
+        cond.check(rows_etag((await db.execute(version_probe(query, models.Booking))).all()))
+    bookings = (await db.execute(query)).scalars().all()
+    cond.check(rows_etag(bookings))
+    return page.page(bookings, models.Booking.created_date, models.Booking.id)
+
+
+# Export bookings (same visibility as the list) as a streamed NDJSON or CSV download
+@router.get("/export")
+async def export_bookings(
+    params: ExportParams = Depends(),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    query = select(*BOOKING_EXPORT_COLUMNS)
+    if current_user.role == "shipper":
+        query = query.where(models.Booking.shipper_id == current_user.id)
+    else:
+        query = query.join(models.Trip, models.Booking.trip_id == models.Trip.id).where(models.Trip.carrier_id == current_user.id)
+    query = params.filter(query, models.Booking.created_date).order_by(models.Booking.created_date, models.Booking.id)
+    return export_response(stream_rows_async(query, params.fmt), params, "bookings")
+
+
+# Get Booking by ID
+@router.get("/{booking_id}", response_model=BookingResponse)
+async def get_booking(
+    booking_id: UUID,
+    cond: ConditionalGet = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    booking = (await db.execute(select(models.Booking).filter_by(id=booking_id))).scalar_one_or_none()
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    if current_user.role == "shipper" and booking.shipper_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    cond.check(row_etag(booking))
+    return booking
+
+
+# Update Booking (shipper can only update notes, admin/carrier may change status)
+@router.put("/{booking_id}", response_model=BookingResponse)
+async def update_booking(
+    booking_id: UUID,
+    booking_in: BookingUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    booking = (await db.execute(select(models.Booking).filter_by(id=booking_id))).scalar_one_or_none()
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    # Shipper can only update their own booking
+    if current_user.role == "shipper":
+        if booking.shipper_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        # Restrict shippers to updating only notes
+        if booking_in.notes is not None:
+            booking.notes = booking_in.notes
+    else:
+        # Admin/Carrier can update everything
+        for key, value in booking_in.dict(exclude_unset=True).items():
+            setattr(booking, key, value)
+
+    await db.commit()
+    await db.refresh(booking)
+    return booking
+
+
+# Delete Booking (shipper can delete only their own, admin can delete any)
+@router.delete("/{booking_id}", status_code=204)
+async def delete_booking(
+    booking_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    booking = (await db.execute(select(models.Booking).filter_by(id=booking_id))).scalar_one_or_none()
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    if current_user.role == "shipper" and booking.shipper_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    # Its reviews go with it (ORM cascade), so take them out of the reviewed users' aggregates first
+    retracted = (await db.execute(received_totals(models.Review.booking_id == booking.id))).all()
+    for user_id, total, count in retracted:
+        await db.execute(apply_rating_delta(user_id, -total, -count))
+    await db.delete(booking)
+    await db.commit()
+    for user_id, _, _ in retracted:
+        invalidate_principal(user_id)
+    return
+
+# Get all bookings for a specific trip
+@router.get("/trip/{trip_id}", response_model=list[BookingResponse])
+async def get_bookings_by_trip(
+    trip_id: UUID,
+    page: CursorParams = Depends(),
+    cond: ConditionalGet = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    # Check if the trip exists
+    trip = (await db.execute(select(models.Trip).filter_by(id=trip_id))).scalar_one_or_none()
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    # Authorization: Carrier can only see their own trips
+    if current_user.role == "carrier" and trip.carrier_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    query = select(models.Booking).filter_by(trip_id=trip_id)
+    # Shipper can see their own bookings only
+    if current_user.role == "shipper":
+        query = query.filter_by(shipper_id=current_user.id)
+
+    query = page.apply(query, models.Booking.created_date, models.Booking.id, descending=True)
+    if cond.conditional:
+        cond.check(rows_etag((await db.execute(version_probe(query, models.Booking))).all()))
+    bookings = (await db.execute(query)).scalars().all()
+    cond.check(rows_etag(bookings))
+    return page.page(bookings, models.Booking.created_date, models.Booking.id)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+
+from app.core.pool_metrics import pool_status
+from app import database
+from app.core.security import verified_token_cache
+from app.dependencies import principal_cache
+from app.services.trip_cache import trip_read_cache
+from app.services.trip_matching import trip_matcher
+
+health_router = APIRouter(prefix="/health", tags=["Health"])
+
+
+# ---------------------------
+# Connection pool occupancy (scraped by dashboards)
+# ---------------------------
+@health_router.get("/db-pool")
+def get_db_pool_status():
+    status = {"sync": pool_status(database.engine)}
+    if database.async_engine is not None:
+        status["async"] = pool_status(database.async_engine.sync_engine)
+    return status
+
+
+# ---------------------------
+# In-process cache hit ratios
+# ---------------------------
+@health_router.get("/caches")
+def get_cache_stats():
+    return {
+        "principals": principal_cache.stats(),
+        "verified_tokens": verified_token_cache.stats(),
+        "trip_reads": trip_read_cache.stats(),
+        "trip_matcher": trip_matcher.stats(),
+    }
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.models import User
+from app.core.config import settings
+from app.dependencies import get_current_user, get_db
+from app.schemas.location import LocationMatch
+from app.services.locations import location_search, search_rows, trigram_search
+
+location_router = APIRouter(
+    prefix="/locations",
+    tags=["locations"]
+)
+
+# ---------------------------
+# Autocomplete / fuzzy search over names and aliases
+# ---------------------------
+# pg_trgm on Postgres; elsewhere the in-process trigram index, reloaded from
+# location_aliases every LOCATION_SEARCH_REFRESH_SECONDS.
+@location_router.get("/search", response_model=list[LocationMatch])
+def search_locations(
+    q: str = Query(..., min_length=1, max_length=255),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if db.get_bind().dialect.name == "postgresql":
+        return [{"id": row.id, "name": row.name, "score": row.score} for row in db.execute(trigram_search(q, limit))]
+    if location_search.stale(settings.LOCATION_SEARCH_REFRESH_SECONDS):
+        location_search.load(db.execute(search_rows()).all())
+    return location_search.search(q, limit)
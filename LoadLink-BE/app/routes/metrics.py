@@ -0,0 +1,70 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.core.metrics import CONTENT_TYPE, Counter, Gauge, registry
+from app.core.pool_metrics import pool_status
+from app.core.security import verified_token_cache
+from app import database
+from app.dependencies import principal_cache
+from app.services.trip_cache import trip_read_cache
+
+metrics_router = APIRouter(tags=["Monitoring"])
+
+# (metric, help, stats key) read from pool_status() / cache stats() at scrape time
+POOL_METRICS = (
+    (Gauge, "db_pool_size", "Configured pool size.", "size"),
+    (Gauge, "db_pool_checked_out", "Connections currently checked out.", "checked_out"),
+    (Gauge, "db_pool_idle", "Idle connections in the pool.", "idle"),
+    (Gauge, "db_pool_overflow", "Overflow connections currently open.", "overflow"),
+    (Counter, "db_pool_connects_total", "New database connections opened by the pool.", "connects"),
+    (Counter, "db_pool_checkouts_total", "Successful connection checkouts.", "checkouts"),
+    (Counter, "db_pool_timeouts_total", "Checkouts that timed out waiting for a connection.", "timeouts"),
+    (Counter, "db_pool_wait_seconds_total", "Time spent waiting for connections.", "wait_seconds_total"),
+    (Counter, "db_pool_held_seconds_total", "Time connections spent checked out.", "held_seconds_total"),
+)
+CACHE_METRICS = (
+    (Gauge, "cache_entries", "Entries currently cached.", "size"),
+    (Gauge, "cache_max_entries", "Cache capacity.", "maxsize"),
+    (Counter, "cache_hits_total", "Cache hits.", "hits"),
+    (Counter, "cache_misses_total", "Cache misses.", "misses"),
+    (Counter, "cache_evictions_total", "Entries evicted for space.", "evictions"),
+)
+
+
+def _snapshot_metrics(definitions, label: str, stats_by_name: dict):
+    for kind, name, help_text, key in definitions:
+        metric = kind(name, help_text, (label,))
+        for owner, stats in stats_by_name.items():
+            if key in stats:
+                metric.inc(owner, amount=stats[key])
+        yield metric
+
+
+def _pool_metrics():
+    if database.engine is None:
+        return ()
+    pools = {"sync": pool_status(database.engine)}
+    if database.async_engine is not None:
+        pools["async"] = pool_status(database.async_engine.sync_engine)
+    return _snapshot_metrics(POOL_METRICS, "engine", pools)
+
+
+def _cache_metrics():
+    caches = {
+        "principals": principal_cache.stats(),
+        "verified_tokens": verified_token_cache.stats(),
+        "trip_reads": trip_read_cache.stats(),
+    }
+    return _snapshot_metrics(CACHE_METRICS, "cache", caches)
+
+
+registry.add_collector(_pool_metrics)
+registry.add_collector(_cache_metrics)
+
+
+# ---------------------------
+# Prometheus scrape endpoint
+# ---------------------------
+@metrics_router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
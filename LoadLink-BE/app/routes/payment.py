@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import date
 from uuid import UUID
@@ -6,6 +7,9 @@ from app.dependencies import get_current_user
 from app.models import Booking, Payment, Trip,User
 from app.database import get_db
 from app.schemas.payment import PaymentCreate, PaymentOut
+from app.core.pagination import CursorParams
+from app.core.etag import ConditionalGet, rows_etag, version_probe
+from app.services.export import PAYMENT_EXPORT_COLUMNS, ExportParams, export_response, stream_rows
 
 router = APIRouter()
 @router.post("/payments/{booking_id}", response_model=PaymentOut)
@@ -47,6 +51,8 @@ def create_payment(booking_id: UUID, db: Session = Depends(get_db)):
 
 @router.get("/payments/me", response_model=list[PaymentOut])
 def get_my_payments(
+    page: CursorParams = Depends(),
+    cond: ConditionalGet = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -54,16 +60,32 @@ def get_my_payments(
     Fetch all payments where the logged-in user is either sender (from_user_id)
     or receiver (to_user_id).
     """
-    payments = (
+    query = (
         db.query(Payment)
         .filter(
             (Payment.from_user_id == current_user.id)
             | (Payment.to_user_id == current_user.id)
         )
-        .all()
     )
+    query = page.apply(query, Payment.created_date, Payment.id, descending=True)
+    if cond.conditional:
+        cond.check(rows_etag(version_probe(query, Payment).all()))
+    rows = query.all()
+    cond.check(rows_etag(rows))
+    payments = page.page(rows, Payment.created_date, Payment.id)
 
-    if not payments:
+    if not payments and not page.cursor:
         raise HTTPException(status_code=404, detail="No payments found for this user")
 
-    return payments
\ No newline at end of file
+    return payments
+
+
+@router.get("/payments/me/export")
+def export_my_payments(params: ExportParams = Depends(), current_user: User = Depends(get_current_user)):
+    """Stream the same payments as /payments/me, oldest first, as NDJSON or CSV."""
+    query = select(*PAYMENT_EXPORT_COLUMNS).where(
+        (Payment.from_user_id == current_user.id)
+        | (Payment.to_user_id == current_user.id)
+    )
+    query = params.filter(query, Payment.created_date).order_by(Payment.created_date, Payment.id)
+    return export_response(stream_rows(query, params.fmt), params, "payments")
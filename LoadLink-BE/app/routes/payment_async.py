@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from uuid import UUID
+from app.dependencies import get_async_db, get_current_user_async
+from app.models import Booking, Payment, Trip,User
+from app.schemas.payment import PaymentCreate, PaymentOut
+from app.core.pagination import CursorParams
+from app.core.etag import ConditionalGet, rows_etag, version_probe
+from app.services.export import PAYMENT_EXPORT_COLUMNS, ExportParams, export_response, stream_rows_async
+
+# AsyncSession twin of app.routes.payment, mounted when settings.ASYNC_DB is on
+router = APIRouter()
+@router.post("/payments/{booking_id}", response_model=PaymentOut)
+async def create_payment(booking_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    booking = await db.get(Booking, booking_id)
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    if booking.status == "paid":
+        raise HTTPException(status_code=400, detail="Booking already paid")
+
+    trip = await db.get(Trip, booking.trip_id)
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    carrier_id = trip.carrier_id
+
+    today = date.today()
+    payment = Payment(
+        booking_id=booking.id,
+        from_user_id=booking.shipper_id,
+        to_user_id=carrier_id,
+        amount=float(booking.total_price),
+        status="completed",
+        created_date=today,
+        completed_date=today
+    )
+    db.add(payment)
+
+    # Update Booking
+    booking.status = "paid"
+    booking.paid_date = today
+
+    await db.commit()
+    await db.refresh(payment)
+
+    return payment
+
+
+@router.get("/payments/me", response_model=list[PaymentOut])
+async def get_my_payments(
+    page: CursorParams = Depends(),
+    cond: ConditionalGet = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Fetch all payments where the logged-in user is either sender (from_user_id)
+    or receiver (to_user_id).
+    """
+    query = (
+        select(Payment)
+        .where(
+            (Payment.from_user_id == current_user.id)
+            | (Payment.to_user_id == current_user.id)
+        )
+    )
+    query = page.apply(query, Payment.created_date, Payment.id, descending=True)
+    if cond.conditional:
+        cond.check(rows_etag((await db.execute(version_probe(query, Payment))).all()))
+    rows = (await db.execute(query)).scalars().all()
+    cond.check(rows_etag(rows))
+    payments = page.page(rows, Payment.created_date, Payment.id)
+
+    if not payments and not page.cursor:
+        raise HTTPException(status_code=404, detail="No payments found for this user")
+
+    return payments
+
+
+@router.get("/payments/me/export")
+async def export_my_payments(params: ExportParams = Depends(), current_user: User = Depends(get_current_user_async)):
+    """Stream the same payments as /payments/me, oldest first, as NDJSON or CSV."""
+    query = select(*PAYMENT_EXPORT_COLUMNS).where(
+        (Payment.from_user_id == current_user.id)
+        | (Payment.to_user_id == current_user.id)
+    )
+    query = params.filter(query, Payment.created_date).order_by(Payment.created_date, Payment.id)
+    return export_response(stream_rows_async(query, params.fmt), params, "payments")
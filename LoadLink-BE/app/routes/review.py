@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import date
+from uuid import UUID
 
 from app import models
 from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewResponse
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_db, get_current_user, invalidate_principal
+from app.core.pagination import CursorParams
+from app.core.etag import ConditionalGet, row_etag, rows_etag, version_probe
+from app.services.ratings import apply_rating_delta
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
@@ -36,6 +40,7 @@ def create_review(
     )
 
     db.add(review)
+    db.execute(apply_rating_delta(review_in.to_user_id, review_in.rating, 1))
 
     # ------------------
     # Update booking review flags
@@ -46,6 +51,7 @@ def create_review(
         booking.carrier_reviewed = True
 
     db.commit()
+    invalidate_principal(review_in.to_user_id)
     db.refresh(review)
     return review
 
@@ -55,10 +61,17 @@ def create_review(
 # ------------------
 @router.get("/", response_model=list[ReviewResponse])
 def get_reviews(
+    page: CursorParams = Depends(),
+    cond: ConditionalGet = Depends(),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    return db.query(models.Review).all()
+    query = page.apply(db.query(models.Review), models.Review.created_date, models.Review.id, descending=True)
+    if cond.conditional:
+        cond.check(rows_etag(version_probe(query, models.Review).all()))
+    reviews = query.all()
+    cond.check(rows_etag(reviews))
+    return page.page(reviews, models.Review.created_date, models.Review.id)
 
 # ------------------
 # Get Review by ID
@@ -66,12 +79,14 @@ def get_reviews(
 @router.get("/{review_id}", response_model=ReviewResponse)
 def get_review(
     review_id: str,
+    cond: ConditionalGet = Depends(),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     review = db.query(models.Review).filter_by(id=review_id).first()
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
+    cond.check(row_etag(review))
     return review
 
 # ------------------
@@ -79,7 +94,7 @@ def get_review(
 # ------------------
 @router.put("/{review_id}", response_model=ReviewResponse)
 def update_review(
-    review_id: str,
+    review_id: UUID,
     review_in: ReviewUpdate,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
@@ -92,10 +107,17 @@ def update_review(
     if review.from_user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    for key, value in review_in.dict(exclude_unset=True).items():
+    fields = review_in.dict(exclude_unset=True)
+    if "rating" in fields and fields["rating"] is None:
+        raise HTTPException(status_code=400, detail="Rating cannot be removed, only changed")
+    old_rating = review.rating
+    for key, value in fields.items():
         setattr(review, key, value)
+    if review.rating != old_rating:
+        db.execute(apply_rating_delta(review.to_user_id, review.rating - old_rating, 0))
 
     db.commit()
+    invalidate_principal(review.to_user_id)
     db.refresh(review)
     return review
 
@@ -104,7 +126,7 @@ def update_review(
 # ------------------
 @router.delete("/{review_id}", status_code=204)
 def delete_review(
-    review_id: str,
+    review_id: UUID,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
@@ -117,5 +139,7 @@ def delete_review(
         raise HTTPException(status_code=403, detail="Not authorized")
 
     db.delete(review)
+    db.execute(apply_rating_delta(review.to_user_id, -review.rating, -1))
     db.commit()
+    invalidate_principal(review.to_user_id)
     return
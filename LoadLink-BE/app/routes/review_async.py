@@ -0,0 +1,150 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from uuid import UUID
+
+from app import models
+from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewResponse
+from app.dependencies import get_async_db, get_current_user_async, invalidate_principal
+from app.core.pagination import CursorParams
+from app.core.etag import ConditionalGet, row_etag, rows_etag, version_probe
+from app.services.ratings import apply_rating_delta
+
+# AsyncSession twin of app.routes.review, mounted when settings.ASYNC_DB is on
+router = APIRouter(prefix="/reviews", tags=["Reviews"])
+
+# ------------------
+# Create Review
+# ------------------
+@router.post("/", response_model=ReviewResponse)
+async def create_review(
+    review_in: ReviewCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    # Check if booking exists
+    booking = await db.get(models.Booking, review_in.booking_id)
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    # Prevent user from reviewing themselves
+    if review_in.to_user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="Cannot review yourself")
+
+    review = models.Review(
+        booking_id=review_in.booking_id,
+        from_user_id=current_user.id,
+        to_user_id=review_in.to_user_id,
+        rating=review_in.rating,
+        comment=review_in.comment,
+        created_date=date.today()
+    )
+
+    db.add(review)
+    await db.execute(apply_rating_delta(review_in.to_user_id, review_in.rating, 1))
+
+    # ------------------
+    # Update booking review flags
+    # ------------------
+    # Lazy loads are not available on AsyncSession, so fetch the trip explicitly
+    if current_user.id == booking.shipper_id:
+        booking.shipper_reviewed = True
+    else:
+        trip = await db.get(models.Trip, booking.trip_id)
+        if trip and current_user.id == trip.carrier_id:
+            booking.carrier_reviewed = True
+
+    await db.commit()
+    invalidate_principal(review_in.to_user_id)
+    await db.refresh(review)
+    return review
+
+
+# ------------------
+# Get All Reviews
+# ------------------
+@router.get("/", response_model=list[ReviewResponse])
+async def get_reviews(
+    page: CursorParams = Depends(),
+    cond: ConditionalGet = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    query = page.apply(select(models.Review), models.Review.created_date, models.Review.id, descending=True)
+    if cond.conditional:
+        cond.check(rows_etag((await db.execute(version_probe(query, models.Review))).all()))
+    reviews = (await db.execute(query)).scalars().all()
+    cond.check(rows_etag(reviews))
+    return page.page(reviews, models.Review.created_date, models.Review.id)
+
+# ------------------
+# Get Review by ID
+# ------------------
+@router.get("/{review_id}", response_model=ReviewResponse)
+async def get_review(
+    review_id: str,
+    cond: ConditionalGet = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    review = (await db.execute(select(models.Review).filter_by(id=review_id))).scalar_one_or_none()
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    cond.check(row_etag(review))
+    return review
+
+# ------------------
+# Update Review
+# ------------------
+@router.put("/{review_id}", response_model=ReviewResponse)
+async def update_review(
+    review_id: UUID,
+    review_in: ReviewUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    review = (await db.execute(select(models.Review).filter_by(id=review_id))).scalar_one_or_none()
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    # Only author can update
+    if review.from_user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    fields = review_in.dict(exclude_unset=True)
+    if "rating" in fields and fields["rating"] is None:
+        raise HTTPException(status_code=400, detail="Rating cannot be removed, only changed")
+    old_rating = review.rating
+    for key, value in fields.items():
+        setattr(review, key, value)
+    if review.rating != old_rating:
+        await db.execute(apply_rating_delta(review.to_user_id, review.rating - old_rating, 0))
+
+    await db.commit()
+    invalidate_principal(review.to_user_id)
+    await db.refresh(review)
+    return review
+
+# ------------------
+# Delete Review
+# ------------------
+@router.delete("/{review_id}", status_code=204)
+async def delete_review(
+    review_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    review = (await db.execute(select(models.Review).filter_by(id=review_id))).scalar_one_or_none()
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    # Only author can delete
+    if review.from_user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    await db.delete(review)
+    await db.execute(apply_rating_delta(review.to_user_id, -review.rating, -1))
+    await db.commit()
+    invalidate_principal(review.to_user_id)
+    return
@@ -1,10 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from uuid import UUID
-from app.models import Trip, Vehicle, User
+from datetime import date
+from typing import Literal, Optional
+from app.models import Booking, Review, Trip, Vehicle, User
 from app.schemas.trip import TripUpdate
-from app.schemas.trip import TripCreate, TripOut
-from app.dependencies import get_current_user, get_db
+from app.schemas.trip import TripCreate, TripImportReport, TripNearbyOut, TripOut
+from app.core.config import settings
+from app.core.pagination import CursorParams
+from app.core.etag import ConditionalGet, row_etag, rows_etag, version_probe
+from app.services.trip_import import TripImport, import_format, iter_batches, write_trips
+from app.services.trip_search import trip_search_filters
+from app.services.trip_matching import MATCH_ATTEMPTS, fresh_matches, match_query, trip_matcher
+from app.services.trip_nearby import NearbyParams, in_distance_order
+from app.services.locations import alias_lookup, assign_locations, location_key, resolve_locations, trip_geometry
+from app.services.trip_cache import ALL_ACTIVE_KEY, invalidate_trip, serialize_trip, serialize_trips, trip_key, trip_read_cache
+from app.services.ratings import apply_rating_delta, received_totals
+from app.dependencies import get_current_user, get_db, invalidate_principal
 
 trip_router = APIRouter(
     prefix="/trips",
@@ -37,6 +51,10 @@ def create_trip(
     if available_capacity > total_capacity:
         raise HTTPException(status_code=400, detail="Available capacity cannot exceed vehicle capacity")
     
+    # Route endpoints as locations (new spellings get a location of their own), with points and cells
+    locations = resolve_locations(db, [trip_in.origin, trip_in.destination])
+    places = {"origin": locations[trip_in.origin], "destination": locations[trip_in.destination]}
+
     # Create trip
     trip = Trip(
         carrier_id=current_user.id,
@@ -49,45 +67,181 @@ def create_trip(
         total_capacity=total_capacity,
         available_capacity=available_capacity,
         status=trip_in.status,
-        description=trip_in.description
+        description=trip_in.description,
+        **trip_geometry(places, trip_in.dict()),
     )
 
     db.add(trip)
     db.commit()
     db.refresh(trip)
+    invalidate_trip(trip.id)
+    trip_matcher.upsert(trip)
     return trip
 
+# ---------------------------
+# Bulk import (CSV or NDJSON body, streamed)
+# ---------------------------
+# The body is parsed as it arrives and written in TRIP_IMPORT_BATCH_SIZE batches inside
+# one transaction: valid rows are committed together at the end, invalid ones are reported.
+@trip_router.post("/import", response_model=TripImportReport)
+async def import_trips(
+    request: Request,
+    fmt: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "carrier":
+        raise HTTPException(status_code=403, detail="Only carriers can create trips")
+    fmt = import_format(request.headers.get("content-type"), fmt)
+
+    job = TripImport(current_user.id)
+    async for batch in iter_batches(request.stream(), fmt, settings.TRIP_IMPORT_BATCH_SIZE):
+        trips = job.validate(batch)
+        lookup = job.vehicle_lookup(trips)
+        if lookup is not None:
+            job.add_vehicles(await run_in_threadpool(lambda: db.execute(lookup).all()))
+        rows = job.build(trips)
+        if rows:
+            await run_in_threadpool(assign_locations, db, rows)
+            await run_in_threadpool(write_trips, db, rows)
+            # Indexed batch by batch so the rows aren't held until the commit; if it
+            # fails, fresh_matches drops the ids it can't read back
+            trip_matcher.upsert_many(rows)
+
+    await run_in_threadpool(db.commit)
+    trip_read_cache.invalidate(ALL_ACTIVE_KEY)
+    return job.report()
+
 # ---------------------------
 # 1. View all active trips (for shippers)
 # ---------------------------
 @trip_router.get("/all", response_model=list[TripOut])
-def get_all_trips(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    trips = db.query(Trip).filter(Trip.status == "active").all()
-    return trips
+def get_all_trips(cond: ConditionalGet = Depends(), db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    query = db.query(Trip).filter(Trip.status == "active").order_by(Trip.departure_date, Trip.id)
+    # Current versions come from the database on every read, so another worker's writes are never served stale
+    etag = rows_etag(version_probe(query, Trip).all())
+    cond.check(etag)
+    cached = trip_read_cache.get(ALL_ACTIVE_KEY, etag)
+    if cached is None:
+        generation = trip_read_cache.generation()
+        trips = query.all()
+        cached = (rows_etag(trips), serialize_trips(trips))
+        trip_read_cache.fill(ALL_ACTIVE_KEY, generation, cached)
+    return cond.respond(*cached)
 
 
 # ---------------------------
 # 2. View carrier's own trips (for carriers)
 # ---------------------------
 @trip_router.get("/my", response_model=list[TripOut])
-def get_my_trips(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_my_trips(page: CursorParams = Depends(), cond: ConditionalGet = Depends(), db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if current_user.role != "carrier":
         raise HTTPException(status_code=403, detail="Only carriers can view their own trips")
     
-    trips = db.query(Trip).filter(Trip.carrier_id == current_user.id).all()
-    return trips
+    # Trips carry no created date; latest departures come first
+    query = page.apply(db.query(Trip).filter(Trip.carrier_id == current_user.id), Trip.departure_date, Trip.id, descending=True)
+    if cond.conditional:
+        cond.check(rows_etag(version_probe(query, Trip).all()))
+    trips = query.all()
+    cond.check(rows_etag(trips))
+    return page.page(trips, Trip.departure_date, Trip.id)
+
+
+# ---------------------------
+# 3. Search active trips (keyset paginated)
+# ---------------------------
+@trip_router.get("/search", response_model=list[TripOut])
+def search_trips(
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    departure_from: Optional[date] = None,
+    departure_to: Optional[date] = None,
+    min_capacity: Optional[int] = Query(None, ge=0),
+    max_price_per_kg: Optional[float] = Query(None, ge=0),
+    page: CursorParams = Depends(),
+    cond: ConditionalGet = Depends(),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    query = db.query(Trip).filter(*trip_search_filters(
+        origin, destination, departure_from, departure_to, min_capacity, max_price_per_kg
+    ))
+    query = page.apply(query, Trip.departure_date, Trip.id)
+    if cond.conditional:
+        cond.check(rows_etag(version_probe(query, Trip).all()))
+    trips = query.all()
+    cond.check(rows_etag(trips))
+    return page.page(trips, Trip.departure_date, Trip.id)
+
+
+# ---------------------------
+# 4. Match a load to trips (cheapest first)
+# ---------------------------
+# Ranked from the in-memory trip_matcher index once it has loaded; the matched rows are
+# then re-read by primary key so capacity and status are current, and stale ones replaced.
+@trip_router.get("/match", response_model=list[TripOut])
+def match_trips(
+    origin: str,
+    destination: str,
+    load_size: int = Query(..., gt=0),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    date_from = date_from or date.today()
+    if not (settings.TRIP_MATCH_INDEX and trip_matcher.loaded):
+        return db.scalars(match_query(origin, destination, date_from, date_to, load_size, limit)).all()
+
+    ids = dict(db.execute(alias_lookup([origin, destination])).all())
+    origin_id, destination_id = ids.get(location_key(origin)), ids.get(location_key(destination))
+    if origin_id is None or destination_id is None:
+        return []
+    for _ in range(MATCH_ATTEMPTS):
+        trip_ids = trip_matcher.match(origin_id, destination_id, date_from, date_to, load_size, limit)
+        if not trip_ids:
+            return []
+        trips = db.query(Trip).filter(Trip.id.in_(trip_ids)).all()
+        matches = fresh_matches(trip_ids, trips, load_size, date_from, date_to)
+        # Stale hits were corrected in the index, so matching again fills their places
+        if len(matches) == len(trip_ids):
+            return matches
+    return db.scalars(match_query(origin, destination, date_from, date_to, load_size, limit)).all()
+
+
+# ---------------------------
+# Trips near a point or in a box
+# ---------------------------
+@trip_router.get("/nearby", response_model=list[TripNearbyOut])
+def nearby_trips(near: NearbyParams = Depends(), db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    ranked = near.rank(db.execute(near.candidates()).all())
+    if not ranked:
+        return []
+    trips = db.query(Trip).filter(Trip.id.in_([trip_id for trip_id, _ in ranked])).all()
+    return in_distance_order(trips, ranked)
 
 
 # ---------------------------
 # Get Trip by ID
 # ---------------------------
 @trip_router.get("/{trip_id}", response_model=TripOut)
-def get_trip(trip_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
-    if not trip:
+def get_trip(trip_id: UUID, cond: ConditionalGet = Depends(), db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    current = db.query(Trip.id, Trip.version).filter(Trip.id == trip_id).first()
+    if not current:
         raise HTTPException(status_code=404, detail="Trip not found")
-    
-    return trip
+    etag = row_etag(current)
+    cond.check(etag)
+    cached = trip_read_cache.get(trip_key(trip_id), etag)
+    if cached is None:
+        generation = trip_read_cache.generation()
+        trip = db.query(Trip).filter(Trip.id == trip_id).first()
+        if not trip:
+            raise HTTPException(status_code=404, detail="Trip not found")
+        cached = (row_etag(trip), serialize_trip(trip))
+        trip_read_cache.fill(trip_key(trip_id), generation, cached)
+
+    return cond.respond(*cached)
 
 # ---------------------------
 # Update Trip
@@ -116,8 +270,16 @@ def update_trip(
         trip.vehicle_id = trip_in.vehicle_id
     
     # Update optional fields
-    for field, value in trip_in.dict(exclude_unset=True).items():
+    fields = trip_in.dict(exclude_unset=True)
+    for field, value in fields.items():
         setattr(trip, field, value)
+    # Ends given a new place or new coordinates get their location, point and cell recomputed
+    moved = [end for end in ("origin", "destination") if fields.keys() & {end, f"{end}_lat", f"{end}_lng"}]
+    if moved:
+        locations = resolve_locations(db, [trip.origin, trip.destination])
+        places = {"origin": locations[trip.origin], "destination": locations[trip.destination]}
+        for column, value in trip_geometry(places, fields, moved).items():
+            setattr(trip, column, value)
 
     # If available_capacity not provided, keep current or validate against vehicle capacity
     if trip.available_capacity > trip.total_capacity:
@@ -125,6 +287,8 @@ def update_trip(
 
     db.commit()
     db.refresh(trip)
+    invalidate_trip(trip.id)
+    trip_matcher.upsert(trip)
     return trip
 
 
@@ -139,6 +303,14 @@ def delete_trip(trip_id: UUID, db: Session = Depends(get_db), current_user: User
     if trip.carrier_id != current_user.id:
         raise HTTPException(status_code=403, detail="You do not own this trip")
     
+    # Its bookings' reviews go with it (ORM cascade), so take them out of the reviewed users' aggregates first
+    retracted = db.execute(received_totals(Review.booking_id.in_(select(Booking.id).where(Booking.trip_id == trip.id)))).all()
+    for user_id, total, count in retracted:
+        db.execute(apply_rating_delta(user_id, -total, -count))
     db.delete(trip)
     db.commit()
+    for user_id, _, _ in retracted:
+        invalidate_principal(user_id)
+    invalidate_trip(trip_id)
+    trip_matcher.remove(trip_id)
     return
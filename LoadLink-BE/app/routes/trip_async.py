@@ -0,0 +1,316 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from datetime import date
+from typing import Literal, Optional
+from app.models import Booking, Review, Trip, Vehicle, User
+from app.schemas.trip import TripUpdate
+from app.schemas.trip import TripCreate, TripImportReport, TripNearbyOut, TripOut
+from app.core.config import settings
+from app.core.pagination import CursorParams
+from app.core.etag import ConditionalGet, row_etag, rows_etag, version_probe
+from app.services.trip_import import TripImport, import_format, iter_batches, write_trips_async
+from app.services.trip_search import trip_search_filters
+from app.services.trip_matching import MATCH_ATTEMPTS, fresh_matches, match_query, trip_matcher
+from app.services.trip_nearby import NearbyParams, in_distance_order
+from app.services.locations import alias_lookup, assign_locations_async, location_key, resolve_locations_async, trip_geometry
+from app.services.trip_cache import ALL_ACTIVE_KEY, invalidate_trip, serialize_trip, serialize_trips, trip_key, trip_read_cache
+from app.services.ratings import apply_rating_delta, received_totals
+from app.dependencies import get_current_user_async, get_async_db, invalidate_principal
+
+# AsyncSession twin of app.routes.trip, mounted when settings.ASYNC_DB is on
+trip_router = APIRouter(
+    prefix="/trips",
+    tags=["trips"]
+)
+
+# ---------------------------
+# Create Trip
+# ---------------------------
+@trip_router.post("/", response_model=TripOut)
+async def create_trip(
+    trip_in: TripCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    # Only carriers can create trips
+    if current_user.role != "carrier":
+        raise HTTPException(status_code=403, detail="Only carriers can create trips")
+
+    # Check vehicle existence and ownership
+    vehicle = await db.get(Vehicle, trip_in.vehicle_id)
+    if not vehicle:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+    if vehicle.carrier_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Vehicle does not belong to you")
+
+    # Determine capacities
+    total_capacity = vehicle.capacity
+    available_capacity = trip_in.available_capacity or total_capacity
+    if available_capacity > total_capacity:
+        raise HTTPException(status_code=400, detail="Available capacity cannot exceed vehicle capacity")
+
+    # Route endpoints as locations (new spellings get a location of their own), with points and cells
+    locations = await resolve_locations_async(db, [trip_in.origin, trip_in.destination])
+    places = {"origin": locations[trip_in.origin], "destination": locations[trip_in.destination]}
+
+    # Create trip
+    trip = Trip(
+        carrier_id=current_user.id,
+        vehicle_id=trip_in.vehicle_id,
+        origin=trip_in.origin,
+        destination=trip_in.destination,
+        departure_date=trip_in.departure_date,
+        arrival_date=trip_in.arrival_date,
+        price_per_kg=trip_in.price_per_kg,
+        total_capacity=total_capacity,
+        available_capacity=available_capacity,
+        status=trip_in.status,
+        description=trip_in.description,
+        **trip_geometry(places, trip_in.dict()),
+    )
+
+    db.add(trip)
+    await db.commit()
+    await db.refresh(trip)
+    invalidate_trip(trip.id)
+    trip_matcher.upsert(trip)
+    return trip
+
+# ---------------------------
+# Bulk import (CSV or NDJSON body, streamed)
+# ---------------------------
+# The body is parsed as it arrives and written in TRIP_IMPORT_BATCH_SIZE batches inside
+# one transaction: valid rows are committed together at the end, invalid ones are reported.
+@trip_router.post("/import", response_model=TripImportReport)
+async def import_trips(
+    request: Request,
+    fmt: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    if current_user.role != "carrier":
+        raise HTTPException(status_code=403, detail="Only carriers can create trips")
+    fmt = import_format(request.headers.get("content-type"), fmt)
+
+    job = TripImport(current_user.id)
+    async for batch in iter_batches(request.stream(), fmt, settings.TRIP_IMPORT_BATCH_SIZE):
+        trips = job.validate(batch)
+        lookup = job.vehicle_lookup(trips)
+        if lookup is not None:
+            job.add_vehicles((await db.execute(lookup)).all())
+        rows = job.build(trips)
+        if rows:
+            await assign_locations_async(db, rows)
+            await write_trips_async(db, rows)
+            # Indexed batch by batch so the rows aren't held until the commit; if it
+            # fails, fresh_matches drops the ids it can't read back
+            trip_matcher.upsert_many(rows)
+
+    await db.commit()
+    trip_read_cache.invalidate(ALL_ACTIVE_KEY)
+    return job.report()
+
+# ---------------------------
+# 1. View all active trips (for shippers)
+# ---------------------------
+@trip_router.get("/all", response_model=list[TripOut])
+async def get_all_trips(cond: ConditionalGet = Depends(), db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    query = select(Trip).where(Trip.status == "active").order_by(Trip.departure_date, Trip.id)
+    # Current versions come from the database on every read, so another worker's writes are never served stale
+    etag = rows_etag((await db.execute(version_probe(query, Trip))).all())
+    cond.check(etag)
+    cached = trip_read_cache.get(ALL_ACTIVE_KEY, etag)
+    if cached is None:
+        generation = trip_read_cache.generation()
+        result = await db.execute(query)
+        trips = result.scalars().all()
+        cached = (rows_etag(trips), serialize_trips(trips))
+        trip_read_cache.fill(ALL_ACTIVE_KEY, generation, cached)
+    return cond.respond(*cached)
+
+
+# ---------------------------
+# 2. View carrier's own trips (for carriers)
+# ---------------------------
+@trip_router.get("/my", response_model=list[TripOut])
+async def get_my_trips(page: CursorParams = Depends(), cond: ConditionalGet = Depends(), db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    if current_user.role != "carrier":
+        raise HTTPException(status_code=403, detail="Only carriers can view their own trips")
+
+    # Trips carry no created date; latest departures come first
+    query = page.apply(select(Trip).where(Trip.carrier_id == current_user.id), Trip.departure_date, Trip.id, descending=True)
+    if cond.conditional:
+        cond.check(rows_etag((await db.execute(version_probe(query, Trip))).all()))
+    trips = (await db.execute(query)).scalars().all()
+    cond.check(rows_etag(trips))
+    return page.page(trips, Trip.departure_date, Trip.id)
+
+
+# ---------------------------
+# 3. Search active trips (keyset paginated)
+# ---------------------------
+@trip_router.get("/search", response_model=list[TripOut])
+async def search_trips(
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    departure_from: Optional[date] = None,
+    departure_to: Optional[date] = None,
+    min_capacity: Optional[int] = Query(None, ge=0),
+    max_price_per_kg: Optional[float] = Query(None, ge=0),
+    page: CursorParams = Depends(),
+    cond: ConditionalGet = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    query = select(Trip).where(*trip_search_filters(
+        origin, destination, departure_from, departure_to, min_capacity, max_price_per_kg
+    ))
+    query = page.apply(query, Trip.departure_date, Trip.id)
+    if cond.conditional:
+        cond.check(rows_etag((await db.execute(version_probe(query, Trip))).all()))
+    trips = (await db.execute(query)).scalars().all()
+    cond.check(rows_etag(trips))
+    return page.page(trips, Trip.departure_date, Trip.id)
+
+
+# ---------------------------
+# 4. Match a load to trips (cheapest first)
+# ---------------------------
+# Ranked from the in-memory trip_matcher index once it has loaded; the matched rows are
+# then re-read by primary key so capacity and status are current, and stale ones replaced.
+@trip_router.get("/match", response_model=list[TripOut])
+async def match_trips(
+    origin: str,
+    destination: str,
+    load_size: int = Query(..., gt=0),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    date_from = date_from or date.today()
+    if not (settings.TRIP_MATCH_INDEX and trip_matcher.loaded):
+        return (await db.scalars(match_query(origin, destination, date_from, date_to, load_size, limit))).all()
+
+    ids = dict((await db.execute(alias_lookup([origin, destination]))).all())
+    origin_id, destination_id = ids.get(location_key(origin)), ids.get(location_key(destination))
+    if origin_id is None or destination_id is None:
+        return []
+    for _ in range(MATCH_ATTEMPTS):
+        trip_ids = trip_matcher.match(origin_id, destination_id, date_from, date_to, load_size, limit)
+        if not trip_ids:
+            return []
+        trips = (await db.scalars(select(Trip).where(Trip.id.in_(trip_ids)))).all()
+        matches = fresh_matches(trip_ids, trips, load_size, date_from, date_to)
+        # Stale hits were corrected in the index, so matching again fills their places
+        if len(matches) == len(trip_ids):
+            return matches
+    return (await db.scalars(match_query(origin, destination, date_from, date_to, load_size, limit))).all()
+
+
+# ---------------------------
+# Trips near a point or in a box
+# ---------------------------
+@trip_router.get("/nearby", response_model=list[TripNearbyOut])
+async def nearby_trips(near: NearbyParams = Depends(), db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    ranked = near.rank((await db.execute(near.candidates())).all())
+    if not ranked:
+        return []
+    trips = (await db.scalars(select(Trip).where(Trip.id.in_([trip_id for trip_id, _ in ranked])))).all()
+    return in_distance_order(trips, ranked)
+
+
+# ---------------------------
+# Get Trip by ID
+# ---------------------------
+@trip_router.get("/{trip_id}", response_model=TripOut)
+async def get_trip(trip_id: UUID, cond: ConditionalGet = Depends(), db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    current = (await db.execute(select(Trip.id, Trip.version).where(Trip.id == trip_id))).first()
+    if not current:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    etag = row_etag(current)
+    cond.check(etag)
+    cached = trip_read_cache.get(trip_key(trip_id), etag)
+    if cached is None:
+        generation = trip_read_cache.generation()
+        trip = await db.get(Trip, trip_id)
+        if not trip:
+            raise HTTPException(status_code=404, detail="Trip not found")
+        cached = (row_etag(trip), serialize_trip(trip))
+        trip_read_cache.fill(trip_key(trip_id), generation, cached)
+
+    return cond.respond(*cached)
+
+# ---------------------------
+# Update Trip
+# ---------------------------
+@trip_router.put("/{trip_id}", response_model=TripOut)
+async def update_trip(
+    trip_id: UUID,
+    trip_in: TripUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    trip = await db.get(Trip, trip_id)
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    if trip.carrier_id != current_user.id:
+        raise HTTPException(status_code=403, detail="You do not own this trip")
+
+    # If vehicle_id is being updated, check ownership
+    if trip_in.vehicle_id and trip_in.vehicle_id != trip.vehicle_id:
+        vehicle = await db.get(Vehicle, trip_in.vehicle_id)
+        if not vehicle:
+            raise HTTPException(status_code=404, detail="Vehicle not found")
+        if vehicle.carrier_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Vehicle does not belong to you")
+        trip.vehicle_id = trip_in.vehicle_id
+
+    # Update optional fields
+    fields = trip_in.dict(exclude_unset=True)
+    for field, value in fields.items():
+        setattr(trip, field, value)
+    # Ends given a new place or new coordinates get their location, point and cell recomputed
+    moved = [end for end in ("origin", "destination") if fields.keys() & {end, f"{end}_lat", f"{end}_lng"}]
+    if moved:
+        locations = await resolve_locations_async(db, [trip.origin, trip.destination])
+        places = {"origin": locations[trip.origin], "destination": locations[trip.destination]}
+        for column, value in trip_geometry(places, fields, moved).items():
+            setattr(trip, column, value)
+
+    # If available_capacity not provided, keep current or validate against vehicle capacity
+    if trip.available_capacity > trip.total_capacity:
+        trip.available_capacity = trip.total_capacity
+
+    await db.commit()
+    await db.refresh(trip)
+    invalidate_trip(trip.id)
+    trip_matcher.upsert(trip)
+    return trip
+
+
+# ---------------------------
+# Delete Trip
+# ---------------------------
+@trip_router.delete("/{trip_id}", status_code=204)
+async def delete_trip(trip_id: UUID, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    trip = await db.get(Trip, trip_id)
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    if trip.carrier_id != current_user.id:
+        raise HTTPException(status_code=403, detail="You do not own this trip")
+
+    # Its bookings' reviews go with it (ORM cascade), so take them out of the reviewed users' aggregates first
+    retracted = (await db.execute(received_totals(Review.booking_id.in_(select(Booking.id).where(Booking.trip_id == trip.id))))).all()
+    for user_id, total, count in retracted:
+        await db.execute(apply_rating_delta(user_id, -total, -count))
+    await db.delete(trip)
+    await db.commit()
+    for user_id, _, _ in retracted:
+        invalidate_principal(user_id)
+    invalidate_trip(trip_id)
+    trip_matcher.remove(trip_id)
+    return
@@ -1,10 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from uuid import UUID
 
-from app.models import Vehicle, User
-from app.dependencies import get_current_user, get_db
+from app.models import Booking, Review, Trip, Vehicle, User
+from app.dependencies import get_current_user, get_db, invalidate_principal
+from app.services.ratings import apply_rating_delta, received_totals
+from app.services.trip_cache import invalidate_trip
+from app.services.trip_matching import trip_matcher
 from app.schemas.vehicle import VehicleCreate, VehicleOut
+from app.core.pagination import CursorParams
+from app.core.etag import ConditionalGet, row_etag, rows_etag, version_probe
 
 vehicle_router = APIRouter(
     prefix="/vehicles",
@@ -49,21 +55,27 @@ def create_vehicle(
 # Get All Vehicles of Current Carrier
 # ---------------------------
 @vehicle_router.get("/", response_model=list[VehicleOut])
-def get_vehicles(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_vehicles(page: CursorParams = Depends(), cond: ConditionalGet = Depends(), db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if current_user.role != "carrier":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only carriers can view their vehicles")
     
-    vehicles = db.query(Vehicle).filter(Vehicle.carrier_id == current_user.id).all()
-    return vehicles
+    # Vehicles carry no created date, so the id alone is the keyset
+    query = page.apply(db.query(Vehicle).filter(Vehicle.carrier_id == current_user.id), Vehicle.id)
+    if cond.conditional:
+        cond.check(rows_etag(version_probe(query, Vehicle).all()))
+    vehicles = query.all()
+    cond.check(rows_etag(vehicles))
+    return page.page(vehicles, Vehicle.id)
 
 # ---------------------------
 # Get Vehicle by ID
 # ---------------------------
 @vehicle_router.get("/{vehicle_id}", response_model=VehicleOut)
-def get_vehicle(vehicle_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_vehicle(vehicle_id: UUID, cond: ConditionalGet = Depends(), db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
+    cond.check(row_etag(vehicle))
     return vehicle
 
 # ---------------------------
@@ -112,6 +124,19 @@ def delete_vehicle(vehicle_id: UUID, db: Session = Depends(get_db), current_user
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     
+    # Its trips, their bookings and those bookings' reviews go with it (ORM cascade),
+    # so take the reviews out of the reviewed users' aggregates first
+    trip_ids = db.scalars(select(Trip.id).where(Trip.vehicle_id == vehicle.id)).all()
+    retracted = db.execute(received_totals(
+        Review.booking_id.in_(select(Booking.id).join(Trip).where(Trip.vehicle_id == vehicle.id))
+    )).all()
+    for user_id, total, count in retracted:
+        db.execute(apply_rating_delta(user_id, -total, -count))
     db.delete(vehicle)
     db.commit()
+    for user_id, _, _ in retracted:
+        invalidate_principal(user_id)
+    for trip_id in trip_ids:
+        invalidate_trip(trip_id)
+        trip_matcher.remove(trip_id)
     return
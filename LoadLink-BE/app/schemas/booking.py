@@ -1,4 +1,4 @@
-from pydantic import BaseModel, UUID4, Field
+from pydantic import BaseModel, UUID4, Field, conint, conlist
 from datetime import date
 from typing import Optional
 from decimal import Decimal
@@ -11,7 +11,14 @@ class BookingBase(BaseModel):
 
 
 class BookingCreate(BookingBase):
-    pass
+    load_size: conint(gt=0)  # a negative load would hand capacity back to the trip
+
+
+MAX_BULK_BOOKINGS = 100
+
+
+class BookingBulkCreate(BaseModel):
+    bookings: conlist(BookingCreate, min_length=1, max_length=MAX_BULK_BOOKINGS)
 
 
 class BookingUpdate(BaseModel):
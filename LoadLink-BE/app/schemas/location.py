@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+# Autocomplete / fuzzy match for GET /locations/search
+class LocationMatch(BaseModel):
+    id: int
+    name: str
+    score: float  # trigram similarity of the best-matching alias, 0..1
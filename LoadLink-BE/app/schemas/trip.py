@@ -1,9 +1,20 @@
-from pydantic import BaseModel, constr, conint, validator
+from pydantic import BaseModel, confloat, constr, conint, root_validator, validator
 from uuid import UUID
 from datetime import date
 from enum import Enum
 from typing import Optional
 
+Latitude = confloat(ge=-90, le=90)
+Longitude = confloat(ge=-180, le=180)
+
+
+def check_points(values):
+    for end in ("origin", "destination"):
+        if (values.get(f"{end}_lat") is None) != (values.get(f"{end}_lng") is None):
+            raise ValueError(f"{end}_lat and {end}_lng must be given together")
+    return values
+
+
 class TripStatus(str, Enum):
     active = "active"
     completed = "completed"
@@ -22,6 +33,13 @@ class TripCreate(BaseModel):
     available_capacity: Optional[int] = None  # optional, default to vehicle capacity
     status: TripStatus
     description: Optional[str] = None
+    # Exact pickup / drop-off points; default to the centre of the origin / destination
+    origin_lat: Optional[Latitude] = None
+    origin_lng: Optional[Longitude] = None
+    destination_lat: Optional[Latitude] = None
+    destination_lng: Optional[Longitude] = None
+
+    _check_points = root_validator(skip_on_failure=True, allow_reuse=True)(check_points)
 
     @validator("arrival_date")
     def check_dates(cls, v, values):
@@ -40,6 +58,12 @@ class TripUpdate(BaseModel):
     available_capacity: Optional[conint(ge=0)] = None
     status: Optional[constr(max_length=20)] = None
     description: Optional[str] = None
+    origin_lat: Optional[Latitude] = None
+    origin_lng: Optional[Longitude] = None
+    destination_lat: Optional[Latitude] = None
+    destination_lng: Optional[Longitude] = None
+
+    _check_points = root_validator(skip_on_failure=True, allow_reuse=True)(check_points)
 
     @validator("arrival_date")
     def check_dates(cls, v, values):
@@ -62,6 +86,12 @@ class TripOut(BaseModel):
     vehicle_id: UUID
     origin: str
     destination: str
+    origin_id: int
+    destination_id: int
+    origin_lat: Optional[float] = None
+    origin_lng: Optional[float] = None
+    destination_lat: Optional[float] = None
+    destination_lng: Optional[float] = None
     departure_date: date
     arrival_date: date
     price_per_kg: float
@@ -74,3 +104,18 @@ class TripOut(BaseModel):
         orm_mode = True
 
 
+
+
+class TripNearbyOut(TripOut):
+    distance_km: float  # from the search point (or the box's centre) to the matched end
+
+
+# Bulk import report
+class TripImportError(BaseModel):
+    line: int
+    error: str
+
+class TripImportReport(BaseModel):
+    inserted: int
+    rejected: int
+    errors: list[TripImportError]  # capped; rejected has the full count
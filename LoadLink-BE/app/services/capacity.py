@@ -0,0 +1,89 @@
+from collections import defaultdict
+from datetime import date
+
+from fastapi import HTTPException
+from sqlalchemy import case, select, update
+
+from app.models import Trip
+
+
+def reserve_capacity(trip_id, load_size: int):
+    """
+    Single conditional UPDATE that deducts load_size only while enough
+    capacity is left, returning the trip's price when it succeeds. The row
+    lock is held until commit and concurrent writers re-check the WHERE
+    clause, so a trip can never be overbooked.
+    """
+    return (
+        update(Trip)
+        .where(Trip.id == trip_id, Trip.available_capacity >= load_size)
+        .values(available_capacity=Trip.available_capacity - load_size)
+        .returning(Trip.price_per_kg, Trip.available_capacity)
+    )
+
+
+# ---------------------------
+# Bulk reservations
+# ---------------------------
+def bulk_loads(items) -> dict:
+    """Total load per trip, so several legs on the same trip are reserved together."""
+    loads = defaultdict(int)
+    for item in items:
+        loads[item.trip_id] += item.load_size
+    return dict(loads)
+
+
+def lock_trips(trip_ids):
+    # Locks are taken in id order so two overlapping bulk requests can't deadlock
+    return (
+        select(Trip.id, Trip.price_per_kg, Trip.available_capacity)
+        .where(Trip.id.in_(trip_ids))
+        .order_by(Trip.id)
+        .with_for_update()
+    )
+
+
+def reserve_capacity_bulk(loads: dict):
+    """
+    One UPDATE for every trip in loads, still guarded per row like
+    reserve_capacity. The caller compares rowcount with len(loads) and rolls
+    back on a mismatch, which keeps the reservation all-or-nothing.
+    """
+    load = case(loads, value=Trip.id)
+    return (
+        update(Trip)
+        .where(Trip.id.in_(list(loads)), Trip.available_capacity >= load)
+        .values(available_capacity=Trip.available_capacity - load)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def plan_bulk_bookings(items, loads: dict, trips, shipper_id) -> list[dict]:
+    """Validate the locked trips against the requested loads and build the Booking rows to insert."""
+    trips = {trip.id: trip for trip in trips}
+
+    missing = [str(trip_id) for trip_id in loads if trip_id not in trips]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Trips not found: {', '.join(missing)}")
+
+    short = [
+        f"{trip_id}: requested {load} kg, available {trips[trip_id].available_capacity} kg"
+        for trip_id, load in loads.items()
+        if trips[trip_id].available_capacity < load
+    ]
+    if short:
+        raise HTTPException(status_code=400, detail=f"Not enough capacity. {'; '.join(short)}")
+
+    today = date.today()
+    return [
+        {
+            "trip_id": item.trip_id,
+            "shipper_id": shipper_id,
+            "load_size": item.load_size,
+            "total_price": trips[item.trip_id].price_per_kg * item.load_size,
+            "status": "pending",
+            "created_date": today,
+            "notes": item.notes,
+        }
+        for item in items
+    ]
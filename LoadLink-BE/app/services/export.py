@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models import Booking, Payment
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Plain columns rather than ORM entities: no identity map, nothing kept per row
+BOOKING_EXPORT_COLUMNS = (
+    Booking.id, Booking.trip_id, Booking.shipper_id, Booking.load_size, Booking.total_price, Booking.status,
+    Booking.created_date, Booking.fulfilled_date, Booking.paid_date, Booking.notes,
+)
+PAYMENT_EXPORT_COLUMNS = (
+    Payment.id, Payment.booking_id, Payment.from_user_id, Payment.to_user_id, Payment.amount, Payment.status,
+    Payment.created_date, Payment.completed_date,
+)
+
+
+class ExportParams:
+    """Query parameters shared by the export endpoints: output format and a created_date range."""
+
+    def __init__(
+        self,
+        fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+        date_from: Optional[date] = Query(None, description="created on or after"),
+        date_to: Optional[date] = Query(None, description="created on or before"),
+    ):
+        self.fmt = fmt
+        self.date_from = date_from
+        self.date_to = date_to
+
+    def filter(self, query, column):
+        if self.date_from:
+            query = query.where(column >= self.date_from)
+        if self.date_to:
+            query = query.where(column <= self.date_to)
+        return query
+
+
+def _encode(fmt: str, columns: list[str], rows) -> str:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+    return "".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows)
+
+
+def _header(fmt: str, columns: list[str]) -> str:
+    return _encode(fmt, columns, [columns]) if fmt == "csv" else ""
+
+
+# ---------------------------
+# Streaming bodies
+# ---------------------------
+# Each body opens its own session: the request's session is closed before the
+# response starts streaming. yield_per turns on a server-side cursor
+# (stream_results) where the driver supports it, so only one partition of rows
+# is ever held in memory.
+def stream_rows(query, fmt: str):
+    columns = list(query.selected_columns.keys())
+    yield _header(fmt, columns)
+    with SessionLocal() as db:
+        result = db.execute(query.execution_options(yield_per=settings.EXPORT_YIELD_PER))
+        for rows in result.partitions():
+            yield _encode(fmt, columns, rows)
+
+
+async def stream_rows_async(query, fmt: str):
+    columns = list(query.selected_columns.keys())
+    yield _header(fmt, columns)
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_YIELD_PER))
+        async for rows in result.partitions():
+            yield _encode(fmt, columns, rows)
+
+
+def export_response(body, params: ExportParams, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[params.fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{params.fmt}"'},
+    )
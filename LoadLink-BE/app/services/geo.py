@@ -0,0 +1,135 @@
+import math
+from typing import Optional
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+# Base32 alphabet in ascending ASCII order, so every cell's descendants form one string range
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_UPPER = "{"  # sorts after every base32 character
+GEOHASH_PRECISION = 9  # stored cells are about 5 m x 5 m
+MAX_COVER_CELLS = 32
+
+
+def geohash(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate longitude / latitude, longitude first
+        span, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        middle = (span[0] + span[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            span[0] = middle
+        else:
+            span[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """(latitude, longitude) extent in degrees of a cell of this precision."""
+    lng_bits = (precision * 5 + 1) // 2
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def _successor(cell: str) -> str:
+    """The next cell of the same precision in string order (the exclusive end of cell's range)."""
+    for i in range(len(cell) - 1, -1, -1):
+        position = _BASE32.index(cell[i])
+        if position < len(_BASE32) - 1:
+            return cell[:i] + _BASE32[position + 1]
+    return _UPPER
+
+
+def end_columns(end: str, lat: Optional[float], lng: Optional[float]) -> dict:
+    """{end}_lat / {end}_lng / {end}_geohash values for one end of a trip (all None without a point)."""
+    if lat is None or lng is None:
+        return {f"{end}_lat": None, f"{end}_lng": None, f"{end}_geohash": None}
+    return {f"{end}_lat": lat, f"{end}_lng": lng, f"{end}_geohash": geohash(lat, lng)}
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to many, in km."""
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+# ---------------------------
+# Search areas
+# ---------------------------
+class SearchArea:
+    """
+    A bounding box, optionally with a circle inside it. The box is covered
+    with geohash cells for the index range scans; the candidates those
+    ranges return are then filtered and ranked by distance in one
+    vectorized pass.
+    """
+
+    def __init__(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float,
+                 center: Optional[tuple[float, float]] = None, radius_km: Optional[float] = None):
+        self.min_lat, self.min_lng, self.max_lat, self.max_lng = min_lat, min_lng, max_lat, max_lng
+        self.center = center or ((min_lat + max_lat) / 2, (min_lng + max_lng) / 2)
+        self.radius_km = radius_km
+
+    @classmethod
+    def radius(cls, lat: float, lng: float, radius_km: float) -> "SearchArea":
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        cos_lat = math.cos(math.radians(lat))
+        # Near the poles the circle spans every longitude
+        dlng = 180.0 if cos_lat < 1e-6 else min(180.0, math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)))
+        return cls(
+            max(-90.0, lat - dlat), max(-180.0, lng - dlng), min(90.0, lat + dlat), min(180.0, lng + dlng),
+            center=(lat, lng), radius_km=radius_km,
+        )
+
+    def cells(self, max_cells: int = MAX_COVER_CELLS) -> list[str]:
+        """The finest geohash cells, at most max_cells of them, that together cover the box."""
+        for precision in range(GEOHASH_PRECISION, 0, -1):
+            lat_step, lng_step = cell_size(precision)
+            lat_first, lat_last = (math.floor((v + 90.0) / lat_step) for v in (self.min_lat, self.max_lat))
+            lng_first, lng_last = (math.floor((v + 180.0) / lng_step) for v in (self.min_lng, self.max_lng))
+            if (lat_last - lat_first + 1) * (lng_last - lng_first + 1) <= max_cells or precision == 1:
+                break
+        cells = set()
+        for i in range(lat_first, lat_last + 1):
+            for j in range(lng_first, lng_last + 1):
+                lat = min(90.0, -90.0 + (i + 0.5) * lat_step)
+                lng = min(180.0, -180.0 + (j + 0.5) * lng_step)
+                cells.add(geohash(lat, lng, precision))
+        return sorted(cells)
+
+    def spans(self, max_cells: int = MAX_COVER_CELLS) -> list[tuple[str, str]]:
+        """[start, end) geohash string ranges covering the box; cells adjacent in string order are merged."""
+        spans = []
+        for cell in self.cells(max_cells):
+            if spans and spans[-1][1] == cell:
+                spans[-1][1] = _successor(cell)
+            else:
+                spans.append([cell, _successor(cell)])
+        return [tuple(span) for span in spans]
+
+    def nearest(self, candidates, limit: int) -> list[tuple]:
+        """(id, distance km) for the candidate (id, lat, lng) rows inside the area, closest first."""
+        if not candidates:
+            return []
+        ids, lats, lngs = zip(*candidates)
+        lats, lngs = np.array(lats, dtype=float), np.array(lngs, dtype=float)
+        distances = haversine_km(*self.center, lats, lngs)
+        if self.radius_km is not None:
+            inside = distances <= self.radius_km
+        else:
+            inside = (lats >= self.min_lat) & (lats <= self.max_lat) & (lngs >= self.min_lng) & (lngs <= self.max_lng)
+        kept = np.flatnonzero(inside)
+        if len(kept) > limit:
+            kept = kept[np.argpartition(distances[kept], limit - 1)[:limit]]
+        # At most `limit` rows left: order them in Python so equal distances tie-break on id
+        return sorted(((ids[i], float(distances[i])) for i in kept), key=lambda hit: (hit[1], hit[0]))
@@ -0,0 +1,233 @@
+import re
+import threading
+import time
+from collections import Counter
+from typing import NamedTuple, Optional
+
+from sqlalchemy import case, delete, desc, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models import Location, LocationAlias
+from app.services.geo import end_columns
+
+# pg_trgm's default similarity_threshold, so both search paths agree
+SIMILARITY_THRESHOLD = 0.3
+_WORD = re.compile(r"\w+")
+
+
+def location_key(name: str) -> str:
+    """The normalized spelling aliases are stored under: case and spacing don't matter."""
+    return " ".join(name.split()).casefold()
+
+
+def display_name(name: str) -> str:
+    return " ".join(name.split())
+
+
+# ---------------------------
+# Names -> ids
+# ---------------------------
+def alias_lookup(names):
+    """(key, location_id) for the given spellings that are known."""
+    return select(LocationAlias.key, LocationAlias.location_id).where(
+        LocationAlias.key.in_({location_key(name) for name in names})
+    )
+
+
+class Place(NamedTuple):
+    id: int
+    latitude: Optional[float]
+    longitude: Optional[float]
+
+
+def place_lookup(keys):
+    """Place rows, keyed by alias key, for normalized spellings."""
+    return (
+        select(LocationAlias.key, Location.id, Location.latitude, Location.longitude)
+        .join(Location, LocationAlias.location_id == Location.id)
+        .where(LocationAlias.key.in_(keys))
+    )
+
+
+def location_id_of(name: str):
+    """Scalar subquery resolving a spelling through its alias (NULL, so no match, when unknown)."""
+    return select(LocationAlias.location_id).where(LocationAlias.key == location_key(name)).scalar_subquery()
+
+
+def _insert_alias(dialect: str, key: str, location_id: int):
+    stmt = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(LocationAlias)
+    return stmt.values(key=key, location_id=location_id).on_conflict_do_nothing(index_elements=["key"])
+
+
+def _new_locations(names, found: dict) -> dict:
+    """{key: display name} for the spellings found has no id for yet; the first spelling in sort order names it."""
+    new = {}
+    for name in sorted(names):
+        if location_key(name) not in found:
+            new.setdefault(location_key(name), display_name(name))
+    return new
+
+
+def resolve_locations(db, names) -> dict:
+    """
+    {name: Place} for every name, creating a location (with the name as its
+    canonical spelling and no coordinates) for keys not seen before. Two
+    requests adding the same new spelling race on the alias key: the loser
+    drops its row and takes the winner's location.
+    """
+    found = {row.key: Place(row.id, row.latitude, row.longitude)
+             for row in db.execute(place_lookup({location_key(name) for name in names}))}
+    dialect = db.get_bind().dialect.name
+    for key, name in _new_locations(names, found).items():
+        location_id = db.execute(insert(Location).values(name=name).returning(Location.id)).scalar_one()
+        if db.execute(_insert_alias(dialect, key, location_id)).rowcount == 0:
+            db.execute(delete(Location).where(Location.id == location_id))
+            row = db.execute(place_lookup([key])).one()
+            found[key] = Place(row.id, row.latitude, row.longitude)
+        else:
+            found[key] = Place(location_id, None, None)
+    return {name: found[location_key(name)] for name in names}
+
+
+async def resolve_locations_async(db, names) -> dict:
+    found = {row.key: Place(row.id, row.latitude, row.longitude)
+             for row in await db.execute(place_lookup({location_key(name) for name in names}))}
+    dialect = db.get_bind().dialect.name
+    for key, name in _new_locations(names, found).items():
+        location_id = (await db.execute(insert(Location).values(name=name).returning(Location.id))).scalar_one()
+        if (await db.execute(_insert_alias(dialect, key, location_id))).rowcount == 0:
+            await db.execute(delete(Location).where(Location.id == location_id))
+            row = (await db.execute(place_lookup([key]))).one()
+            found[key] = Place(row.id, row.latitude, row.longitude)
+        else:
+            found[key] = Place(location_id, None, None)
+    return {name: found[location_key(name)] for name in names}
+
+
+def trip_geometry(places: dict, given: dict, ends=("origin", "destination")) -> dict:
+    """
+    Location ids, coordinates and geohash cells for the given ends of a
+    trip. places maps "origin" / "destination" to a Place; coordinates in
+    given (origin_lat, origin_lng, ...) win over the location's centre.
+    """
+    columns = {}
+    for end in ends:
+        place = places[end]
+        lat, lng = given.get(f"{end}_lat"), given.get(f"{end}_lng")
+        if lat is None or lng is None:
+            lat, lng = place.latitude, place.longitude
+        columns[f"{end}_id"] = place.id
+        columns.update(end_columns(end, lat, lng))
+    return columns
+
+
+def _route_names(rows) -> set:
+    return {row["origin"] for row in rows} | {row["destination"] for row in rows}
+
+
+def _assign(rows, places: dict):
+    for row in rows:
+        row.update(trip_geometry({"origin": places[row["origin"]], "destination": places[row["destination"]]}, row))
+
+
+def assign_locations(db, rows: list[dict]):
+    """Fill the location ids, coordinates and geohash cells on trip rows built by TripImport."""
+    _assign(rows, resolve_locations(db, _route_names(rows)))
+
+
+async def assign_locations_async(db, rows: list[dict]):
+    _assign(rows, await resolve_locations_async(db, _route_names(rows)))
+
+
+# ---------------------------
+# Autocomplete / fuzzy search
+# ---------------------------
+def trigrams(text: str) -> set:
+    """pg_trgm's trigrams: each word padded with two spaces in front and one behind."""
+    grams = set()
+    for word in _WORD.findall(text.casefold()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def trigram_search(q: str, limit: int):
+    """Postgres: served by the pg_trgm GIN index on location_aliases.key."""
+    key = location_key(q)
+    prefix = LocationAlias.key.startswith(key, autoescape=True)
+    return (
+        select(
+            Location.id, Location.name,
+            func.max(func.similarity(LocationAlias.key, key)).label("score"),
+            func.max(case((prefix, 1), else_=0)).label("prefix"),
+        )
+        .join(LocationAlias, LocationAlias.location_id == Location.id)
+        .where(or_(LocationAlias.key.op("%")(key), prefix))
+        .group_by(Location.id, Location.name)
+        .order_by(desc("prefix"), desc("score"), Location.name)
+        .limit(limit)
+    )
+
+
+def search_rows():
+    return select(LocationAlias.key, LocationAlias.location_id, Location.name).join(
+        Location, LocationAlias.location_id == Location.id
+    )
+
+
+class LocationSearchIndex:
+    """
+    Trigram index over every alias, scored like pg_trgm's similarity(), for
+    databases without pg_trgm. Spellings that start with the query rank
+    first (autocomplete), then the rest by similarity. The alias table is
+    small, so it is reloaded whole once it is older than the refresh age.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._aliases = []    # (key, location id)
+        self._sizes = []      # trigram count per alias
+        self._postings = {}   # trigram -> alias positions
+        self._names = {}      # location id -> canonical name
+        self.loaded_at = None
+
+    def stale(self, max_age: float) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > max_age
+
+    def load(self, rows):
+        aliases, sizes, postings, names = [], [], {}, {}
+        for key, location_id, name in rows:
+            grams = trigrams(key)
+            for gram in grams:
+                postings.setdefault(gram, []).append(len(aliases))
+            aliases.append((key, location_id))
+            sizes.append(len(grams))
+            names[location_id] = name
+        with self._lock:
+            self._aliases, self._sizes, self._postings, self._names = aliases, sizes, postings, names
+            self.loaded_at = time.monotonic()
+
+    def search(self, q: str, limit: int) -> list[dict]:
+        key = location_key(q)
+        grams = trigrams(key)
+        if not grams:
+            return []
+        with self._lock:
+            shared = Counter()
+            for gram in grams:
+                shared.update(self._postings.get(gram, ()))
+            best = {}
+            for position, count in shared.items():
+                alias, location_id = self._aliases[position]
+                score = count / (len(grams) + self._sizes[position] - count)
+                prefix = alias.startswith(key)
+                if (prefix or score >= SIMILARITY_THRESHOLD) and (prefix, score) > best.get(location_id, (False, 0)):
+                    best[location_id] = (prefix, score)
+            ranked = sorted(best.items(), key=lambda item: (not item[1][0], -item[1][1], self._names[item[0]]))
+            return [
+                {"id": location_id, "name": self._names[location_id], "score": round(score, 3)}
+                for location_id, (_, score) in ranked[:limit]
+            ]
+
+
+location_search = LocationSearchIndex()
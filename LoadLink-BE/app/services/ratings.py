@@ -0,0 +1,60 @@
+from sqlalchemy import Float, case, cast, func, or_, select, update
+
+from app.models import Review, User
+
+
+def _average(total, count):
+    # Float division so SQLite doesn't truncate; the Numeric(2, 1) column does the rounding
+    return case((count > 0, cast(total, Float) / count), else_=0)
+
+
+def apply_rating_delta(user_id, rating_delta: int, count_delta: int):
+    """
+    O(1) update of a user's rating aggregate, executed in the same transaction
+    as the review write. Every SET expression reads the pre-update row, and
+    the row lock serialises concurrent reviews of the same user.
+    """
+    total = User.rating_sum + rating_delta
+    count = func.coalesce(User.review_count, 0) + count_delta
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(rating_sum=total, review_count=count, rating=_average(total, count))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def received_totals(*criteria):
+    """
+    (user id, rating sum, count) per reviewed user for the reviews matching
+    criteria. Deletes that cascade to reviews (a booking, a trip, a vehicle)
+    apply the negated totals with apply_rating_delta before deleting.
+    """
+    return (
+        select(Review.to_user_id, func.sum(Review.rating), func.count(Review.id))
+        .where(*criteria)
+        .group_by(Review.to_user_id)
+    )
+
+
+# ---------------------------
+# Set-based rebuild (backfills, drift checks)
+# ---------------------------
+def _received():
+    total = select(func.coalesce(func.sum(Review.rating), 0)).where(Review.to_user_id == User.id).scalar_subquery()
+    count = select(func.count(Review.id)).where(Review.to_user_id == User.id).scalar_subquery()
+    return total, count
+
+
+def recompute_all_ratings():
+    """One UPDATE rebuilding every user's aggregate from the reviews table."""
+    total, count = _received()
+    return update(User).values(rating_sum=total, review_count=count, rating=_average(total, count))
+
+
+def drifted_ratings():
+    """Users whose stored sum/count no longer match their reviews."""
+    total, count = _received()
+    return select(User.id, User.rating_sum, User.review_count, total.label("actual_sum"), count.label("actual_count")).where(
+        or_(User.rating_sum != total, func.coalesce(User.review_count, 0) != count)
+    )
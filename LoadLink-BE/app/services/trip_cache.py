@@ -0,0 +1,93 @@
+import threading
+from typing import Optional
+
+from pydantic import TypeAdapter
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.trip import TripOut
+
+ALL_ACTIVE_KEY = "trips:all"
+
+_trip_list_adapter = TypeAdapter(list[TripOut])
+_trip_adapter = TypeAdapter(TripOut)
+
+
+def trip_key(trip_id) -> str:
+    return f"trip:{trip_id}"
+
+
+class TripReadCache:
+    """
+    (ETag, serialized body) entries for the hot trip reads. The backend only needs
+    get/set/pop (TTLCache in-process by default; a shared store can be
+    plugged in via set_backend).
+
+    Invalidation and the generation counter are per process: a write through
+    one worker can't reach another worker's entries. Readers therefore pass
+    the ETag of the rows' current (id, version) pairs, read from the database
+    on every request, and an entry is only served while it matches; capacity
+    changes bump the trip's version, so no worker serves stale capacity. What
+    the cache saves is loading and serializing the rows, not the version read.
+    Locally, every invalidation bumps the generation, and a fill computed from
+    a read that started before the latest write is dropped.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stale = 0  # entries found but outdated by a write, counted as misses
+
+    def get(self, key: str, etag: str) -> Optional[tuple[str, bytes]]:
+        """The entry for key if it was built from the rows etag describes, else None."""
+        entry = self.backend.get(key)
+        if entry is not None and entry[0] != etag:
+            with self._lock:
+                self.stale += 1
+            return None
+        return entry
+
+    def generation(self) -> int:
+        return self._generation
+
+    def fill(self, key: str, generation: int, entry: tuple[str, bytes]):
+        with self._lock:
+            if generation == self._generation:
+                self.backend.set(key, entry)
+
+    def invalidate(self, *keys: str):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self.backend.pop(key)
+
+    def stats(self) -> dict:
+        stats = dict(self.backend.stats()) if hasattr(self.backend, "stats") else {}
+        if "hits" in stats:
+            stats["hits"] -= self.stale
+            stats["misses"] += self.stale
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["stale"] = self.stale
+        return stats
+
+
+trip_read_cache = TripReadCache(TTLCache(lambda: settings.TRIP_CACHE_SIZE, lambda: settings.TRIP_CACHE_TTL_SECONDS))
+
+
+def set_backend(backend):
+    trip_read_cache.backend = backend
+
+
+def serialize_trips(trips: list) -> bytes:
+    return _trip_list_adapter.dump_json(_trip_list_adapter.validate_python(trips, from_attributes=True))
+
+
+def serialize_trip(trip) -> bytes:
+    return _trip_adapter.dump_json(_trip_adapter.validate_python(trip, from_attributes=True))
+
+
+def invalidate_trip(trip_id):
+    """Call after committing any change to a trip, including its available_capacity."""
+    trip_read_cache.invalidate(trip_key(trip_id), ALL_ACTIVE_KEY)
@@ -0,0 +1,231 @@
+import codecs
+import csv
+import io
+import json
+import uuid
+from decimal import Decimal
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+
+from app.models import Trip, Vehicle
+from app.schemas.trip import TripCreate
+
+# Column order for COPY; every value is supplied so no server default is needed
+TRIP_COLUMNS = (
+    "id", "carrier_id", "vehicle_id", "origin", "destination", "origin_id", "destination_id",
+    "origin_lat", "origin_lng", "origin_geohash", "destination_lat", "destination_lng", "destination_geohash",
+    "departure_date", "arrival_date", "price_per_kg", "total_capacity", "available_capacity", "status",
+    "description", "version",
+)
+MAX_REPORTED_ERRORS = 1000
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def import_format(content_type: Optional[str], fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in CONTENT_TYPES:
+        raise HTTPException(status_code=415, detail="Upload text/csv or application/x-ndjson, or pass ?format=")
+    return CONTENT_TYPES[media_type]
+
+
+# ---------------------------
+# Incremental parsing
+# ---------------------------
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple[int, str]]:
+    """
+    (line number, text) per record as the body arrives. A CSV record only
+    ends on a newline outside quotes, so quoted fields may span lines.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending, record, start, line_no, quotes = "", [], 0, 0, 0
+
+    def split(text):
+        nonlocal record, start, line_no, quotes
+        for line in text:
+            line_no += 1
+            if not record:
+                start = line_no
+            record.append(line)
+            if fmt == "csv":
+                quotes += line.count('"')
+                if quotes % 2:
+                    continue
+            joined = "\n".join(record).rstrip("\r")
+            record, quotes = [], 0
+            if joined.strip():
+                yield start, joined
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for item in split(lines):
+            yield item
+    pending += decoder.decode(b"", final=True)
+    for item in split([pending] if pending else []):
+        yield item
+    if record:
+        yield start, "\n".join(record)
+
+
+async def iter_batches(chunks: AsyncIterator[bytes], fmt: str, batch_size: int):
+    """Lists of (line number, field dict or error message), at most batch_size long."""
+    header, batch = None, []
+    async for line_no, text in iter_records(chunks, fmt):
+        if fmt == "csv":
+            values = next(csv.reader([text]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                batch.append((line_no, f"expected {len(header)} fields, got {len(values)}"))
+            else:
+                # Blank CSV cells mean "not given", not an empty string
+                batch.append((line_no, {name: value or None for name, value in zip(header, values)}))
+        else:
+            try:
+                fields = json.loads(text)
+                batch.append((line_no, fields if isinstance(fields, dict) else "expected a JSON object"))
+            except ValueError as exc:
+                batch.append((line_no, f"invalid JSON: {exc}"))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors())
+
+
+# ---------------------------
+# Per-request import state
+# ---------------------------
+class TripImport:
+    """
+    Validates batches for one carrier. Vehicles are looked up once per
+    batch for the ids not seen before and remembered for the rest of the
+    upload; only the error list is capped, so memory stays flat.
+    """
+
+    def __init__(self, carrier_id):
+        self.carrier_id = carrier_id
+        self.vehicles: dict = {}
+        self.inserted = 0
+        self.rejected = 0
+        self.errors: list[dict] = []
+
+    def reject(self, line_no: int, error: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "error": error})
+
+    def validate(self, batch) -> list[tuple[int, TripCreate]]:
+        valid = []
+        for line_no, fields in batch:
+            if isinstance(fields, str):
+                self.reject(line_no, fields)
+                continue
+            try:
+                valid.append((line_no, TripCreate.model_validate(fields)))
+            except ValidationError as exc:
+                self.reject(line_no, _describe(exc))
+        return valid
+
+    def vehicle_lookup(self, trips):
+        """Query for the vehicles this batch needs that haven't been loaded yet, or None."""
+        unknown = {trip_in.vehicle_id for _, trip_in in trips} - self.vehicles.keys()
+        if not unknown:
+            return None
+        self.vehicles.update(dict.fromkeys(unknown))
+        return select(Vehicle.id, Vehicle.carrier_id, Vehicle.capacity).where(Vehicle.id.in_(unknown))
+
+    def add_vehicles(self, rows):
+        self.vehicles.update({row.id: row for row in rows})
+
+    def build(self, trips) -> list[dict]:
+        """Trip rows to insert, applying the same checks as POST /trips/. Location ids and cells are filled in by assign_locations."""
+        rows = []
+        for line_no, trip_in in trips:
+            vehicle = self.vehicles.get(trip_in.vehicle_id)
+            if vehicle is None:
+                self.reject(line_no, "Vehicle not found")
+                continue
+            if vehicle.carrier_id != self.carrier_id:
+                self.reject(line_no, "Vehicle does not belong to you")
+                continue
+            available_capacity = trip_in.available_capacity or vehicle.capacity
+            if available_capacity > vehicle.capacity:
+                self.reject(line_no, "Available capacity cannot exceed vehicle capacity")
+                continue
+            rows.append({
+                "id": uuid.uuid4(),
+                "carrier_id": self.carrier_id,
+                "vehicle_id": trip_in.vehicle_id,
+                "origin": trip_in.origin,
+                "destination": trip_in.destination,
+                "departure_date": trip_in.departure_date,
+                "arrival_date": trip_in.arrival_date,
+                "price_per_kg": Decimal(str(trip_in.price_per_kg)),
+                "total_capacity": vehicle.capacity,
+                "available_capacity": available_capacity,
+                "status": trip_in.status.value,
+                "description": trip_in.description,
+                "origin_lat": trip_in.origin_lat,
+                "origin_lng": trip_in.origin_lng,
+                "destination_lat": trip_in.destination_lat,
+                "destination_lng": trip_in.destination_lng,
+                "version": 1,
+            })
+        self.inserted += len(rows)
+        return rows
+
+    def report(self) -> dict:
+        errors = sorted(self.errors, key=lambda error: error["line"])
+        return {"inserted": self.inserted, "rejected": self.rejected, "errors": errors}
+
+
+# ---------------------------
+# Batch writers: COPY on Postgres, one executemany INSERT elsewhere
+# ---------------------------
+def _copy_buffer(rows: list[dict]) -> io.StringIO:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row[col] is None else row[col] for col in TRIP_COLUMNS])
+    buffer.seek(0)
+    return buffer
+
+
+def write_trips(db, rows: list[dict]):
+    connection = db.connection()
+    if connection.dialect.driver == "psycopg2":
+        with connection.connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY trips ({', '.join(TRIP_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", _copy_buffer(rows)
+            )
+    else:
+        db.execute(insert(Trip), rows)
+
+
+async def write_trips_async(db, rows: list[dict]):
+    connection = await db.connection()
+    if connection.dialect.driver == "asyncpg":
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "trips", records=[tuple(row[col] for col in TRIP_COLUMNS) for row in rows], columns=TRIP_COLUMNS
+        )
+    else:
+        await db.execute(insert(Trip), rows)
@@ -0,0 +1,298 @@
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Mapping
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import select
+
+from app.models import Trip
+from app.services.trip_search import trip_search_filters
+
+logger = logging.getLogger("app.trip_matching")
+
+# What the index keeps per trip: enough to filter and rank, not to render
+MATCH_COLUMNS = (
+    Trip.id, Trip.origin_id, Trip.destination_id, Trip.departure_date, Trip.arrival_date,
+    Trip.price_per_kg, Trip.available_capacity, Trip.status,
+)
+
+
+def _field(trip, name):
+    return trip[name] if isinstance(trip, Mapping) else getattr(trip, name)
+
+
+class _Entry:
+    __slots__ = ("id", "route", "departure", "arrival", "price", "capacity")
+
+    def __init__(self, trip_id, origin_id, destination_id, departure, arrival, price, capacity):
+        self.id = trip_id
+        self.route = (origin_id, destination_id)
+        self.departure = departure
+        self.arrival = arrival
+        self.price = float(price)
+        self.capacity = capacity
+
+    @classmethod
+    def of(cls, trip):
+        return cls(*(_field(trip, column.key) for column in MATCH_COLUMNS[:-1]))
+
+    @property
+    def rank(self):
+        return (self.price, self.departure, self.id)
+
+
+class _Day:
+    """Trips on one route departing on one day, cheapest first."""
+    __slots__ = ("ranked", "max_capacity")
+
+    def __init__(self):
+        self.ranked = []
+        self.max_capacity = 0
+
+
+class _Route:
+    __slots__ = ("dates", "days")
+
+    def __init__(self):
+        self.dates = []  # departure dates with at least one trip, ascending
+        self.days = {}
+
+    def add(self, entry: _Entry):
+        day = self.days.get(entry.departure)
+        if day is None:
+            insort(self.dates, entry.departure)
+            day = self.days[entry.departure] = _Day()
+        insort(day.ranked, entry.rank)
+        day.max_capacity = max(day.max_capacity, entry.capacity)
+
+    def discard(self, entry: _Entry, trips: dict):
+        day = self.days[entry.departure]
+        del day.ranked[bisect_left(day.ranked, entry.rank)]
+        if not day.ranked:
+            del self.days[entry.departure]
+            del self.dates[bisect_left(self.dates, entry.departure)]
+        elif entry.capacity >= day.max_capacity:
+            day.max_capacity = max(trips[other].capacity for _, _, other in day.ranked)
+
+
+class _Snapshot:
+    """The index proper; TripMatchIndex swaps a fresh one in on every rebuild."""
+
+    def __init__(self):
+        self.trips = {}
+        self.routes = {}
+
+    def load(self, trips):
+        """Bulk build from active MATCH_COLUMNS rows: append everything, then sort each day once."""
+        for row in trips:
+            entry = _Entry(*row[:-1])
+            self.trips[entry.id] = entry
+            route = self.routes.setdefault(entry.route, _Route())
+            day = route.days.get(entry.departure)
+            if day is None:
+                day = route.days[entry.departure] = _Day()
+            day.ranked.append(entry.rank)
+            day.max_capacity = max(day.max_capacity, entry.capacity)
+        for route in self.routes.values():
+            route.dates = sorted(route.days)
+            for day in route.days.values():
+                day.ranked.sort()
+
+    def upsert(self, trip):
+        self.remove(_field(trip, "id"))
+        if _field(trip, "status") != "active":
+            return
+        entry = _Entry.of(trip)
+        self.trips[entry.id] = entry
+        self.routes.setdefault(entry.route, _Route()).add(entry)
+
+    def remove(self, trip_id):
+        entry = self.trips.pop(trip_id, None)
+        if entry is not None:
+            route = self.routes[entry.route]
+            route.discard(entry, self.trips)
+            if not route.dates:
+                del self.routes[entry.route]
+
+    def set_capacity(self, trip_id, available_capacity: int):
+        entry = self.trips.get(trip_id)
+        if entry is None or entry.capacity == available_capacity:
+            return
+        day = self.routes[entry.route].days[entry.departure]
+        was_max = entry.capacity >= day.max_capacity
+        entry.capacity = available_capacity
+        if available_capacity > day.max_capacity:
+            day.max_capacity = available_capacity
+        elif was_max:
+            day.max_capacity = max(self.trips[other].capacity for _, _, other in day.ranked)
+
+    def match(self, route, date_from, date_to, load_size, limit) -> list:
+        found = self.routes.get(route)
+        if found is None:
+            return []
+        low = bisect_left(found.dates, date_from)
+        high = bisect_right(found.dates, date_to) if date_to else len(found.dates)
+        # Each day is already in rank order, so merging them lazily stops after `limit` hits
+        candidates = [
+            found.days[day].ranked for day in found.dates[low:high]
+            if found.days[day].max_capacity >= load_size
+        ]
+        matches = []
+        for _, _, trip_id in heapq.merge(*candidates):
+            entry = self.trips[trip_id]
+            if entry.capacity >= load_size and (date_to is None or entry.arrival <= date_to):
+                matches.append(trip_id)
+                if len(matches) == limit:
+                    break
+        return matches
+
+
+# ---------------------------
+# Process-wide index
+# ---------------------------
+class TripMatchIndex:
+    """
+    Active, not yet departed trips held in memory per (origin_id, destination_id),
+    bucketed by departure date and ranked by price within a day, so a match
+    is a date-range slice plus a lazy merge rather than a sort over the route.
+
+    The trip and booking routes apply their writes here after committing.
+    Each worker has its own copy and doesn't see the others' writes, so it
+    is rebuilt from the database every TRIP_MATCH_REFRESH_SECONDS; callers
+    re-read the matched rows and drop stale ones (see fresh_matches). Writes
+    that land while a rebuild is reading are journaled and replayed onto it.
+    """
+
+    def __init__(self):
+        self._snapshot = _Snapshot()
+        self._lock = threading.Lock()
+        self._journal = None
+        self.loaded_at = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def _write(self, op: str, *args):
+        with self._lock:
+            getattr(self._snapshot, op)(*args)
+            if self._journal is not None:
+                self._journal.append((op, args))
+
+    def upsert(self, trip):
+        """Add or replace a trip from a Trip, a row or a dict; anything not active is dropped."""
+        self._write("upsert", trip)
+
+    def upsert_many(self, trips):
+        for trip in trips:
+            self._write("upsert", trip)
+
+    def remove(self, trip_id):
+        self._write("remove", trip_id)
+
+    def set_capacity(self, trip_id, available_capacity: int):
+        self._write("set_capacity", trip_id, available_capacity)
+
+    def match(self, origin_id: int, destination_id: int, date_from: date, date_to: Optional[date],
+              load_size: int, limit: int) -> list:
+        """Ids of the `limit` cheapest trips with room for load_size, departing and arriving in the window."""
+        with self._lock:
+            return self._snapshot.match((origin_id, destination_id), date_from, date_to, load_size, limit)
+
+    def rebuild(self, rows_loader):
+        with self._lock:
+            if self._journal is not None:
+                return  # another rebuild is already reading
+            self._journal = []
+        try:
+            snapshot = _Snapshot()
+            snapshot.load(rows_loader())
+            with self._lock:
+                for op, args in self._journal:
+                    getattr(snapshot, op)(*args)
+                self._snapshot = snapshot
+                self.loaded_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._journal = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "trips": len(self._snapshot.trips),
+                "routes": len(self._snapshot.routes),
+                "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded else None,
+            }
+
+
+trip_matcher = TripMatchIndex()
+
+
+def active_trips_query():
+    return select(*MATCH_COLUMNS).where(Trip.status == "active", Trip.departure_date >= date.today())
+
+
+def load_trip_matcher():
+    from app import database
+
+    def rows():
+        with database.engine.connect() as connection:
+            yield from connection.execute(active_trips_query())
+
+    started = time.perf_counter()
+    trip_matcher.rebuild(rows)
+    stats = trip_matcher.stats()
+    logger.info("trip match index: %s trips on %s routes in %.0f ms",
+                stats["trips"], stats["routes"], (time.perf_counter() - started) * 1000)
+
+
+async def keep_trip_matcher_fresh(interval: float):
+    """Lifespan task: build the index off the event loop, then rebuild it every interval seconds (0 = once)."""
+    while True:
+        try:
+            await asyncio.to_thread(load_trip_matcher)
+        except Exception:
+            logger.exception("trip match index rebuild failed")
+        if interval <= 0:
+            return
+        await asyncio.sleep(interval)
+
+
+# ---------------------------
+# Request side
+# ---------------------------
+def match_query(origin, destination, date_from, date_to, load_size, limit):
+    """The same ranking in SQL, used until the index has loaded or when it is disabled."""
+    query = select(Trip).where(*trip_search_filters(origin, destination, date_from, date_to, load_size))
+    if date_to:
+        query = query.where(Trip.arrival_date <= date_to)
+    return query.order_by(Trip.price_per_kg, Trip.departure_date, Trip.id).limit(limit)
+
+
+# Index lookups per request before GET /trips/match gives up on the index and asks SQL
+MATCH_ATTEMPTS = 3
+
+
+def fresh_matches(trip_ids: list, trips, load_size: int, date_from: date, date_to: Optional[date]) -> list:
+    """
+    The matched trips as just read from the database, in rank order. Every
+    row read is written back to the index and ids that are gone are removed,
+    so rows that no longer qualify (booked through another worker, cancelled,
+    rescheduled) are dropped here and won't be matched again. When fewer
+    rows come back than trip_ids, the caller matches again to fill the page.
+    """
+    trip_matcher.upsert_many(trips)
+    for missing in set(trip_ids).difference(trip.id for trip in trips):
+        trip_matcher.remove(missing)
+    matches = [
+        trip for trip in trips
+        if trip.status == "active" and trip.available_capacity >= load_size and trip.departure_date >= date_from
+        and (date_to is None or trip.arrival_date <= date_to)
+    ]
+    return sorted(matches, key=lambda trip: (trip.price_per_kg, trip.departure_date, trip.id))
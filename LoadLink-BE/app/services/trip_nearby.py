@@ -0,0 +1,77 @@
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import select, union_all
+
+from app.models import Trip
+from app.schemas.trip import TripOut
+from app.services.geo import SearchArea
+
+MAX_RADIUS_KM = 500.0
+MAX_RESULTS = 200
+
+
+class NearbyParams:
+    """
+    GET /trips/nearby query: a point and radius, or a bounding box, matched
+    against the trips' origin (pickup) or destination (drop-off) points.
+    """
+
+    def __init__(
+        self,
+        lat: Optional[float] = Query(None, ge=-90, le=90),
+        lng: Optional[float] = Query(None, ge=-180, le=180),
+        radius_km: Optional[float] = Query(None, gt=0, le=MAX_RADIUS_KM),
+        min_lat: Optional[float] = Query(None, ge=-90, le=90),
+        min_lng: Optional[float] = Query(None, ge=-180, le=180),
+        max_lat: Optional[float] = Query(None, ge=-90, le=90),
+        max_lng: Optional[float] = Query(None, ge=-180, le=180),
+        end: Literal["origin", "destination"] = "origin",
+        departure_from: Optional[date] = None,
+        departure_to: Optional[date] = None,
+        limit: int = Query(50, ge=1, le=MAX_RESULTS),
+    ):
+        circle, box = (lat, lng, radius_km), (min_lat, min_lng, max_lat, max_lng)
+        if all(v is not None for v in circle) and all(v is None for v in box):
+            self.area = SearchArea.radius(lat, lng, radius_km)
+        elif all(v is not None for v in box) and all(v is None for v in circle):
+            if min_lat > max_lat or min_lng > max_lng:
+                raise HTTPException(status_code=400, detail="min_lat / min_lng must not exceed max_lat / max_lng")
+            self.area = SearchArea(min_lat, min_lng, max_lat, max_lng)
+        else:
+            raise HTTPException(status_code=400, detail="Give either lat, lng and radius_km, or min_lat, min_lng, max_lat and max_lng")
+        self.end = end
+        self.departure_from = departure_from or date.today()
+        self.departure_to = departure_to
+        self.limit = limit
+
+    def candidates(self):
+        """
+        (id, lat, lng) of active trips whose end lies in a cell covering the
+        area. Each merged cell range is its own UNION ALL branch, so every
+        branch is a range scan on the covering ix_trips_status_{end}_geohash
+        (as one OR, SQLite's planner falls back to the departure index).
+        The cells overshoot the area, so the rows still go through rank.
+        """
+        lat, lng, cell = (getattr(Trip, f"{self.end}_{suffix}") for suffix in ("lat", "lng", "geohash"))
+        dates = [Trip.departure_date >= self.departure_from]
+        if self.departure_to:
+            dates.append(Trip.departure_date <= self.departure_to)
+        return union_all(*(
+            select(Trip.id, lat, lng).where(Trip.status == "active", cell >= start, cell < end, *dates)
+            for start, end in self.area.spans()
+        ))
+
+    def rank(self, candidates) -> list[tuple]:
+        """(trip id, distance km) for the closest `limit` candidates inside the area."""
+        return self.area.nearest(candidates, self.limit)
+
+
+def in_distance_order(trips, ranked) -> list[dict]:
+    """The hydrated trips as TripNearbyOut rows, in the order rank returned them."""
+    by_id = {trip.id: trip for trip in trips}
+    return [
+        {**TripOut.model_validate(by_id[trip_id], from_attributes=True).model_dump(), "distance_km": round(distance, 3)}
+        for trip_id, distance in ranked if trip_id in by_id
+    ]
@@ -0,0 +1,36 @@
+from datetime import date
+from typing import Optional
+
+from app.models import Trip
+from app.services.locations import location_id_of
+
+
+def trip_search_filters(
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    departure_from: Optional[date] = None,
+    departure_to: Optional[date] = None,
+    min_capacity: Optional[int] = None,
+    max_price_per_kg: Optional[float] = None,
+) -> list:
+    """
+    WHERE clauses for searching active trips. Origin and destination are
+    resolved through their aliases to location ids, so any known spelling
+    matches; equality on status and the two ids plus the departure range
+    line up with the ix_trips_status_route_departure index, capacity and
+    price are residual.
+    """
+    filters = [Trip.status == "active"]
+    if origin:
+        filters.append(Trip.origin_id == location_id_of(origin))
+    if destination:
+        filters.append(Trip.destination_id == location_id_of(destination))
+    if departure_from:
+        filters.append(Trip.departure_date >= departure_from)
+    if departure_to:
+        filters.append(Trip.departure_date <= departure_to)
+    if min_capacity is not None:
+        filters.append(Trip.available_capacity >= min_capacity)
+    if max_price_per_kg is not None:
+        filters.append(Trip.price_per_kg <= max_price_per_kg)
+    return filters
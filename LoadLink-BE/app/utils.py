@@ -1,9 +1,60 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from fastapi import HTTPException
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import settings
+
+# Built on first use: the work factor comes from settings, which aren't read at import
+@lru_cache
+def pwd_context() -> CryptContext:
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    )
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
+
+# ---------------------------
+# Bounded hashing executor
+# ---------------------------
+# bcrypt releases the GIL, so a small dedicated thread pool keeps login bursts
+# off the shared request threadpool. Admission is capped: once
+# PASSWORD_HASH_MAX_PENDING hashes are running or queued, callers get a 503.
+@lru_cache
+def _hashing_pool() -> tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    executor = ThreadPoolExecutor(
+        max_workers=settings.PASSWORD_HASH_WORKERS or max(1, (os.cpu_count() or 2) // 2),
+        thread_name_prefix="pwhash",
+    )
+    return executor, threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+async def _run_hashing(fn, *args):
+    executor, slots = _hashing_pool()
+    if not slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=503,
+            detail="Too many authentication requests in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+    # The slot is freed when the hash finishes, even if the request was cancelled meanwhile
+    future = executor.submit(fn, *args)
+    future.add_done_callback(lambda _: slots.release())
+    return await asyncio.wrap_future(future)
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing(pwd_context().hash, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str):
+    """Returns (valid, new_hash); new_hash is set when the stored hash uses an outdated work factor."""
+    return await _run_hashing(pwd_context().verify_and_update, plain_password, hashed_password)
@@ -0,0 +1,89 @@
+"""
+Requests/sec on GET /trips/all and POST /bookings/ with ASYNC_DB off and on.
+
+Each mode runs in its own uvicorn process against the same database:
+
+    python -m benchmarks.bench_async_vs_sync --database-url postgresql://... \
+        --concurrency 64 --duration 15
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from benchmarks.common import create_trip, register_and_login, start_server, wait_ready
+
+
+async def seed(client: httpx.AsyncClient):
+    carrier = await register_and_login(client, "carrier")
+    shipper = await register_and_login(client, "shipper")
+    return shipper, await create_trip(client, carrier, capacity=10_000_000)
+
+
+async def hammer(client: httpx.AsyncClient, make_request, concurrency: int, duration: float):
+    done = errors = 0
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        nonlocal done, errors
+        while time.monotonic() < deadline:
+            response = await make_request()
+            if response.status_code >= 400:
+                errors += 1
+            done += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+    return done / elapsed, errors
+
+
+async def run_mode(args, async_db: bool):
+    port = args.port + int(async_db)
+    server = start_server(args.database_url, port, ASYNC_DB=async_db)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await wait_ready(client)
+            shipper, trip_id = await seed(client)
+            list_rps, list_errors = await hammer(
+                client, lambda: client.get("/trips/all", headers=shipper), args.concurrency, args.duration
+            )
+            book_rps, book_errors = await hammer(
+                client,
+                lambda: client.post("/bookings/", json={"trip_id": trip_id, "load_size": 1}, headers=shipper),
+                args.concurrency,
+                args.duration,
+            )
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "GET /trips/all": (list_rps, list_errors),
+        "POST /bookings/": (book_rps, book_errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./bench.sqlite3"))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    results = {mode: asyncio.run(run_mode(args, mode == "async")) for mode in ("sync", "async")}
+
+    print(f"{'route':<20}{'sync req/s':>14}{'async req/s':>14}{'speedup':>10}")
+    for route in results["sync"]:
+        sync_rps, sync_err = results["sync"][route]
+        async_rps, async_err = results["async"][route]
+        print(f"{route:<20}{sync_rps:>14.1f}{async_rps:>14.1f}{async_rps / sync_rps:>9.2f}x")
+        if sync_err or async_err:
+            print(f"{'':<20}{sync_err:>14} errors{async_err:>8} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+A multi-leg consignment booked leg by leg (one POST /bookings/ each) versus
+in a single POST /bookings/bulk. Each round books --legs legs, one per trip.
+
+    python -m benchmarks.bench_bulk_booking --database-url postgresql://... --legs 50 --rounds 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from benchmarks.common import create_trip, register_and_login, start_server, wait_ready
+
+
+async def run(args):
+    server = start_server(args.database_url, args.port, ASYNC_DB=args.async_db)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60) as client:
+            await wait_ready(client)
+            carrier = await register_and_login(client, "carrier")
+            shipper = await register_and_login(client, "shipper")
+            capacity = 2 * args.rounds
+            trips = [await create_trip(client, carrier, capacity=capacity) for _ in range(args.legs)]
+            legs = [{"trip_id": trip_id, "load_size": 1} for trip_id in trips]
+
+            sequential, bulk = [], []
+            for _ in range(args.rounds):
+                started = time.perf_counter()
+                for leg in legs:
+                    (await client.post("/bookings/", json=leg, headers=shipper)).raise_for_status()
+                sequential.append((time.perf_counter() - started) * 1000)
+
+                started = time.perf_counter()
+                (await client.post("/bookings/bulk", json={"bookings": legs}, headers=shipper)).raise_for_status()
+                bulk.append((time.perf_counter() - started) * 1000)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{args.legs} legs, {args.rounds} rounds, async_db={args.async_db}")
+    print(f"one POST per leg:  median {statistics.median(sequential):.1f} ms")
+    print(f"POST /bulk:        median {statistics.median(bulk):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./bench.sqlite3"))
+    parser.add_argument("--legs", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--async-db", action="store_true")
+    parser.add_argument("--port", type=int, default=8769)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Login throughput and GET /trips/all latency while a login flood is running.
+
+A pool of --flood-concurrency clients logs in continuously while a single
+probe client times /trips/all. Rejected logins (503 from the hashing
+executor's admission control) are counted separately from real errors.
+
+    python -m benchmarks.bench_login_flood --database-url postgresql://... \
+        --flood-concurrency 200 --duration 15 --hash-workers 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from benchmarks.common import create_trip, percentile, register_and_login, start_server, wait_ready
+
+
+async def run(args):
+    overrides = {"PASSWORD_HASH_MAX_PENDING": args.max_pending}
+    if args.hash_workers:
+        overrides["PASSWORD_HASH_WORKERS"] = args.hash_workers
+    server = start_server(args.database_url, args.port, **overrides)
+    limits = httpx.Limits(max_connections=args.flood_concurrency + 1)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as client:
+            await wait_ready(client)
+            carrier = await register_and_login(client, "carrier")
+            await create_trip(client, carrier, capacity=1000)
+            creds = {"email": "flood@example.com", "password": "flood-password"}
+            await client.post("/auth/register", json={**creds, "name": "flood", "role": "shipper", "phone": "0"})
+
+            deadline = time.monotonic() + args.duration
+            logins = {"ok": 0, "rejected": 0, "error": 0}
+            probe_latencies = []
+
+            async def flood():
+                while time.monotonic() < deadline:
+                    status = (await client.post("/auth/login", json=creds)).status_code
+                    key = "ok" if status == 200 else "rejected" if status == 503 else "error"
+                    logins[key] += 1
+
+            async def probe():
+                while time.monotonic() < deadline:
+                    started = time.perf_counter()
+                    await client.get("/trips/all", headers=carrier)
+                    probe_latencies.append((time.perf_counter() - started) * 1000)
+                    await asyncio.sleep(0.05)
+
+            started = time.monotonic()
+            await asyncio.gather(probe(), *(flood() for _ in range(args.flood_concurrency)))
+            elapsed = time.monotonic() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"logins ok:        {logins['ok']} ({logins['ok'] / elapsed:.1f}/s)")
+    print(f"logins rejected:  {logins['rejected']} ({logins['rejected'] / elapsed:.1f}/s, 503 fail-fast)")
+    print(f"logins errored:   {logins['error']}")
+    print(
+        f"/trips/all ms:    p50 {statistics.median(probe_latencies):.1f}"
+        f"  p95 {percentile(probe_latencies, 95):.1f}"
+        f"  p99 {percentile(probe_latencies, 99):.1f}"
+        f"  ({len(probe_latencies)} probes)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./bench.sqlite3"))
+    parser.add_argument("--flood-concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--hash-workers", type=int, default=None, help="defaults to the server setting")
+    parser.add_argument("--max-pending", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8768)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
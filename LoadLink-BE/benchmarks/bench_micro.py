@@ -0,0 +1,203 @@
+"""
+In-process micro-benchmarks for the hot paths: token decoding, the current
+user dependency, response serialization of 1k-row lists and the
+create_booking / get_all_trips handlers called directly on a Session.
+
+Results are median microseconds per operation. --save stores them as the
+baseline for this database backend; later runs are compared against it and
+exit 1 when a case is slower than the baseline by more than --threshold.
+Baselines are machine-specific, so record one on the machine you compare on.
+
+    python -m benchmarks.bench_micro --save                         # record a baseline (SQLite)
+    python -m benchmarks.bench_micro                                # compare against it
+    python -m benchmarks.bench_micro --database-url postgresql://... --only serialize
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks.common import upgrade_database
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+ROWS = 1000
+
+
+def measure(fn, repeats: int, min_seconds: float = 0.2) -> float:
+    """Median microseconds per call over `repeats` timed batches, each sized to run about min_seconds."""
+    fn()
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds / 4 or number >= 1_000_000:
+            break
+        number *= 4
+    number = max(1, int(number * min_seconds / max(elapsed, 1e-9)))
+
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number * 1e6)
+    return statistics.median(samples)
+
+
+def build_cases(db_url: str):
+    """Seed a carrier with ROWS active trips plus a shipper, and return {name: callable}."""
+    os.environ["DATABASE_URL"] = db_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+    from fastapi import Request, Response
+    from pydantic import TypeAdapter
+
+    from app.core.etag import ConditionalGet
+    from app.core.security import create_access_token, decode_access_token, verified_token_cache
+    from app.database import SessionLocal, init_engines
+    from app.dependencies import get_current_user, principal_cache
+    from app.models import Booking, Trip, User, Vehicle
+    from app.routes.booking import create_booking
+    from app.routes.trip import get_all_trips
+    from app.schemas.booking import BookingCreate, BookingResponse
+    from app.services.locations import resolve_locations
+    from app.services.trip_cache import ALL_ACTIVE_KEY, serialize_trips, trip_read_cache
+
+    upgrade_database(db_url)
+    init_engines()
+    db = SessionLocal()
+    suffix = uuid.uuid4().hex[:8]
+    carrier = User(name="bench carrier", email=f"micro-c-{suffix}@example.com", role="carrier",
+                   phone="0", joined_date=date.today(), password_hash="x")
+    shipper = User(name="bench shipper", email=f"micro-s-{suffix}@example.com", role="shipper",
+                   phone="0", joined_date=date.today(), password_hash="x")
+    db.add_all([carrier, shipper])
+    db.flush()
+    vehicle = Vehicle(carrier_id=carrier.id, type="truck", capacity=10**9,
+                      license_plate=f"MB{suffix}", rc_number=f"RC{suffix}")
+    db.add(vehicle)
+    db.flush()
+    route = resolve_locations(db, ["Mumbai", "Pune"])
+    departure = date.today() + timedelta(days=30)
+    trips = [
+        Trip(carrier_id=carrier.id, vehicle_id=vehicle.id, origin="Mumbai", destination="Pune",
+             origin_id=route["Mumbai"].id, destination_id=route["Pune"].id,
+             departure_date=departure + timedelta(days=i % 60), arrival_date=departure + timedelta(days=i % 60 + 1),
+             price_per_kg=2.5, total_capacity=10**9, available_capacity=10**9, status="active")
+        for i in range(ROWS)
+    ]
+    db.add_all(trips)
+    db.commit()
+    # Fully loaded, detached copies: the handlers' commits can't expire them
+    for instance in [carrier, shipper, vehicle, *trips]:
+        db.refresh(instance)
+    db.expunge_all()
+    bookings = [
+        Booking(id=uuid.uuid4(), trip_id=trip.id, shipper_id=shipper.id, load_size=10, total_price=25,
+                status="pending", created_date=date.today(), qr_generated=False)
+        for trip in trips
+    ]
+
+    token = create_access_token({"sub": str(shipper.id), "role": "shipper"})
+    booking_in = BookingCreate(trip_id=trips[0].id, load_size=1)
+    booking_list = TypeAdapter(list[BookingResponse])
+
+    def decode_cold():
+        verified_token_cache.clear()
+        decode_access_token(token)
+
+    def current_user_cold():
+        principal_cache.clear()
+        get_current_user(token=token, db=db)
+
+    def conditional_get():
+        return ConditionalGet(Request({"type": "http", "headers": []}), Response())
+
+    def all_trips_cold():
+        trip_read_cache.invalidate(ALL_ACTIVE_KEY)
+        get_all_trips(cond=conditional_get(), db=db, current_user=carrier)
+        db.expunge_all()
+
+    def cleanup():
+        db.rollback()
+        db.query(Booking).filter(Booking.shipper_id == shipper.id).delete()
+        db.query(Trip).filter(Trip.carrier_id == carrier.id).delete()
+        db.query(Vehicle).filter(Vehicle.id == vehicle.id).delete()
+        db.query(User).filter(User.id.in_([carrier.id, shipper.id])).delete()
+        db.commit()
+        db.close()
+
+    cases = {
+        "decode_access_token.cold": decode_cold,
+        "decode_access_token.cached": lambda: decode_access_token(token),
+        "get_current_user.cold": current_user_cold,
+        "get_current_user.cached": lambda: get_current_user(token=token, db=db),
+        f"serialize.trip_out.{ROWS}": lambda: serialize_trips(trips),
+        f"serialize.booking_response.{ROWS}": lambda: booking_list.dump_json(
+            booking_list.validate_python(bookings, from_attributes=True)
+        ),
+        "create_booking": lambda: create_booking(booking_in, db=db, current_user=shipper),
+        f"get_all_trips.cold.{ROWS}": all_trips_cold,
+        f"get_all_trips.cached.{ROWS}": lambda: get_all_trips(cond=conditional_get(), db=db, current_user=carrier),
+    }
+    return cases, cleanup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"),
+                        help="defaults to a throwaway SQLite file")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown vs baseline (0.15 = 15%%)")
+    parser.add_argument("--only", default="", help="run cases whose name contains this")
+    parser.add_argument("--save", action="store_true", help="write these results as the new baseline")
+    args = parser.parse_args()
+
+    tmpdir = None
+    db_url = args.database_url
+    if not db_url:
+        tmpdir = tempfile.TemporaryDirectory()
+        db_url = f"sqlite:///{tmpdir.name}/micro.sqlite3"
+    backend = db_url.split(":", 1)[0].split("+", 1)[0]
+    baseline_path = BASELINE_DIR / f"micro-{backend}.json"
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+
+    cases, cleanup = build_cases(db_url)
+    results, regressions = {}, []
+    try:
+        for name, fn in cases.items():
+            if args.only not in name:
+                continue
+            results[name] = round(measure(fn, args.repeats), 2)
+            line = f"{name:<36} {results[name]:>12.2f} us"
+            if name in baseline:
+                change = results[name] / baseline[name] - 1
+                line += f"   {change:+7.1%} vs baseline"
+                if change > args.threshold:
+                    line += "  REGRESSION"
+                    regressions.append(name)
+            print(line, flush=True)
+    finally:
+        cleanup()
+        if tmpdir:
+            tmpdir.cleanup()
+
+    if args.save:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps({**baseline, **results}, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {baseline_path}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+GET /trips/nearby candidate search: geohash cell ranges on the
+(status, {end}_geohash) index against a brute-force scan of every active
+trip's point, on a database filled by benchmarks.seed.
+
+Each of --queries random searches is a circle of 5..--max-radius-km around
+a point near one of the seeded cities (or, with --box, that circle's
+bounding box). The geohash path reads the candidates in the covering cells
+and ranks them with SearchArea.nearest; the baseline reads every active,
+upcoming trip and ranks them the same way, so it is only run for the first
+--baseline-queries searches. Reports p50 / p99 / max milliseconds per
+search, candidate precision (share of candidates read that land in the
+area) and checks both sides return the same trips.
+
+    python -m benchmarks.seed --database-url sqlite:///./bench.sqlite3 --trips 1000000 --bookings-per-trip 0
+    python -m benchmarks.bench_nearby --database-url sqlite:///./bench.sqlite3
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import time
+from datetime import date
+
+
+def percentiles(samples: list) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"p50 {statistics.median(ordered):>9.2f}   p99 {p99:>9.2f}   max {ordered[-1]:>9.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./bench.sqlite3"))
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--baseline-queries", type=int, default=20, help="searches also run through the full scan")
+    parser.add_argument("--max-radius-km", type=float, default=50.0)
+    parser.add_argument("--limit", type=int, default=50, help="trips returned per search")
+    parser.add_argument("--end", choices=("origin", "destination"), default="origin")
+    parser.add_argument("--box", action="store_true", help="search bounding boxes instead of circles")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+    from sqlalchemy import func, select
+
+    from app import database
+    from app.models import Location, Trip
+    from app.services.geo import SearchArea
+    from app.services.trip_nearby import NearbyParams
+
+    engine = database.init_engines()
+    lat, lng = getattr(Trip, f"{args.end}_lat"), getattr(Trip, f"{args.end}_lng")
+    everything = select(Trip.id, lat, lng).where(
+        Trip.status == "active", Trip.departure_date >= date.today(), lat.is_not(None)
+    )
+
+    with engine.connect() as connection:
+        total = connection.execute(select(func.count()).select_from(everything.subquery())).scalar_one()
+        centres = connection.execute(
+            select(Location.latitude, Location.longitude).where(Location.latitude.is_not(None))
+        ).all()
+        if not total or not centres:
+            raise SystemExit("no active upcoming trips with points; seed the database first (python -m benchmarks.seed)")
+        print(f"{total} active upcoming trips with a point at their {args.end}")
+
+        rng = random.Random(args.seed)
+        searches = []
+        for _ in range(args.queries):
+            centre_lat, centre_lng = rng.choice(centres)
+            circle = {
+                "lat": centre_lat + rng.uniform(-0.2, 0.2), "lng": centre_lng + rng.uniform(-0.2, 0.2),
+                "radius_km": rng.uniform(5, args.max_radius_km),
+            }
+            box = dict.fromkeys(("min_lat", "min_lng", "max_lat", "max_lng"))
+            if args.box:
+                area = SearchArea.radius(**circle)
+                box = {"min_lat": area.min_lat, "min_lng": area.min_lng, "max_lat": area.max_lat, "max_lng": area.max_lng}
+                circle = dict.fromkeys(circle)
+            searches.append(NearbyParams(
+                **circle, **box, end=args.end, departure_from=None, departure_to=None, limit=args.limit,
+            ))
+
+        cell_ms, scan_ms, read, kept, mismatches = [], [], 0, 0, 0
+        for number, near in enumerate(searches):
+            started = time.perf_counter()
+            candidates = connection.execute(near.candidates()).all()
+            ranked = near.rank(candidates)
+            cell_ms.append((time.perf_counter() - started) * 1000)
+            read += len(candidates)
+            kept += len(near.area.nearest(candidates, len(candidates)))
+
+            if number < args.baseline_queries:
+                started = time.perf_counter()
+                expected = near.rank(connection.execute(everything).all())
+                scan_ms.append((time.perf_counter() - started) * 1000)
+                mismatches += [trip_id for trip_id, _ in ranked] != [trip_id for trip_id, _ in expected]
+
+    shape = "boxes" if args.box else "circles"
+    print(f"{args.queries} searches ({shape} of 5..{args.max_radius_km:g} km, k={args.limit}), milliseconds per search:")
+    print(f"  geohash  {percentiles(cell_ms)}")
+    if scan_ms:
+        print(f"  scan     {percentiles(scan_ms)}   ({len(scan_ms)} searches)")
+    print(f"candidates read per search: {read / args.queries:.0f}, "
+          f"precision {kept / read if read else math.nan:.2f} (share inside the area)")
+    if mismatches:
+        print(f"{mismatches} searches returned different trips from the full scan")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
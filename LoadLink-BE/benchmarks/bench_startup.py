@@ -0,0 +1,169 @@
+"""
+Cold-start cost of an API worker. Each measurement runs in a fresh interpreter:
+
+- import: `python -X importtime` over `import app.main` and over
+  create_app(); the per-module breakdown lists the app's own modules and the
+  third-party packages they pull in, by cumulative import time
+- time to first request: from spawning uvicorn to the first 200 from
+  /health/db-pool, then the first request that touches the database
+- memory: the worker's resident set size once it has served those requests
+
+Results are medians over --repeats runs. --save stores them as the baseline;
+later runs are compared against it and exit 1 past --threshold, like
+bench_micro. Baselines are machine-specific.
+
+    python -m benchmarks.bench_startup --save
+    python -m benchmarks.bench_startup --top 25
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import start_server, upgrade_database
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "startup.json"
+IMPORT_SNIPPETS = {
+    "import app.main": "import app.main",
+    "create_app()": "import app.main; app.main.create_app()",
+}
+
+
+def _env(database_url: str) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    env.setdefault("SECRET_KEY", "benchmark-secret")
+    return env
+
+
+def import_profile(snippet: str, database_url: str) -> tuple[float, dict]:
+    """(total ms, {module: cumulative ms}) from one `python -X importtime` run."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", snippet],
+        env=_env(database_url), capture_output=True, text=True, check=True,
+    )
+    total = (time.perf_counter() - started) * 1000
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative) / 1000
+    return total, modules
+
+
+def by_package(modules: dict) -> dict:
+    """Own modules (app.*) as they are, everything else rolled up to its top-level package."""
+    rolled = defaultdict(float)
+    for name, ms in modules.items():
+        if name.startswith("app.") or name == "app":
+            rolled[name] = ms
+        elif "." not in name:
+            rolled[name] = max(rolled[name], ms)
+    return rolled
+
+
+def first_requests(database_url: str, port: int) -> dict:
+    started = time.perf_counter()
+    server = start_server(database_url, port)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=10) as client:
+            while True:
+                try:
+                    if client.get("/health/db-pool").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None:
+                    raise RuntimeError("server exited during startup")
+                time.sleep(0.01)
+            ready = (time.perf_counter() - started) * 1000
+
+            # Unknown user: one SELECT on a fresh pool, no bcrypt work
+            db_started = time.perf_counter()
+            client.post("/auth/login", json={"email": "nobody@example.com", "password": "x"})
+            first_db = (time.perf_counter() - db_started) * 1000
+
+        rss_mb = None
+        status = Path(f"/proc/{server.pid}/status")
+        if status.exists():
+            for line in status.read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    rss_mb = int(line.split()[1]) / 1024
+        return {"time_to_first_request_ms": ready, "first_db_request_ms": first_db, "worker_rss_mb": rss_mb}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="defaults to a throwaway SQLite file")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="modules to list in the import breakdown")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown vs baseline (0.15 = 15%%)")
+    parser.add_argument("--save", action="store_true", help="write these results as the new baseline")
+    args = parser.parse_args()
+
+    tmpdir = None
+    database_url = args.database_url
+    if not database_url:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{tmpdir.name}/startup.sqlite3"
+    upgrade_database(database_url)
+
+    samples = defaultdict(list)
+    breakdown = defaultdict(list)
+    try:
+        for _ in range(args.repeats):
+            for label, snippet in IMPORT_SNIPPETS.items():
+                total, modules = import_profile(snippet, database_url)
+                samples[f"{label} ms"].append(total)
+                if label == "create_app()":
+                    for name, ms in by_package(modules).items():
+                        breakdown[name].append(ms)
+            for key, value in first_requests(database_url, args.port).items():
+                if value is not None:
+                    samples[key].append(value)
+    finally:
+        if tmpdir:
+            tmpdir.cleanup()
+
+    print(f"import breakdown for create_app() (cumulative ms, median of {args.repeats}):")
+    ranked = sorted(((statistics.median(values), name) for name, values in breakdown.items()), reverse=True)
+    for ms, name in ranked[:args.top]:
+        print(f"  {name:<40} {ms:>8.1f}")
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    results, regressions = {}, []
+    for name, values in samples.items():
+        results[name] = round(statistics.median(values), 2)
+        line = f"{name:<28} {results[name]:>10.2f}"
+        if name in baseline:
+            change = results[name] / baseline[name] - 1
+            line += f"   {change:+7.1%} vs baseline"
+            if change > args.threshold:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        BASELINE_PATH.parent.mkdir(exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {BASELINE_PATH}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
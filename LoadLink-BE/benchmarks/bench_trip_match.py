@@ -0,0 +1,93 @@
+"""
+GET /trips/match ranking: the in-memory trip_matcher index against the SQL
+it replaces, on a database filled by benchmarks.seed.
+
+Loads the index the way a worker does at startup (build time and trip count
+are reported), then runs the same --queries random matches through both:
+routes are drawn in proportion to how many trips they have, so whale routes
+dominate as they would in production, with a random date window and load.
+Reports p50 / p99 / max microseconds per match and checks that both sides
+return the same trips.
+
+    python -m benchmarks.seed --database-url sqlite:///./bench.sqlite3 --trips 200000
+    python -m benchmarks.bench_trip_match --database-url sqlite:///./bench.sqlite3
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+
+def percentiles(samples: list) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"p50 {statistics.median(ordered):>9.1f}   p99 {p99:>9.1f}   max {ordered[-1]:>9.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./bench.sqlite3"))
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10, help="k, matches returned per query")
+    parser.add_argument("--max-window-days", type=int, default=30)
+    parser.add_argument("--max-load", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+    from sqlalchemy import func, select
+
+    from app import database
+    from app.models import Location, Trip
+    from app.services.trip_matching import load_trip_matcher, match_query, trip_matcher
+
+    engine = database.init_engines()
+    started = time.perf_counter()
+    load_trip_matcher()
+    build_ms = (time.perf_counter() - started) * 1000
+    stats = trip_matcher.stats()
+    print(f"index: {stats['trips']} active trips on {stats['routes']} routes, built in {build_ms:.0f} ms")
+    if not stats["trips"]:
+        raise SystemExit("no active upcoming trips; seed the database first (python -m benchmarks.seed)")
+
+    with engine.connect() as connection:
+        names = dict(connection.execute(select(Location.id, Location.name)).all())
+        weights = connection.execute(
+            select(Trip.origin_id, Trip.destination_id, func.count())
+            .where(Trip.status == "active", Trip.departure_date >= date.today())
+            .group_by(Trip.origin_id, Trip.destination_id)
+        ).all()
+        rng = random.Random(args.seed)
+        routes = rng.choices([(row[0], row[1]) for row in weights], [row[2] for row in weights], k=args.queries)
+        queries = []
+        for origin, destination in routes:
+            date_from = date.today() + timedelta(days=rng.randrange(0, 60))
+            date_to = date_from + timedelta(days=rng.randrange(1, args.max_window_days + 1))
+            queries.append((origin, destination, date_from, date_to, rng.randrange(1, args.max_load)))
+
+        index_us, sql_us, mismatches = [], [], 0
+        for origin, destination, date_from, date_to, load_size in queries:
+            started = time.perf_counter()
+            matched = trip_matcher.match(origin, destination, date_from, date_to, load_size, args.limit)
+            index_us.append((time.perf_counter() - started) * 1e6)
+
+            query = match_query(names[origin], names[destination], date_from, date_to, load_size, args.limit)
+            started = time.perf_counter()
+            expected = connection.execute(query.with_only_columns(Trip.id)).scalars().all()
+            sql_us.append((time.perf_counter() - started) * 1e6)
+            mismatches += matched != list(expected)
+
+    print(f"{args.queries} matches, k={args.limit}, microseconds per match:")
+    print(f"  index  {percentiles(index_us)}")
+    print(f"  sql    {percentiles(sql_us)}")
+    if mismatches:
+        print(f"{mismatches} queries ranked differently from SQL")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
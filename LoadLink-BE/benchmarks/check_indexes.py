@@ -0,0 +1,284 @@
+"""
+Fails when a query path in the routers has no supporting index.
+
+Migrates a scratch database to head, drives every route of the in-process
+app once, and records each SELECT / UPDATE / DELETE the routes issue. Each
+distinct statement is then re-planned with its captured parameters:
+EXPLAIN QUERY PLAN on SQLite, EXPLAIN with enable_seqscan=off on Postgres
+(so a sequential scan in the plan means no index could serve it). A full
+scan of a table fails the check; a sort the index order can't provide is
+reported as a warning. Routes the walk doesn't reach are listed so the walk
+stays complete as routers are added.
+
+    python -m benchmarks.check_indexes                             # throwaway SQLite file
+    python -m benchmarks.check_indexes --async-db
+    python -m benchmarks.check_indexes --database-url postgresql://.../scratch
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import uuid
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.common import create_vehicle, register_and_login, upgrade_database
+
+# (method, path, body, role, name to save the response id under)
+WALK = [
+    ("GET", "/users/me", None, "shipper", None),
+    ("GET", "/users/{carrier_id}", None, "shipper", None),
+    ("GET", "/users/shipper/{shipper_id}", None, "carrier", None),
+    ("GET", "/locations/search?q=mumb", None, "shipper", None),
+    ("GET", "/vehicles/", None, "carrier", None),
+    ("GET", "/vehicles/{vehicle_id}", None, "carrier", None),
+    ("PUT", "/vehicles/{vehicle_id}", {"type": "truck", "capacity": 5000, "license_plate": "{plate}",
+                                       "rc_number": "{plate}"}, "carrier", None),
+    ("POST", "/trips/", {"vehicle_id": "{vehicle_id}", "origin": "Mumbai", "destination": "Pune",
+                         "departure_date": "2030-01-01", "arrival_date": "2030-01-02",
+                         "price_per_kg": 2.5, "status": "active"}, "carrier", "trip_id"),
+    ("POST", "/trips/import?format=ndjson", "ndjson", "carrier", None),
+    ("GET", "/trips/all", None, "shipper", None),
+    ("GET", "/trips/my", None, "carrier", None),
+    ("GET", "/trips/search?origin=Mumbai&destination=Pune&departure_from=2029-01-01", None, "shipper", None),
+    ("GET", "/trips/search?origin=bombay&destination=Pune", None, "shipper", None),
+    ("GET", "/trips/search?departure_from=2029-01-01&departure_to=2031-01-01", None, "shipper", None),
+    ("GET", "/trips/match?origin=Mumbai&destination=Pune&load_size=10&date_to=2031-01-01", None, "shipper", None),
+    ("GET", "/trips/nearby?lat=19.0760&lng=72.8777&radius_km=30", None, "shipper", None),
+    ("GET", "/trips/nearby?min_lat=18&min_lng=73&max_lat=19&max_lng=74&end=destination", None, "shipper", None),
+    ("GET", "/trips/{trip_id}", None, "shipper", None),
+    ("PUT", "/trips/{trip_id}", {"price_per_kg": 3.0}, "carrier", None),
+    ("POST", "/bookings/", {"trip_id": "{trip_id}", "load_size": 10}, "shipper", "booking_id"),
+    ("POST", "/bookings/bulk", {"bookings": [{"trip_id": "{trip_id}", "load_size": 5}] * 2}, "shipper", None),
+    ("POST", "/bookings/", {"trip_id": "{trip_id}", "load_size": 1}, "shipper", "spare_booking_id"),
+    ("GET", "/bookings/", None, "shipper", None),
+    ("GET", "/bookings/", None, "carrier", None),
+    ("GET", "/bookings/export?date_from=2020-01-01", None, "shipper", None),
+    ("GET", "/bookings/{booking_id}", None, "shipper", None),
+    ("PUT", "/bookings/{booking_id}", {"notes": "fragile"}, "carrier", None),
+    ("GET", "/bookings/trip/{trip_id}", None, "carrier", None),
+    ("POST", "/payments/{booking_id}", None, "shipper", None),
+    ("GET", "/payments/me", None, "shipper", None),
+    ("GET", "/payments/me", None, "carrier", None),
+    ("GET", "/payments/me/export", None, "shipper", None),
+    ("POST", "/reviews/", {"booking_id": "{booking_id}", "to_user_id": "{carrier_id}", "rating": 4},
+     "shipper", "review_id"),
+    ("GET", "/reviews/", None, "shipper", None),
+    ("GET", "/reviews/{review_id}", None, "shipper", None),
+    ("PUT", "/reviews/{review_id}", {"rating": 5}, "shipper", None),
+    ("DELETE", "/reviews/{review_id}", None, "shipper", None),
+    ("DELETE", "/bookings/{spare_booking_id}", None, "shipper", None),
+    ("POST", "/trips/", {"vehicle_id": "{spare_vehicle_id}", "origin": "Pune", "destination": "Nashik",
+                         "departure_date": "2030-02-01", "arrival_date": "2030-02-02",
+                         "price_per_kg": 2.0, "status": "active"}, "carrier", "spare_trip_id"),
+    ("DELETE", "/trips/{spare_trip_id}", None, "carrier", None),
+    ("DELETE", "/vehicles/{spare_vehicle_id}", None, "carrier", None),
+    ("GET", "/health/db-pool", None, None, None),
+    ("GET", "/health/caches", None, None, None),
+    ("GET", "/metrics", None, None, None),
+]
+
+# Whole-table reads that are the point of the route, not a missing index
+EXPECTED_SCANS = {
+    # Reloads every alias into the in-process trigram index (non-Postgres databases)
+    "GET /locations/search": {"location_aliases", "locations"},
+}
+
+_PLANNED = ("select", "with", "update", "delete")
+_SQLITE_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+_PG_PARAM = re.compile(r"\$(\d+)")
+
+
+def fill(value, ids: dict):
+    if isinstance(value, dict):
+        return {key: fill(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill(item, ids) for item in value]
+    return value.format(**ids) if isinstance(value, str) else value
+
+
+# ---------------------------
+# Statement capture
+# ---------------------------
+class Capture:
+    """First parameters seen for each (route, statement) the routes execute."""
+
+    def __init__(self):
+        self.statements = {}
+
+    def attach(self, engine):
+        from sqlalchemy import event
+
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        from app.core.query_stats import current_route
+
+        route = current_route()
+        if route is None or executemany or not statement.lstrip()[:6].lower().startswith(_PLANNED):
+            return
+        self.statements.setdefault((route, statement), parameters)
+
+
+async def walk(client: httpx.AsyncClient):
+    headers = {
+        "carrier": await register_and_login(client, "carrier"),
+        "shipper": await register_and_login(client, "shipper"),
+        None: {},
+    }
+    ids = {
+        "carrier_id": (await client.get("/users/me", headers=headers["carrier"])).json()["id"],
+        "shipper_id": (await client.get("/users/me", headers=headers["shipper"])).json()["id"],
+        "vehicle_id": await create_vehicle(client, headers["carrier"], 5000),
+        "spare_vehicle_id": await create_vehicle(client, headers["carrier"], 5000),
+    }
+    vehicle = (await client.get(f"/vehicles/{ids['vehicle_id']}", headers=headers["carrier"])).json()
+    ids["plate"] = vehicle["license_plate"]
+
+    for method, path, body, role, save in WALK:
+        url = fill(path, ids)
+        if body == "ndjson":
+            trip = {"vehicle_id": ids["vehicle_id"], "origin": "Mumbai", "destination": "Surat",
+                    "departure_date": "2030-03-01", "arrival_date": "2030-03-02", "price_per_kg": 2.0}
+            response = await client.request(method, url, content=json.dumps(trip) + "\n", headers=headers[role])
+        else:
+            response = await client.request(method, url, json=fill(body, ids), headers=headers[role])
+        if response.status_code >= 400:
+            print(f"note: {method} {url} answered {response.status_code}: {response.text[:120]}", file=sys.stderr)
+        elif save:
+            ids[save] = response.json()["id"]
+
+
+def route_tracker(app, reached: set):
+    """httpx response hook adding the route template of every request that didn't fail server-side."""
+    from fastapi.routing import APIRoute
+    from starlette.routing import Match
+
+    routes = [route for route in app.routes if isinstance(route, APIRoute)]
+
+    async def track(response: httpx.Response):
+        if response.status_code >= 500:
+            return
+        scope = {"type": "http", "method": response.request.method, "path": response.request.url.path}
+        for route in routes:
+            if route.matches(scope)[0] == Match.FULL:
+                reached.add(f"{scope['method']} {route.path}")
+                return
+
+    return track
+
+
+# ---------------------------
+# Plans
+# ---------------------------
+def _pg_statement(statement: str, parameters):
+    # asyncpg statements use $1..$n; replay them through psycopg2's positional %s
+    if isinstance(parameters, (list, tuple)) and _PG_PARAM.search(statement):
+        statement = _PG_PARAM.sub("%s", statement.replace("%", "%%"))
+        parameters = [str(value) if isinstance(value, uuid.UUID) else value for value in parameters]
+    return statement, parameters
+
+
+def plan_problems(engine, statement: str, parameters) -> tuple[list, list]:
+    """(tables read by full scan, sort warnings) for one statement."""
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if engine.dialect.name == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            details = [row[-1] for row in cursor.fetchall()]
+            scans = [m.group(1) for m in map(_SQLITE_FULL_SCAN.match, details) if m]
+            sorts = [detail for detail in details if detail.startswith("USE TEMP B-TREE FOR ORDER BY")]
+            return scans, sorts
+
+        statement, parameters = _pg_statement(statement, parameters)
+        cursor.execute("SET enable_seqscan = off")
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        scans, sorts = [], []
+        pending = [cursor.fetchone()[0][0]["Plan"]]
+        while pending:
+            node = pending.pop()
+            if node["Node Type"] == "Seq Scan":
+                scans.append(node["Relation Name"])
+            elif node["Node Type"] == "Sort":
+                sorts.append("Sort on " + ", ".join(node.get("Sort Key", [])))
+            pending.extend(node.get("Plans", []))
+        return scans, sorts
+    finally:
+        raw.rollback()
+        raw.close()
+
+
+async def run(args):
+    os.environ.update(DATABASE_URL=args.database_url, ASYNC_DB=str(args.async_db).lower(), BCRYPT_ROUNDS="4")
+    os.environ.setdefault("SECRET_KEY", "index-check-secret")
+    upgrade_database(args.database_url)
+
+    from fastapi.routing import APIRoute
+
+    from app import database
+    from app.main import create_app
+
+    app = create_app()
+    capture, reached = Capture(), set()
+    # ASGITransport sends no lifespan events: start the engines here, and keep the sync one for EXPLAIN
+    engine = database.init_engines()
+    capture.attach(engine)
+    if database.async_engine is not None:
+        capture.attach(database.async_engine.sync_engine)
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://check",
+            event_hooks={"response": [route_tracker(app, reached)]},
+        ) as client:
+            await walk(client)
+    finally:
+        if database.async_engine is not None:
+            await database.async_engine.dispose()
+
+    routes = {f"{method} {route.path}" for route in app.routes if isinstance(route, APIRoute) for method in route.methods}
+    return capture.statements, routes - reached, engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="scratch database (it gets test rows); defaults to a temp SQLite file")
+    parser.add_argument("--async-db", action="store_true", help="walk the AsyncSession routers")
+    parser.add_argument("--strict-sorts", action="store_true", help="fail on unindexed sorts too")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if not args.database_url:
+        tmpdir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{tmpdir.name}/index-check.sqlite3"
+
+    from app.core.slow_queries import redact
+
+    statements, unreached, engine = asyncio.run(run(args))
+    failures, warnings = defaultdict(list), defaultdict(list)
+    for (route, statement), parameters in statements.items():
+        scans, sorts = plan_problems(engine, statement, parameters)
+        for table in set(scans) - EXPECTED_SCANS.get(route, set()):
+            failures[route].append(f"full scan of {table}: {redact(statement)}")
+        for sort in sorts:
+            (failures if args.strict_sorts else warnings)[route].append(f"{sort}: {redact(statement)}")
+    if tmpdir:
+        tmpdir.cleanup()
+
+    for label, found in (("WARN", warnings), ("FAIL", failures)):
+        for route in sorted(found):
+            for problem in found[route]:
+                print(f"{label} {route}: {problem}")
+    for route in sorted(unreached):
+        print(f"not walked: {route}")
+    print(f"{len(statements)} statements planned, {sum(map(len, failures.values()))} without a supporting index")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
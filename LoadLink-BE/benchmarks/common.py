@@ -0,0 +1,83 @@
+"""Helpers shared by the HTTP-level benchmarks: a uvicorn subprocess and seed data."""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+def upgrade_database(database_url: str):
+    """alembic upgrade head against database_url; the app no longer creates its tables on import."""
+    from alembic import command
+    from alembic.config import Config
+
+    os.environ.setdefault("DATABASE_URL", database_url)
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+    command.upgrade(config, "head")
+
+
+def start_server(database_url: str, port: int, **env_overrides) -> subprocess.Popen:
+    upgrade_database(database_url)
+    env = dict(os.environ, DATABASE_URL=database_url)
+    env.setdefault("SECRET_KEY", "benchmark-secret")
+    env.update({key: str(value).lower() if isinstance(value, bool) else str(value) for key, value in env_overrides.items()})
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get("/docs")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def register_and_login(client: httpx.AsyncClient, role: str) -> dict:
+    email = f"bench-{role}-{uuid.uuid4().hex[:8]}@example.com"
+    creds = {"email": email, "password": "benchmark-pass"}
+    await client.post("/auth/register", json={**creds, "name": f"bench {role}", "role": role, "phone": "0000000000"})
+    token = (await client.post("/auth/login", json=creds)).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def create_vehicle(client: httpx.AsyncClient, carrier: dict, capacity: int) -> str:
+    plate = uuid.uuid4().hex[:10]
+    vehicle = (await client.post(
+        "/vehicles/",
+        json={"type": "truck", "capacity": capacity, "license_plate": plate, "rc_number": plate},
+        headers=carrier,
+    )).json()
+    return vehicle["id"]
+
+
+async def create_trip(client: httpx.AsyncClient, carrier: dict, capacity: int, vehicle_id: str = None) -> str:
+    vehicle_id = vehicle_id or await create_vehicle(client, carrier, capacity)
+    trip = (await client.post(
+        "/trips/",
+        json={
+            "vehicle_id": vehicle_id, "origin": "Mumbai", "destination": "Pune",
+            "departure_date": "2030-01-01", "arrival_date": "2030-01-02",
+            "price_per_kg": 2.5, "status": "active",
+        },
+        headers=carrier,
+    )).json()
+    return trip["id"]
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
@@ -0,0 +1,246 @@
+"""
+Scenario-driven load test. A scenario file (see benchmarks/scenarios/) sets
+how many virtual shippers and carriers run, for how long, and the weighted
+mix of requests each role sends. Every virtual user logs in, then loops:
+pick a step by weight, send it, sleep a random think time.
+
+Step paths and JSON bodies may reference "{name}" placeholders, filled with a
+random value from the user's own list of that name or the shared one:
+"trips" (all seeded trips), "my_trips", "my_vehicles", "bookings" (the
+user's unpaid bookings) and "{uuid}" for fresh unique values. "save": name
+appends the response's id to that list; "consume": name removes the value
+used; "expect": [statuses] overrides the default of any status below 400
+counting as success. A step whose list is empty is skipped for that turn.
+
+    python -m benchmarks.loadtest benchmarks/scenarios/peak_hour.json                 # in-process ASGI app
+    python -m benchmarks.loadtest scenario.json --start-server --async-db             # uvicorn subprocess
+    python -m benchmarks.loadtest scenario.json --base-url http://127.0.0.1:8000 \\
+        --json-out after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.common import (
+    create_trip, create_vehicle, percentile, register_and_login, start_server, upgrade_database, wait_ready,
+)
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+class VirtualUser:
+    def __init__(self, role: str, headers: dict, shared: dict):
+        self.role = role
+        self.headers = headers
+        self.shared = shared
+        self.state = defaultdict(list)
+
+    def pool(self, name: str) -> list:
+        return self.state[name] if self.state[name] else self.shared.get(name, [])
+
+    def render(self, value, used: dict):
+        """Fill placeholders in a path or JSON body, remembering which value each one took."""
+        if isinstance(value, dict):
+            return {key: self.render(item, used) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.render(item, used) for item in value]
+        if not isinstance(value, str):
+            return value
+
+        def fill(match):
+            name = match.group(1)
+            if name == "uuid":
+                return uuid.uuid4().hex[:12]
+            if name not in used:
+                choices = self.pool(name)
+                if not choices:
+                    raise LookupError(name)
+                used[name] = random.choice(choices)
+            return used[name]
+
+        return _PLACEHOLDER.sub(fill, value)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.skipped = defaultdict(int)
+
+    def record(self, route: str, seconds: float, ok: bool):
+        self.latencies[route].append(seconds * 1000)
+        if not ok:
+            self.errors[route] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        routes = {}
+        for route, samples in sorted(self.latencies.items()):
+            routes[route] = {
+                "requests": len(samples),
+                "rps": round(len(samples) / elapsed, 2),
+                "error_rate": round(self.errors[route] / len(samples), 4),
+                "p50_ms": round(statistics.median(samples), 2),
+                "p95_ms": round(percentile(samples, 95), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+                "max_ms": round(max(samples), 2),
+                "skipped": self.skipped[route],
+            }
+        total = sum(len(samples) for samples in self.latencies.values())
+        every = [sample for samples in self.latencies.values() for sample in samples]
+        overall = {
+            "requests": total,
+            "rps": round(total / elapsed, 2),
+            "error_rate": round(sum(self.errors.values()) / total, 4) if total else 0,
+            "p50_ms": round(statistics.median(every), 2) if every else 0,
+            "p95_ms": round(percentile(every, 95), 2) if every else 0,
+            "p99_ms": round(percentile(every, 99), 2) if every else 0,
+        }
+        return {"elapsed_s": round(elapsed, 2), "overall": overall, "routes": routes}
+
+
+async def setup(client: httpx.AsyncClient, scenario: dict) -> list[VirtualUser]:
+    config = scenario.get("setup", {})
+    shared = {"trips": []}
+    users = []
+    for _ in range(scenario["users"].get("carrier", 0)):
+        carrier = VirtualUser("carrier", await register_and_login(client, "carrier"), shared)
+        capacity = config.get("capacity", 1_000_000)
+        for _ in range(config.get("vehicles_per_carrier", 1)):
+            carrier.state["my_vehicles"].append(await create_vehicle(client, carrier.headers, capacity))
+        for i in range(config.get("trips_per_carrier", 5)):
+            vehicle_id = carrier.state["my_vehicles"][i % len(carrier.state["my_vehicles"])]
+            carrier.state["my_trips"].append(await create_trip(client, carrier.headers, capacity, vehicle_id))
+        shared["trips"].extend(carrier.state["my_trips"])
+        users.append(carrier)
+    for _ in range(scenario["users"].get("shipper", 0)):
+        users.append(VirtualUser("shipper", await register_and_login(client, "shipper"), shared))
+    return users
+
+
+async def drive(client: httpx.AsyncClient, user: VirtualUser, steps: list, deadline: float, think: tuple, recorder: Recorder):
+    weights = [step["weight"] for step in steps]
+    while time.monotonic() < deadline:
+        step = random.choices(steps, weights)[0]
+        route = f"{step['method']} {step['path'].split('?')[0]}"
+        used = {}
+        try:
+            path = user.render(step["path"], used)
+            body = user.render(step.get("json"), used)
+        except LookupError:
+            recorder.skipped[route] += 1
+            await asyncio.sleep(think[0] / 1000)
+            continue
+        if step.get("consume"):
+            user.state[step["consume"]].remove(used[step["consume"]])
+
+        started = time.perf_counter()
+        try:
+            response = await client.request(step["method"], path, json=body, headers=user.headers)
+            ok = response.status_code in step["expect"] if "expect" in step else response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        recorder.record(route, time.perf_counter() - started, ok)
+
+        if ok and step.get("save") and response.status_code < 300:
+            user.state[step["save"]].append(response.json()["id"])
+        await asyncio.sleep(random.uniform(*think) / 1000)
+
+
+async def run(args, scenario: dict) -> dict:
+    server, lifespan = None, None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    elif args.start_server:
+        server = start_server(args.database_url, args.port, ASYNC_DB=args.async_db, BCRYPT_ROUNDS=args.bcrypt_rounds)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60)
+    else:
+        os.environ.update(DATABASE_URL=args.database_url, ASYNC_DB=str(args.async_db).lower(),
+                          BCRYPT_ROUNDS=str(args.bcrypt_rounds))
+        os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+        upgrade_database(args.database_url)
+        from app.main import create_app
+        app = create_app()
+        # ASGITransport sends no lifespan events, so start (and later stop) the engines here
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=60)
+
+    try:
+        async with client:
+            if server:
+                await wait_ready(client)
+            users = await setup(client, scenario)
+            recorder = Recorder()
+            think = tuple(scenario.get("think_time_ms", [0, 0]))
+            duration = args.duration or scenario["duration"]
+            deadline = time.monotonic() + duration
+            started = time.monotonic()
+            await asyncio.gather(*(
+                drive(client, user, scenario["mix"][user.role], deadline, think, recorder) for user in users
+            ))
+            return recorder.summary(time.monotonic() - started)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        elif lifespan:
+            # Also closes aiosqlite/asyncpg connections that would keep the process alive
+            await lifespan.__aexit__(None, None, None)
+
+
+def print_report(name: str, report: dict, baseline: dict = None):
+    print(f"scenario {name}: {report['elapsed_s']}s")
+    header = f"{'route':<34} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(header + ("  p95 vs baseline" if baseline else ""))
+    rows = list(report["routes"].items()) + [("overall", report["overall"])]
+    for route, stats in rows:
+        line = (
+            f"{route:<34} {stats['requests']:>7} {stats['rps']:>8.1f} {stats['error_rate'] * 100:>6.2f}"
+            f" {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}"
+        )
+        before = (baseline or {}).get("routes", {}).get(route) if route != "overall" else (baseline or {}).get("overall")
+        if before and before.get("p95_ms"):
+            line += f"  {stats['p95_ms'] / before['p95_ms'] - 1:+7.1%}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", help="scenario JSON file")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./bench.sqlite3"))
+    parser.add_argument("--base-url", help="drive an already running server instead")
+    parser.add_argument("--start-server", action="store_true", help="run the app under uvicorn in a subprocess")
+    parser.add_argument("--async-db", action="store_true")
+    parser.add_argument("--duration", type=float, help="override the scenario duration (seconds)")
+    parser.add_argument("--bcrypt-rounds", type=int, default=4, help="cheap hashing so setup logins stay fast")
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--json-out", help="write the report as JSON, e.g. to compare builds later")
+    parser.add_argument("--compare", help="earlier --json-out report to diff p95 latency against")
+    args = parser.parse_args()
+
+    with open(args.scenario) as f:
+        scenario = json.load(f)
+    report = asyncio.run(run(args, scenario))
+    report["scenario"] = scenario["name"]
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(scenario["name"], report, baseline)
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Bulk data generator for performance work. Fills an empty database with
+users, vehicles, trips, bookings, payments and reviews that respect the
+app's invariants:
+
+- every trip runs on one of its carrier's vehicles and its bookings never
+  add up to more than the vehicle's capacity (available_capacity is what's left)
+- only bookings with status "paid" have a payment, for exactly total_price
+- reviews belong to paid bookings, written by the shipper about the carrier;
+  user rating aggregates (rating_sum, review_count, rating) match them
+
+Skew is configurable: carriers get trips with Zipf weights (a few whale
+carriers own most of them) and routes are drawn from a Zipf distribution
+over city pairs. Pickup and drop-off points are scattered up to
+--spread-km around each city's centre. The same --seed always produces the same data. Rows go in
+with COPY on Postgres and batched executemany INSERTs elsewhere.
+
+    python -m benchmarks.seed --database-url postgresql://... --trips 1000000 --bookings-per-trip 6
+    python -m benchmarks.seed --database-url sqlite:///./bench.sqlite3 --users 2000 --trips 20000
+"""
+import argparse
+import bisect
+import csv
+import io
+import itertools
+import math
+import os
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks.common import upgrade_database
+
+CITIES = [
+    "Mumbai", "Delhi", "Bengaluru", "Hyderabad", "Ahmedabad", "Chennai", "Kolkata", "Pune", "Jaipur", "Surat",
+    "Lucknow", "Kanpur", "Nagpur", "Indore", "Thane", "Bhopal", "Visakhapatnam", "Patna", "Vadodara", "Ludhiana",
+    "Agra", "Nashik", "Rajkot", "Varanasi", "Amritsar", "Coimbatore", "Kochi", "Guwahati", "Raipur", "Mysuru",
+]
+VEHICLE_TYPES = [("van", 1500), ("truck", 9000), ("truck", 16000), ("trailer", 25000), ("container", 30000)]
+BOOKING_STATUSES = ["pending", "accepted", "rejected", "completed", "paid"]
+BOOKING_STATUS_WEIGHTS = [15, 20, 5, 15, 45]
+RATING_WEIGHTS = [3, 5, 12, 35, 45]  # 1..5 stars
+
+
+class Zipf:
+    """Sample from a fixed population with P(rank k) proportional to 1 / k**alpha."""
+
+    def __init__(self, population: list, alpha: float, rng: random.Random):
+        self.population = population
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1 / (rank ** alpha) for rank in range(1, len(population) + 1)))
+
+    def sample(self):
+        point = self.rng.random() * self.cumulative[-1]
+        return self.population[bisect.bisect_left(self.cumulative, point)]
+
+
+class Writer:
+    """Buffers rows per table and flushes them parents-first, with COPY on psycopg2."""
+
+    def __init__(self, engine, tables: list, batch_size: int):
+        self.engine = engine
+        self.tables = tables
+        self.batch_size = batch_size
+        self.buffers = {table.name: [] for table in tables}
+        self.columns = {table.name: [column.name for column in table.columns] for table in tables}
+        self.totals = {table.name: 0 for table in tables}
+        self.use_copy = engine.dialect.driver == "psycopg2"
+
+    def add(self, table: str, row: dict):
+        self.buffers[table].append(row)
+        if len(self.buffers[table]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with self.engine.begin() as conn:
+            for table in self.tables:
+                rows = self.buffers[table.name]
+                if not rows:
+                    continue
+                if self.use_copy:
+                    self._copy(conn, table.name, rows)
+                else:
+                    conn.execute(table.insert(), rows)
+                self.totals[table.name] += len(rows)
+                rows.clear()
+
+    def _copy(self, conn, table: str, rows: list):
+        columns = self.columns[table]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if row[col] is None else row[col] for col in columns])
+        buffer.seek(0)
+        with conn.connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def seed(args):
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "seed-secret")
+
+    from sqlalchemy import bindparam, update
+    from sqlalchemy.orm import Session
+
+    from app.database import init_engines
+    from app.models import Booking, Payment, Review, Trip, User, Vehicle
+    from app.services.geo import EARTH_RADIUS_KM, end_columns
+    from app.services.locations import resolve_locations
+    from app.utils import hash_password
+
+    upgrade_database(args.database_url)
+    engine = init_engines()
+    # The migrations already know most of these; any that are missing get a location now
+    with Session(engine) as db:
+        places = resolve_locations(db, CITIES)
+        db.commit()
+    rng = random.Random(args.seed)
+    new_id = lambda: uuid.UUID(int=rng.getrandbits(128), version=4)
+    writer = Writer(
+        engine,
+        [User.__table__, Vehicle.__table__, Trip.__table__, Booking.__table__, Payment.__table__, Review.__table__],
+        args.batch_size,
+    )
+    # One real hash shared by every seeded user, so any of them can log in with --password
+    password_hash = hash_password(args.password)
+    today = date.today()
+    started = time.perf_counter()
+
+    # Users: carriers first so their ranks line up with the whale weights
+    carrier_count = max(1, int(args.users * args.carrier_share))
+    carriers, shippers = [], []
+    for i in range(args.users):
+        role = "carrier" if i < carrier_count else "shipper"
+        user_id = new_id()
+        (carriers if role == "carrier" else shippers).append(user_id)
+        writer.add("users", {
+            "id": user_id, "name": f"{role} {i}", "email": f"{role}{i}.s{args.seed}@seed.loadlink", "role": role,
+            "phone": f"9{rng.randrange(10**9):09d}", "rating": 0, "review_count": 0, "rating_sum": 0,
+            "joined_date": today - timedelta(days=rng.randrange(1000)), "avatar": None, "password_hash": password_hash,
+        })
+    if not shippers:
+        raise SystemExit("--carrier-share leaves no shippers")
+
+    # Fleets: 1..max vehicles per carrier, more for the big ones
+    fleets = {}
+    for rank, carrier_id in enumerate(carriers, start=1):
+        size = max(1, min(args.max_vehicles, int(args.max_vehicles / rank ** 0.5 * rng.uniform(0.5, 1.0))))
+        fleets[carrier_id] = []
+        for _ in range(size):
+            vehicle_type, capacity = rng.choice(VEHICLE_TYPES)
+            vehicle_id = new_id()
+            fleets[carrier_id].append((vehicle_id, capacity))
+            plate = vehicle_id.hex[:12].upper()
+            writer.add("vehicles", {
+                "id": vehicle_id, "carrier_id": carrier_id, "type": vehicle_type, "capacity": capacity,
+                "license_plate": plate, "rc_number": f"RC{plate}", "is_active": True, "version": 1,
+            })
+
+    ratings = {carrier_id: [0, 0] for carrier_id in carriers}  # carrier -> [sum, count]
+    carrier_picker = Zipf(carriers, args.whale_alpha, rng)
+    routes = [(origin, destination) for origin in CITIES for destination in CITIES if origin != destination]
+    rng.shuffle(routes)
+    route_picker = Zipf(routes, args.route_alpha, rng)
+
+    def scatter(end: str, city: str) -> dict:
+        """end's point, uniform over the disc of --spread-km around the city's centre (none if it has no centre)."""
+        place = places[city]
+        if place.latitude is None:
+            return end_columns(end, None, None)
+        distance = args.spread_km * math.sqrt(rng.random()) / EARTH_RADIUS_KM  # radians of arc
+        bearing = rng.uniform(0, 2 * math.pi)
+        lat = place.latitude + math.degrees(distance * math.cos(bearing))
+        lng = place.longitude + math.degrees(distance * math.sin(bearing)) / math.cos(math.radians(place.latitude))
+        return end_columns(end, round(lat, 6), round(lng, 6))
+
+    for _ in range(args.trips):
+        carrier_id = carrier_picker.sample()
+        vehicle_id, capacity = rng.choice(fleets[carrier_id])
+        origin, destination = route_picker.sample()
+        departure = today + timedelta(days=rng.randrange(-args.days_back, args.days_ahead))
+        price = Decimal(rng.randrange(150, 800)) / 100
+        trip_id = new_id()
+
+        # Bookings fill the trip until the next load no longer fits
+        remaining = capacity
+        bookings = []
+        for _ in range(rng.randrange(args.bookings_per_trip * 2 + 1)):
+            load = max(1, int(rng.expovariate(1 / (capacity * args.mean_load_share))))
+            if load > remaining:
+                break
+            remaining -= load
+            bookings.append(load)
+
+        past = departure < today
+        writer.add("trips", {
+            "id": trip_id, "carrier_id": carrier_id, "vehicle_id": vehicle_id, "origin": origin,
+            "destination": destination, "origin_id": places[origin].id,
+            "destination_id": places[destination].id, **scatter("origin", origin), **scatter("destination", destination),
+            "departure_date": departure,
+            "arrival_date": departure + timedelta(days=rng.randrange(1, 4)), "price_per_kg": price,
+            "available_capacity": remaining, "total_capacity": capacity,
+            "status": "completed" if past and rng.random() < 0.9 else "active", "description": None, "version": 1,
+        })
+
+        for load in bookings:
+            booking_id = new_id()
+            shipper_id = rng.choice(shippers)
+            status = rng.choices(BOOKING_STATUSES, BOOKING_STATUS_WEIGHTS)[0]
+            created = departure - timedelta(days=rng.randrange(1, 30))
+            total = price * load
+            paid = status == "paid"
+            paid_date = created + timedelta(days=rng.randrange(0, 5)) if paid else None
+            writer.add("bookings", {
+                "id": booking_id, "trip_id": trip_id, "shipper_id": shipper_id, "load_size": load,
+                "total_price": total, "status": status, "created_date": created,
+                "notes": None, "fulfilled_date": paid_date, "paid_date": paid_date,
+                "qr_generated": paid, "qr_generated_date": paid_date, "version": 1,
+            })
+            if not paid:
+                continue
+            writer.add("payments", {
+                "id": new_id(), "booking_id": booking_id, "from_user_id": shipper_id, "to_user_id": carrier_id,
+                "amount": total, "status": "completed", "created_date": paid_date, "completed_date": paid_date,
+                "version": 1,
+            })
+            if rng.random() < args.review_share:
+                rating = rng.choices(range(1, 6), RATING_WEIGHTS)[0]
+                ratings[carrier_id][0] += rating
+                ratings[carrier_id][1] += 1
+                writer.add("reviews", {
+                    "id": new_id(), "from_user_id": shipper_id, "to_user_id": carrier_id, "booking_id": booking_id,
+                    "rating": rating, "comment": None,
+                    "created_date": paid_date + timedelta(days=rng.randrange(0, 7)), "version": 1,
+                })
+
+    writer.flush()
+    # Users went in first (everything references them), so their rating aggregates are set last
+    aggregates = [
+        {"user_id": carrier_id, "rating_sum": total, "review_count": count, "rating": total / count}
+        for carrier_id, (total, count) in ratings.items() if count
+    ]
+    if aggregates:
+        with engine.begin() as conn:
+            conn.execute(
+                update(User.__table__).where(User.__table__.c.id == bindparam("user_id")),
+                aggregates,
+            )
+
+    elapsed = time.perf_counter() - started
+    total = sum(writer.totals.values())
+    for table, count in writer.totals.items():
+        print(f"{table:<10} {count:>12,}")
+    print(f"{'total':<10} {total:>12,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./bench.sqlite3"))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--carrier-share", type=float, default=0.1)
+    parser.add_argument("--max-vehicles", type=int, default=50, help="fleet size of the largest carrier")
+    parser.add_argument("--trips", type=int, default=100_000)
+    parser.add_argument("--bookings-per-trip", type=int, default=5, help="mean, before capacity cuts it short")
+    parser.add_argument("--mean-load-share", type=float, default=0.08, help="mean booking load as a share of capacity")
+    parser.add_argument("--review-share", type=float, default=0.4, help="share of paid bookings that get a review")
+    parser.add_argument("--whale-alpha", type=float, default=1.1, help="Zipf skew of trips per carrier")
+    parser.add_argument("--route-alpha", type=float, default=1.0, help="Zipf skew of routes")
+    parser.add_argument("--days-back", type=int, default=365)
+    parser.add_argument("--days-ahead", type=int, default=90)
+    parser.add_argument("--spread-km", type=float, default=25.0, help="radius of trip points around their city")
+    parser.add_argument("--password", default="seed-password")
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    seed(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Concurrency stress test for capacity reservation in POST /bookings/.
+
+Fires --bookings simultaneous bookings of --load-size kg at a single trip
+with --capacity kg, then checks that the trip was never overbooked:
+
+  * accepted load + remaining capacity == original capacity
+  * no request was accepted once capacity ran out
+  * every rejection is a clean 400 "Not enough capacity"
+
+    python -m benchmarks.stress_booking_capacity --database-url postgresql://... \
+        --bookings 500 --capacity 1000 --load-size 3 [--async-db]
+
+Exits non-zero if the invariant is broken.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import create_trip, register_and_login, start_server, wait_ready
+
+
+async def run(args) -> bool:
+    server = start_server(args.database_url, args.port, ASYNC_DB=args.async_db)
+    limits = httpx.Limits(max_connections=args.bookings)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=120) as client:
+            await wait_ready(client)
+            carrier = await register_and_login(client, "carrier")
+            shippers = [await register_and_login(client, "shipper") for _ in range(args.shippers)]
+            trip_id = await create_trip(client, carrier, capacity=args.capacity)
+
+            start_gate = asyncio.Event()
+
+            async def book(i: int):
+                await start_gate.wait()
+                return await client.post(
+                    "/bookings/",
+                    json={"trip_id": trip_id, "load_size": args.load_size},
+                    headers=shippers[i % len(shippers)],
+                )
+
+            tasks = [asyncio.create_task(book(i)) for i in range(args.bookings)]
+            started = time.monotonic()
+            start_gate.set()
+            responses = await asyncio.gather(*tasks)
+            elapsed = time.monotonic() - started
+
+            remaining = (await client.get(f"/trips/{trip_id}", headers=carrier)).json()["available_capacity"]
+    finally:
+        server.terminate()
+        server.wait()
+
+    accepted, rejected, failed = [], [], []
+    for response in responses:
+        if response.status_code == 200:
+            accepted.append(response)
+        elif response.status_code == 400 and "Not enough capacity" in response.text:
+            rejected.append(response)
+        else:
+            failed.append(response)
+    booked = sum(r.json()["load_size"] for r in accepted)
+    expected_accepted = min(args.bookings, args.capacity // args.load_size)
+
+    print(f"requests:          {args.bookings} in {elapsed:.2f}s")
+    print(f"accepted:          {len(accepted)} ({len(accepted) / elapsed:.1f} bookings/s)")
+    print(f"rejected (full):   {len(rejected)}")
+    print(f"errors:            {len(failed)}")
+    print(f"capacity:          {args.capacity} = booked {booked} + remaining {remaining}")
+
+    ok = booked + remaining == args.capacity and remaining >= 0
+    if not ok:
+        print("FAIL: capacity invariant broken (overbooked or lost update)")
+    if not failed and len(accepted) != expected_accepted:
+        print(f"FAIL: expected {expected_accepted} accepted bookings")
+        ok = False
+    for response in failed[:5]:
+        print(f"  {response.status_code}: {response.text[:200]}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./bench.sqlite3"))
+    parser.add_argument("--bookings", type=int, default=300)
+    parser.add_argument("--shippers", type=int, default=10)
+    parser.add_argument("--capacity", type=int, default=600)
+    parser.add_argument("--load-size", type=int, default=3)
+    parser.add_argument("--async-db", action="store_true")
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Rebuild User.rating_sum / review_count / rating from the reviews table in
+one set-based UPDATE. The review routes keep these aggregates current
+incrementally, including the reviews removed with a booking, trip or
+vehicle; run this once to backfill existing data, and periodically with
+--check to catch drift from writes that bypass the routes (manual SQL,
+users deleted outside the API). The API workers cache authenticated users,
+so they serve the rebuilt aggregates once PRINCIPAL_CACHE_TTL_SECONDS has
+passed.
+
+    python -m jobs.recompute_ratings            # rebuild everything
+    python -m jobs.recompute_ratings --check    # report drifted users, exit 1 if any
+"""
+import argparse
+import sys
+import time
+
+from app.database import SessionLocal, init_engines
+from app.services.ratings import drifted_ratings, recompute_all_ratings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="only report users whose aggregates have drifted")
+    parser.add_argument("--show", type=int, default=20, help="drifted users to print with --check")
+    args = parser.parse_args()
+
+    init_engines()
+    with SessionLocal() as db:
+        if args.check:
+            drifted = db.execute(drifted_ratings()).all()
+            for row in drifted[:args.show]:
+                print(f"{row.id}: stored {row.rating_sum}/{row.review_count}, actual {row.actual_sum}/{row.actual_count}")
+            print(f"{len(drifted)} users drifted")
+            sys.exit(1 if drifted else 0)
+
+        started = time.perf_counter()
+        updated = db.execute(recompute_all_ratings()).rowcount
+        db.commit()
+        print(f"recomputed {updated} users in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
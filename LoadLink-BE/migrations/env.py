@@ -0,0 +1,74 @@
+"""
+Alembic environment. The schema is managed here, not by create_all at
+startup: run `alembic upgrade head` (from LoadLink-BE/) before starting the
+app. The database URL comes from sqlalchemy.url when set (alembic.ini or
+Config.set_main_option), otherwise from DATABASE_URL in the app settings.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.core.config import settings
+from app.database import Base
+import app.models  # noqa: F401  registers the tables on Base.metadata
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL
+
+
+def dialect_filter(dialect_name: str):
+    """include_object hook: leave out indexes declared with .ddl_if() for another dialect (e.g. pg_trgm's GIN)."""
+    def include_object(obj, name, type_, reflected, compare_to):
+        ddl_if = getattr(obj, "_ddl_if", None)
+        if type_ == "index" and ddl_if is not None and ddl_if.dialect:
+            return dialect_name == ddl_if.dialect
+        return True
+
+    return include_object
+
+
+def run_migrations_offline() -> None:
+    """Emit the SQL as a script instead of running it (alembic upgrade head --sql)."""
+    context.configure(
+        url=database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=database_url().startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = create_engine(database_url(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite can't ALTER most things in place; batch mode rebuilds the table
+            render_as_batch=connection.dialect.name == "sqlite",
+            # SQLite reflects the UUID columns as NUMERIC, which would show up as a diff on every check
+            compare_type=connection.dialect.name != "sqlite",
+            include_object=dialect_filter(connection.dialect.name),
+            # The CONCURRENTLY index builds commit whatever ran before them; one
+            # transaction per revision keeps that to the current migration
+            transaction_per_migration=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
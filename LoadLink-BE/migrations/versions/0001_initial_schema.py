@@ -0,0 +1,119 @@
+"""Initial schema, as create_all built it before migrations
+
+Databases created by the old create_all-at-startup code already have these
+tables: mark them with `alembic stamp 0001_initial_schema`, then
+`alembic upgrade head`. 0002 only adds the columns that are missing.
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_initial_schema"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(150), nullable=False, unique=True),
+        sa.Column("role", sa.String(20), nullable=False),
+        sa.Column("phone", sa.String(20), nullable=False),
+        sa.Column("rating", sa.Numeric(2, 1)),
+        sa.Column("review_count", sa.Integer()),
+        sa.Column("joined_date", sa.Date(), nullable=False),
+        sa.Column("avatar", sa.Text()),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.CheckConstraint("role IN ('shipper','carrier')", name="check_user_role"),
+    )
+    op.create_index("ix_users_id", "users", ["id"], unique=True)
+
+    op.create_table(
+        "vehicles",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("carrier_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("type", sa.String(20), nullable=False),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("license_plate", sa.String(20), nullable=False, unique=True),
+        sa.Column("rc_number", sa.String(50), nullable=False, unique=True),
+        sa.Column("is_active", sa.Boolean()),
+    )
+    op.create_index("ix_vehicles_id", "vehicles", ["id"])
+
+    op.create_table(
+        "trips",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("carrier_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("vehicle_id", UUID(as_uuid=True), sa.ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("origin", sa.String(255), nullable=False),
+        sa.Column("destination", sa.String(255), nullable=False),
+        sa.Column("departure_date", sa.Date(), nullable=False),
+        sa.Column("arrival_date", sa.Date(), nullable=False),
+        sa.Column("price_per_kg", sa.Numeric(10, 2), nullable=False),
+        sa.Column("available_capacity", sa.Integer(), nullable=False),
+        sa.Column("total_capacity", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("description", sa.Text()),
+    )
+    op.create_index("ix_trips_id", "trips", ["id"])
+
+    op.create_table(
+        "bookings",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("trip_id", UUID(as_uuid=True), sa.ForeignKey("trips.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("shipper_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("load_size", sa.Integer(), nullable=False),
+        sa.Column("total_price", sa.Numeric(12, 2), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("created_date", sa.Date(), nullable=False),
+        sa.Column("notes", sa.Text()),
+        sa.Column("fulfilled_date", sa.Date()),
+        sa.Column("paid_date", sa.Date()),
+        sa.Column("qr_generated", sa.Boolean()),
+        sa.Column("qr_generated_date", sa.Date()),
+    )
+    op.create_index("ix_bookings_id", "bookings", ["id"])
+
+    op.create_table(
+        "payments",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("booking_id", UUID(as_uuid=True), sa.ForeignKey("bookings.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("from_user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("to_user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("created_date", sa.Date(), nullable=False),
+        sa.Column("completed_date", sa.Date()),
+    )
+    op.create_index("ix_payments_id", "payments", ["id"])
+
+    op.create_table(
+        "reviews",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("from_user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("to_user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("booking_id", UUID(as_uuid=True), sa.ForeignKey("bookings.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("rating", sa.Integer(), nullable=False),
+        sa.Column("comment", sa.Text()),
+        sa.Column("created_date", sa.Date(), nullable=False),
+        sa.CheckConstraint("rating BETWEEN 1 AND 5", name="check_rating_range"),
+    )
+    op.create_index("ix_reviews_id", "reviews", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("reviews", "payments", "bookings", "trips", "vehicles", "users"):
+        op.drop_table(table)
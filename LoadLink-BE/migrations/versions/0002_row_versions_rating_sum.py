@@ -0,0 +1,56 @@
+"""Row version columns and the users.rating_sum aggregate
+
+Adds the `version` column behind the ETag validators to vehicles, trips,
+bookings, payments and reviews, and users.rating_sum, backfilled from the
+reviews table. Columns that a create_all-built database already has are
+skipped.
+
+Revision ID: 0002_row_versions_rating_sum
+Revises: 0001_initial_schema
+Create Date: 2026-10-18 00:00:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_row_versions_rating_sum"
+down_revision: Union[str, Sequence[str], None] = "0001_initial_schema"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ("vehicles", "trips", "bookings", "payments", "reviews")
+
+
+def _has_column(table: str, column: str) -> bool:
+    return column in {col["name"] for col in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in VERSIONED_TABLES:
+        if not _has_column(table, "version"):
+            op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+    if not _has_column("users", "rating_sum"):
+        op.add_column("users", sa.Column("rating_sum", sa.Integer(), nullable=False, server_default="0"))
+        op.execute(
+            "UPDATE users SET "
+            "rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE reviews.to_user_id = users.id), "
+            "review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.to_user_id = users.id)"
+        )
+        op.execute(
+            "UPDATE users SET rating = "
+            "CASE WHEN review_count > 0 THEN CAST(rating_sum AS FLOAT) / review_count ELSE 0 END"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("rating_sum")
+    for table in VERSIONED_TABLES:
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("version")
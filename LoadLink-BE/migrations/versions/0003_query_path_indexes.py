@@ -0,0 +1,66 @@
+"""Indexes for the routers' query paths
+
+Foreign-key filter columns (trips.carrier_id, bookings.trip_id and
+shipper_id, payments.from_user_id / to_user_id, reviews.to_user_id, ...)
+had no index, so every "my bookings" / "my payments" page was a sequential
+scan. Most are composite with the keyset sort columns, so a page is one
+index range walk. The trip search indexes are included for databases that
+predate them.
+
+On Postgres each index is built with CREATE INDEX CONCURRENTLY outside the
+migration transaction, so writes keep flowing during the build. If a build
+fails it leaves an INVALID index behind: drop it and run the upgrade again.
+
+Revision ID: 0003_query_path_indexes
+Revises: 0002_row_versions_rating_sum
+Create Date: 2026-10-18 00:00:02
+
+"""
+from contextlib import nullcontext
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_query_path_indexes"
+down_revision: Union[str, Sequence[str], None] = "0002_row_versions_rating_sum"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_trips_status_route_departure", "trips", ["status", "origin", "destination", "departure_date", "id"]),
+    ("ix_trips_status_departure", "trips", ["status", "departure_date", "id"]),
+    ("ix_trips_carrier_departure", "trips", ["carrier_id", "departure_date", "id"]),
+    ("ix_trips_vehicle_id", "trips", ["vehicle_id"]),
+    ("ix_vehicles_carrier_id", "vehicles", ["carrier_id", "id"]),
+    ("ix_bookings_trip_created", "bookings", ["trip_id", "created_date", "id"]),
+    ("ix_bookings_shipper_created", "bookings", ["shipper_id", "created_date", "id"]),
+    ("ix_payments_booking_id", "payments", ["booking_id"]),
+    ("ix_payments_from_user_created", "payments", ["from_user_id", "created_date", "id"]),
+    ("ix_payments_to_user_created", "payments", ["to_user_id", "created_date", "id"]),
+    ("ix_reviews_created", "reviews", ["created_date", "id"]),
+    ("ix_reviews_to_user_id", "reviews", ["to_user_id"]),
+    ("ix_reviews_from_user_id", "reviews", ["from_user_id"]),
+    ("ix_reviews_booking_id", "reviews", ["booking_id"]),
+]
+
+
+def _concurrently():
+    # CONCURRENTLY can't run inside a transaction block
+    if op.get_bind().dialect.name == "postgresql":
+        return op.get_context().autocommit_block()
+    return nullcontext()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with _concurrently():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with _concurrently():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
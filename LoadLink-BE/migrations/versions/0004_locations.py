@@ -0,0 +1,149 @@
+"""Location dictionary: canonical ids and aliases, referenced by trips
+
+Adds locations (one row per place, with its canonical spelling) and
+location_aliases (every normalized spelling that resolves to it, the
+canonical one included), seeded with the larger Indian cities and their
+former names. Every distinct spelling already in trips.origin /
+trips.destination is mapped onto an alias (or gets a new location), and
+trips gain origin_id / destination_id; the route search index moves from
+the two text columns to the ids.
+
+On Postgres, pg_trgm is enabled and location_aliases.key gets a GIN
+trigram index for GET /locations/search.
+
+As in 0003, the route index is swapped with DROP / CREATE INDEX
+CONCURRENTLY outside the migration transaction, after the rest has
+committed, so writes to trips keep flowing while it builds.
+
+Revision ID: 0004_locations
+Revises: 0003_query_path_indexes
+Create Date: 2026-10-18 00:00:03
+
+"""
+from contextlib import nullcontext
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_locations"
+down_revision: Union[str, Sequence[str], None] = "0003_query_path_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Canonical name -> other spellings in common use
+KNOWN_LOCATIONS = {
+    "Mumbai": ["Bombay"], "Delhi": [], "Bengaluru": ["Bangalore"], "Hyderabad": [], "Ahmedabad": [],
+    "Chennai": ["Madras"], "Kolkata": ["Calcutta"], "Pune": ["Poona"], "Jaipur": [], "Surat": [],
+    "Lucknow": [], "Kanpur": ["Cawnpore"], "Nagpur": [], "Indore": [], "Thane": [], "Bhopal": [],
+    "Visakhapatnam": ["Vizag", "Vishakhapatnam"], "Patna": [], "Vadodara": ["Baroda"], "Ludhiana": [],
+    "Agra": [], "Nashik": ["Nasik"], "Rajkot": [], "Varanasi": ["Benares", "Banaras"], "Amritsar": [],
+    "Coimbatore": [], "Kochi": ["Cochin"], "Guwahati": ["Gauhati"], "Raipur": [], "Mysuru": ["Mysore"],
+    "Gurugram": ["Gurgaon"], "Mangaluru": ["Mangalore"], "Thiruvananthapuram": ["Trivandrum"],
+    "Puducherry": ["Pondicherry"], "Belagavi": ["Belgaum"], "Prayagraj": ["Allahabad"],
+    "Hubballi": ["Hubli"], "Kozhikode": ["Calicut"], "Tiruchirappalli": ["Trichy", "Trichinopoly"],
+}
+
+locations = sa.table("locations", sa.column("id", sa.Integer), sa.column("name", sa.String))
+aliases = sa.table("location_aliases", sa.column("key", sa.String), sa.column("location_id", sa.Integer))
+backfill = sa.table("location_backfill", sa.column("spelling", sa.String), sa.column("location_id", sa.Integer))
+
+
+def _concurrently():
+    # CONCURRENTLY can't run inside a transaction block
+    if op.get_bind().dialect.name == "postgresql":
+        return op.get_context().autocommit_block()
+    return nullcontext()
+
+
+def _swap_route_index(columns):
+    with _concurrently():
+        op.drop_index("ix_trips_status_route_departure", table_name="trips", if_exists=True, postgresql_concurrently=True)
+        op.create_index("ix_trips_status_route_departure", "trips", columns, postgresql_concurrently=True)
+
+
+def location_key(name: str) -> str:
+    # Frozen copy of app.services.locations.location_key
+    return " ".join(name.split()).casefold()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    postgres = bind.dialect.name == "postgresql"
+
+    op.create_table(
+        "locations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(length=255), nullable=False),
+    )
+    op.create_table(
+        "location_aliases",
+        sa.Column("key", sa.String(length=255), primary_key=True),
+        sa.Column("location_id", sa.Integer(), sa.ForeignKey("locations.id", ondelete="CASCADE"), nullable=False),
+    )
+    op.create_index("ix_location_aliases_location_id", "location_aliases", ["location_id"])
+    if postgres:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_location_aliases_key_trgm", "location_aliases", ["key"],
+            postgresql_using="gin", postgresql_ops={"key": "gin_trgm_ops"},
+        )
+
+    # Known places first, then one location per spelling in trips that none of them covers
+    ids, names = {}, []
+    for name, others in KNOWN_LOCATIONS.items():
+        names.append(name)
+        for spelling in [name, *others]:
+            ids[location_key(spelling)] = len(names)
+    spellings = bind.execute(sa.text("SELECT origin FROM trips UNION SELECT destination FROM trips")).scalars().all()
+    mapping = []
+    for spelling in spellings:
+        key = location_key(spelling)
+        if key not in ids:
+            names.append(" ".join(spelling.split()))
+            ids[key] = len(names)
+        mapping.append({"spelling": spelling, "location_id": ids[key]})
+
+    op.bulk_insert(locations, [{"id": number, "name": name} for number, name in enumerate(names, start=1)])
+    op.bulk_insert(aliases, [{"key": key, "location_id": location_id} for key, location_id in ids.items()])
+    if postgres:
+        op.execute("SELECT setval(pg_get_serial_sequence('locations', 'id'), (SELECT MAX(id) FROM locations))")
+
+    # Trips pick up their ids through a spelling -> id table: one pass over trips per column
+    op.create_table(
+        "location_backfill",
+        sa.Column("spelling", sa.String(length=255), primary_key=True),
+        sa.Column("location_id", sa.Integer(), nullable=False),
+    )
+    if mapping:
+        op.bulk_insert(backfill, mapping)
+    op.add_column("trips", sa.Column("origin_id", sa.Integer(), nullable=True))
+    op.add_column("trips", sa.Column("destination_id", sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE trips SET "
+        "origin_id = (SELECT location_id FROM location_backfill WHERE spelling = trips.origin), "
+        "destination_id = (SELECT location_id FROM location_backfill WHERE spelling = trips.destination)"
+    )
+    op.drop_table("location_backfill")
+
+    with op.batch_alter_table("trips") as batch:
+        batch.alter_column("origin_id", existing_type=sa.Integer(), nullable=False)
+        batch.alter_column("destination_id", existing_type=sa.Integer(), nullable=False)
+        batch.create_foreign_key("fk_trips_origin_id_locations", "locations", ["origin_id"], ["id"])
+        batch.create_foreign_key("fk_trips_destination_id_locations", "locations", ["destination_id"], ["id"])
+    _swap_route_index(["status", "origin_id", "destination_id", "departure_date", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The text-column index goes back first: the id columns it replaces are dropped below
+    _swap_route_index(["status", "origin", "destination", "departure_date", "id"])
+    with op.batch_alter_table("trips") as batch:
+        batch.drop_constraint("fk_trips_destination_id_locations", type_="foreignkey")
+        batch.drop_constraint("fk_trips_origin_id_locations", type_="foreignkey")
+        batch.drop_column("destination_id")
+        batch.drop_column("origin_id")
+    op.drop_table("location_aliases")
+    op.drop_table("locations")
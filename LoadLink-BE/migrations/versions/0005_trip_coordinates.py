@@ -0,0 +1,146 @@
+"""Trip coordinates: pickup / drop-off points and geohash cells
+
+Locations gain a centre (latitude / longitude), filled in for the cities
+seeded by 0004. Trips gain a point and a geohash cell for each end, backfilled
+from their locations' centres where known, and an index per end on
+(status, geohash) for the range scans behind GET /trips/nearby, carrying
+the departure date and point so the candidate read never touches the table.
+On Postgres those are built with CREATE INDEX CONCURRENTLY after the
+backfill has committed, as in 0003.
+
+Revision ID: 0005_trip_coordinates
+Revises: 0004_locations
+Create Date: 2026-10-18 00:00:04
+
+"""
+from contextlib import nullcontext
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_trip_coordinates"
+down_revision: Union[str, Sequence[str], None] = "0004_locations"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Canonical name (as seeded by 0004) -> city centre
+KNOWN_CENTRES = {
+    "Mumbai": (19.0760, 72.8777), "Delhi": (28.6139, 77.2090), "Bengaluru": (12.9716, 77.5946),
+    "Hyderabad": (17.3850, 78.4867), "Ahmedabad": (23.0225, 72.5714), "Chennai": (13.0827, 80.2707),
+    "Kolkata": (22.5726, 88.3639), "Pune": (18.5204, 73.8567), "Jaipur": (26.9124, 75.7873),
+    "Surat": (21.1702, 72.8311), "Lucknow": (26.8467, 80.9462), "Kanpur": (26.4499, 80.3319),
+    "Nagpur": (21.1458, 79.0882), "Indore": (22.7196, 75.8577), "Thane": (19.2183, 72.9781),
+    "Bhopal": (23.2599, 77.4126), "Visakhapatnam": (17.6868, 83.2185), "Patna": (25.5941, 85.1376),
+    "Vadodara": (22.3072, 73.1812), "Ludhiana": (30.9010, 75.8573), "Agra": (27.1767, 78.0081),
+    "Nashik": (19.9975, 73.7898), "Rajkot": (22.3039, 70.8022), "Varanasi": (25.3176, 82.9739),
+    "Amritsar": (31.6340, 74.8723), "Coimbatore": (11.0168, 76.9558), "Kochi": (9.9312, 76.2673),
+    "Guwahati": (26.1445, 91.7362), "Raipur": (21.2514, 81.6296), "Mysuru": (12.2958, 76.6394),
+    "Gurugram": (28.4595, 77.0266), "Mangaluru": (12.9141, 74.8560), "Thiruvananthapuram": (8.5241, 76.9366),
+    "Puducherry": (11.9416, 79.8083), "Belagavi": (15.8497, 74.4977), "Prayagraj": (25.4358, 81.8463),
+    "Hubballi": (15.3647, 75.1240), "Kozhikode": (11.2588, 75.7804), "Tiruchirappalli": (10.7905, 78.7047),
+}
+GEOHASH_PRECISION = 9
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+locations = sa.table(
+    "locations", sa.column("id", sa.Integer), sa.column("name", sa.String),
+    sa.column("latitude", sa.Float), sa.column("longitude", sa.Float),
+)
+backfill = sa.table(
+    "trip_point_backfill", sa.column("location_id", sa.Integer),
+    sa.column("lat", sa.Float), sa.column("lng", sa.Float), sa.column("geohash", sa.String),
+)
+
+
+def _concurrently():
+    # CONCURRENTLY can't run inside a transaction block
+    if op.get_bind().dialect.name == "postgresql":
+        return op.get_context().autocommit_block()
+    return nullcontext()
+
+
+def geohash(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    # Frozen copy of app.services.geo.geohash
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        span, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        middle = (span[0] + span[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            span[0] = middle
+        else:
+            span[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    op.add_column("locations", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("locations", sa.Column("longitude", sa.Float(), nullable=True))
+    for end in ("origin", "destination"):
+        op.add_column("trips", sa.Column(f"{end}_lat", sa.Float(), nullable=True))
+        op.add_column("trips", sa.Column(f"{end}_lng", sa.Float(), nullable=True))
+        op.add_column("trips", sa.Column(f"{end}_geohash", sa.String(length=12), nullable=True))
+
+    for name, (lat, lng) in KNOWN_CENTRES.items():
+        op.execute(locations.update().where(locations.c.name == name).values(latitude=lat, longitude=lng))
+
+    # Trips take their locations' centres through a location -> point table: one pass over trips per end
+    points = bind.execute(
+        sa.select(locations.c.id, locations.c.latitude, locations.c.longitude).where(locations.c.latitude.is_not(None))
+    ).all()
+    op.create_table(
+        "trip_point_backfill",
+        sa.Column("location_id", sa.Integer(), primary_key=True),
+        sa.Column("lat", sa.Float(), nullable=False),
+        sa.Column("lng", sa.Float(), nullable=False),
+        sa.Column("geohash", sa.String(length=12), nullable=False),
+    )
+    if points:
+        op.bulk_insert(backfill, [
+            {"location_id": location_id, "lat": lat, "lng": lng, "geohash": geohash(lat, lng)}
+            for location_id, lat, lng in points
+        ])
+    for end in ("origin", "destination"):
+        point = f"FROM trip_point_backfill WHERE location_id = trips.{end}_id"
+        op.execute(
+            f"UPDATE trips SET "
+            f"{end}_lat = (SELECT lat {point}), "
+            f"{end}_lng = (SELECT lng {point}), "
+            f"{end}_geohash = (SELECT geohash {point})"
+        )
+    op.drop_table("trip_point_backfill")
+
+    with _concurrently():
+        for end in ("origin", "destination"):
+            op.create_index(
+                f"ix_trips_status_{end}_geohash", "trips",
+                ["status", f"{end}_geohash", "departure_date", f"{end}_lat", f"{end}_lng", "id"],
+                if_not_exists=True, postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with _concurrently():
+        for end in ("destination", "origin"):
+            op.drop_index(f"ix_trips_status_{end}_geohash", table_name="trips", if_exists=True, postgresql_concurrently=True)
+    with op.batch_alter_table("trips") as batch:
+        for end in ("destination", "origin"):
+            batch.drop_column(f"{end}_geohash")
+            batch.drop_column(f"{end}_lng")
+            batch.drop_column(f"{end}_lat")
+    with op.batch_alter_table("locations") as batch:
+        batch.drop_column("longitude")
+        batch.drop_column("latitude")
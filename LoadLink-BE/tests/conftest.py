@@ -0,0 +1,118 @@
+"""
+Shared fixtures. Run from LoadLink-BE/ with `python -m pytest`.
+
+Each session builds a throwaway SQLite database per router flavour (the sync
+handlers and the AsyncSession ones), migrates it with Alembic and serves the
+app from it through TestClient, so every endpoint test runs against both.
+"""
+import os
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.query_stats import count_queries
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+# ---------------------------
+# App and database
+# ---------------------------
+@pytest.fixture(scope="session", params=["sync", "async"])
+def client(request, tmp_path_factory):
+    url = f"sqlite:///{tmp_path_factory.mktemp(request.param) / 'loadlink.sqlite3'}"
+    env = {
+        "DATABASE_URL": url,
+        "SECRET_KEY": "test-secret",
+        "ASYNC_DB": str(request.param == "async").lower(),
+        # The background index load would add its own statements to the counts
+        "TRIP_MATCH_INDEX": "false",
+        "BCRYPT_ROUNDS": "4",
+    }
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    get_settings.cache_clear()
+
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+
+    from app.main import create_app
+    with TestClient(create_app()) as test_client:
+        yield test_client
+
+    for name, value in saved.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    get_settings.cache_clear()
+
+
+def login(client, role: str, name: str = None) -> dict:
+    name = name or role
+    email = f"{name}@example.com"
+    client.post("/auth/register", json={
+        "name": name, "email": email, "password": "password1", "role": role, "phone": "9999999999",
+    })
+    response = client.post("/auth/login", json={"email": email, "password": "password1"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def marketplace(client):
+    """A carrier with a few active trips, each booked, paid and reviewed by one shipper."""
+    carrier, shipper = login(client, "carrier"), login(client, "shipper")
+    carrier_id = client.get("/users/me", headers=carrier).json()["id"]
+    vehicle = client.post("/vehicles/", headers=carrier, json={
+        "type": "truck", "capacity": 5000, "license_plate": "MH12AB1234", "rc_number": "RC1234",
+    }).json()
+    departure = date.today() + timedelta(days=7)
+    for route in (("Mumbai", "Pune"), ("Pune", "Nashik"), ("Nashik", "Mumbai")):
+        trip = client.post("/trips/", headers=carrier, json={
+            "vehicle_id": vehicle["id"], "origin": route[0], "destination": route[1],
+            "departure_date": departure.isoformat(), "arrival_date": (departure + timedelta(days=1)).isoformat(),
+            "price_per_kg": 2.5, "status": "active",
+        })
+        assert trip.status_code == 200, trip.text
+        booking = client.post("/bookings/", headers=shipper, json={"trip_id": trip.json()["id"], "load_size": 100})
+        assert booking.status_code == 200, booking.text
+        assert client.post(f"/payments/{booking.json()['id']}").status_code == 200
+        review = client.post("/reviews/", headers=shipper, json={
+            "booking_id": booking.json()["id"], "to_user_id": carrier_id, "rating": 4,
+        })
+        assert review.status_code == 200, review.text
+    return {"carrier": carrier, "shipper": shipper}
+
+
+# ---------------------------
+# Query budgets
+# ---------------------------
+@pytest.fixture
+def query_budget():
+    """
+    Fails the block when more statements than the budget reach the database,
+    listing them with repeats first, so a new lazy load or N+1 shows up in CI:
+
+        with query_budget(2):
+            client.get("/trips/all", headers=headers)
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        with count_queries() as stats:
+            yield stats
+        if stats.count > max_queries:
+            issued = "\n".join(
+                f"  {times}x {' '.join(statement.split())[:200]}" for statement, times in stats.statements.most_common()
+            )
+            pytest.fail(f"{stats.count} queries issued, budget is {max_queries}:\n{issued}", pytrace=False)
+
+    return budget
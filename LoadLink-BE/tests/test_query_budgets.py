@@ -0,0 +1,24 @@
+import pytest
+
+# Statements each endpoint may issue for a signed-in user whose token and
+# principal are already cached. They must not grow with the number of rows
+# returned (every list below has several), so a new lazy load or N+1 breaks
+# the test instead of slipping into production.
+BUDGETS = [
+    ("/trips/all", "carrier", 1),
+    ("/bookings/", "shipper", 1),
+    ("/payments/me", "shipper", 1),
+    ("/reviews/", "shipper", 1),
+]
+
+
+@pytest.mark.parametrize("path, role, max_queries", BUDGETS)
+def test_query_budget(client, marketplace, query_budget, path, role, max_queries):
+    headers = marketplace[role]
+    assert client.get(path, headers=headers).status_code == 200
+
+    with query_budget(max_queries):
+        response = client.get(path, headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == 3
@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import database
+from app.services.ratings import drifted_ratings
+from conftest import login
+
+
+def assert_no_drift():
+    with database.SessionLocal() as db:
+        assert db.execute(drifted_ratings()).all() == []
+
+
+@pytest.fixture
+def parties(client, marketplace):
+    """A carrier and shipper of their own, so the deletes below leave the shared marketplace alone."""
+    carrier, shipper = login(client, "carrier", "rated-carrier"), login(client, "shipper", "rating-shipper")
+    return carrier, shipper, client.get("/users/me", headers=carrier).json()["id"]
+
+
+def booked_trip(client, carrier, shipper, vehicle_id):
+    departure = date.today() + timedelta(days=3)
+    trip = client.post("/trips/", headers=carrier, json={
+        "vehicle_id": vehicle_id, "origin": "Delhi", "destination": "Agra",
+        "departure_date": departure.isoformat(), "arrival_date": (departure + timedelta(days=1)).isoformat(),
+        "price_per_kg": 1.5, "status": "active",
+    })
+    assert trip.status_code == 200, trip.text
+    booking = client.post("/bookings/", headers=shipper, json={"trip_id": trip.json()["id"], "load_size": 50})
+    assert booking.status_code == 200, booking.text
+    return trip.json()["id"], booking.json()["id"]
+
+
+def review(client, shipper, booking_id, carrier_id, rating):
+    response = client.post("/reviews/", headers=shipper, json={
+        "booking_id": booking_id, "to_user_id": carrier_id, "rating": rating,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_aggregates_follow_every_review_write(client, parties):
+    carrier, shipper, carrier_id = parties
+    vehicle = client.post("/vehicles/", headers=carrier, json={
+        "type": "truck", "capacity": 2000, "license_plate": "DL01RT0001", "rc_number": "RCRT0001",
+    }).json()["id"]
+    (kept_trip, kept_booking), (_, booked), (deleted_trip, trip_booking) = (
+        booked_trip(client, carrier, shipper, vehicle) for _ in range(3)
+    )
+
+    first = review(client, shipper, kept_booking, carrier_id, 4)
+    review(client, shipper, booked, carrier_id, 3)
+    review(client, shipper, trip_booking, carrier_id, 2)
+    assert_no_drift()
+
+    assert client.put(f"/reviews/{first}", headers=shipper, json={"rating": 1}).status_code == 200
+    assert_no_drift()
+    assert client.delete(f"/reviews/{first}", headers=shipper).status_code == 204
+    assert_no_drift()
+
+    assert client.delete(f"/bookings/{booked}", headers=shipper).status_code == 204
+    assert_no_drift()
+    assert client.delete(f"/trips/{deleted_trip}", headers=carrier).status_code == 204
+    assert_no_drift()
+
+    review(client, shipper, kept_booking, carrier_id, 5)
+    assert client.delete(f"/vehicles/{vehicle}", headers=carrier).status_code == 204
+    assert_no_drift()
+    me = client.get("/users/me", headers=carrier).json()
+    assert (me["review_count"], float(me["rating"])) == (0, 0.0)
+    assert client.get(f"/trips/{kept_trip}", headers=carrier).status_code == 404
+
+
+def test_rating_cannot_be_removed(client, marketplace):
+    shipper = marketplace["shipper"]
+    review_id = client.get("/reviews/", headers=shipper).json()[0]["id"]
+
+    response = client.put(f"/reviews/{review_id}", headers=shipper, json={"rating": None})
+
+    assert response.status_code == 400
+    assert_no_drift()
@@ -17,4 +17,16 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Follow X-Next-Cursor through every page of a cursor-paginated list endpoint
+export const getAllPages = async <T>(url: string): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const res = await api.get<T[]>(url, { params: cursor ? { cursor } : undefined });
+    items.push(...res.data);
+    cursor = res.headers["x-next-cursor"];
+  } while (cursor);
+  return items;
+};
+
 export default api;
@@ -1,6 +1,6 @@
 "use client";
 
-import api from "../lib/api";
+import api, { getAllPages } from "../lib/api";
 
 // ------------------
 // Types
@@ -56,8 +56,7 @@ export const createBookingApi = async (
 
 // Get all bookings (shippers see their own, admin sees all)
 export const getBookingsApi = async (): Promise<BookingOut[]> => {
-  const res = await api.get("/bookings/");
-  return res.data;
+  return getAllPages<BookingOut>("/bookings/");
 };
 
 // Get booking by ID
@@ -89,6 +88,5 @@ export const deleteBookingApi = async (bookingId: string): Promise<void> => {
 export const getBookingsByTripApi = async (
   tripId: string
 ): Promise<BookingOut[]> => {
-  const res = await api.get(`/bookings/trip/${tripId}`);
-  return res.data;
+  return getAllPages<BookingOut>(`/bookings/trip/${tripId}`);
 };
\ No newline at end of file
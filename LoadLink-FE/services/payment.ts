@@ -1,6 +1,6 @@
 "use client";
 
-import api from "../lib/api";
+import api, { getAllPages } from "../lib/api";
 
 // ------------------
 // Types
@@ -45,6 +45,5 @@ export const getPaymentByIdApi = async (
 
 // Optionally, get all payments (admin)
 export const getAllPaymentsApi = async (): Promise<PaymentOut[]> => {
-  const res = await api.get("/payments/me");
-  return res.data;
+  return getAllPages<PaymentOut>("/payments/me");
 };
@@ -1,6 +1,6 @@
 "use client";
 
-import api from "../lib/api";
+import api, { getAllPages } from "../lib/api";
 
 // ------------------
 // Types
@@ -39,8 +39,7 @@ export const createReviewApi = async (
 
 // Get all reviews
 export const getReviewsApi = async (): Promise<ReviewOut[]> => {
-  const res = await api.get("/reviews/");
-  return res.data;
+  return getAllPages<ReviewOut>("/reviews/");
 };
 
 // Get review by ID
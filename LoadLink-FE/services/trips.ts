@@ -1,6 +1,6 @@
 "use client";
 
-import api from "../lib/api";
+import api, { getAllPages } from "../lib/api";
 
 // ------------------
 // Types
@@ -64,8 +64,7 @@ export const getAllTripsApi = async (): Promise<TripOut[]> => {
 
 // View carrier's own trips
 export const getMyTripsApi = async (): Promise<TripOut[]> => {
-  const res = await api.get("/trips/my");
-  return res.data;
+  return getAllPages<TripOut>("/trips/my");
 };
 
 // Get trip by ID
@@ -1,6 +1,6 @@
 "use client";
 
-import api from "../lib/api";
+import api, { getAllPages } from "../lib/api";
 
 // Vehicle types
 export interface VehicleCreate {
@@ -27,8 +27,7 @@ export const createVehicleApi = async (
 };
 
 export const getMyVehiclesApi = async (): Promise<VehicleOut[]> => {
-  const res = await api.get("/vehicles/");
-  return res.data;
+  return getAllPages<VehicleOut>("/vehicles/");
 };
 
 export const updateVehicleApi = async (